@@ -1,13 +1,18 @@
 """Application package initialization for Prop Firm Dragon Funded support bot."""
 
-from .main import create_app
-
-__all__ = ["create_app"]
-
-
-
+import time
+from typing import Any
 
+# Start of the application's imports, reported as the ``import`` startup phase.
+IMPORT_STARTED = time.perf_counter()
 
+__all__ = ["create_app"]
 
 
+def __getattr__(name: str) -> Any:
+    # Importing a submodule (e.g. ``app.core.config``) should not build the API.
+    if name == "create_app":
+        from .main import create_app
 
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
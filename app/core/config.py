@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -14,11 +14,76 @@ class Settings(BaseSettings):
 
     gemini_api_key: str = Field(..., env="GEMINI_API_KEY")
     gemini_model: str = Field(default="gemini-2.5-flash-lite")
+    gemini_light_model: str = Field(default="gemini-2.5-flash-lite")
+    model_router_light_intents: List[str] = Field(default=["referral", "dragon_club"])
+    model_router_light_min_confidence: float = Field(default=0.75, ge=0.0, le=1.0)
+    model_router_light_max_prompt_tokens: int = Field(default=1200, ge=0)
+    model_router_fallback_after_seconds: float = Field(default=8.0, ge=0.0)
+    gemini_context_cache_enabled: bool = Field(default=True)
+    gemini_context_cache_ttl_seconds: int = Field(default=3600, ge=60)
+    gemini_context_cache_refresh_seconds: int = Field(default=300, ge=0)
+    gemini_api_endpoint: str = Field(default="generativelanguage.googleapis.com:443")
+    gemini_api_tls: bool = Field(default=True)
+    gemini_pool_size: int = Field(default=2, ge=1)
+    gemini_timeout_seconds: float = Field(default=60.0, gt=0)
+    gemini_keepalive_seconds: float = Field(default=30.0, gt=0)
+    gemini_rpm: int = Field(default=15, ge=0)
+    gemini_tpm: int = Field(default=250_000, ge=0)
+    embedding_rpm: int = Field(default=1500, ge=0)
+    embedding_tpm: int = Field(default=0, ge=0)
+    rate_limit_interactive_reserve: float = Field(default=0.2, ge=0.0, lt=1.0)
+    gemini_max_retries: int = Field(default=3, ge=0)
+    gemini_interactive_deadline_seconds: float = Field(default=30.0, gt=0)
+    gemini_background_deadline_seconds: float = Field(default=300.0, gt=0)
+    gemini_hedge_enabled: bool = Field(default=False)
+    gemini_hedge_percentile: float = Field(default=0.95, gt=0.0, lt=1.0)
+    gemini_hedge_budget_ratio: float = Field(default=0.05, ge=0.0, le=1.0)
+    gemini_hedge_min_delay_seconds: float = Field(default=0.5, ge=0.0)
+    gemini_hedge_min_samples: int = Field(default=20, ge=1)
     embedding_model: str = Field(default="models/text-embedding-004")
+    embedding_cache_size: int = Field(default=4096, ge=0)
     vector_store_path: str = Field(default="./storage/vector_store")
     knowledge_base_collection: str = Field(default="dragon_funded_kb")
+    retrieval_mode: Literal["dense", "hybrid"] = Field(default="hybrid")
+    sparse_fast_path: bool = Field(default=True)
+    sparse_decisive_score: float = Field(default=0.5, ge=0.0, le=1.0)
+    sparse_decisive_margin: float = Field(default=1.15, ge=1.0)
+    rrf_k: int = Field(default=60, ge=1)
+    retrieval_top_k: int = Field(default=6, ge=1)
+    filtered_retrieval_top_k: int = Field(default=4, ge=1)
+    filtered_retrieval_min_results: int = Field(default=2, ge=1)
+    intent_max_results: int = Field(default=2, ge=1)
+    intent_secondary_min_ratio: float = Field(default=0.5, ge=0.0, le=1.0)
+    intent_extra_keywords: Dict[str, List[str]] = Field(default={})
+    prompt_token_budget: int = Field(default=1800, ge=1)
+    prompt_min_context_tokens: int = Field(default=300, ge=0)
     allowed_channels: List[str] = Field(default=["web", "mobile", "email", "whatsapp"])
     enable_episodic_memory: bool = Field(default=True)
+    memory_backend: Literal["memory", "sqlite"] = Field(default="memory")
+    memory_store_path: str = Field(default="./storage/conversation_memory.sqlite3")
+    memory_max_sessions: int = Field(default=10_000, ge=1)
+    memory_session_ttl_seconds: float = Field(default=86_400.0, gt=0)
+    memory_flush_interval_seconds: float = Field(default=0.25, gt=0)
+    memory_flush_batch_size: int = Field(default=128, ge=1)
+    max_concurrent_workflows: int = Field(default=32, ge=1)
+    ingest_split_workers: int = Field(default=0, ge=0)
+    ingest_window_size: int = Field(default=32, ge=1)
+    ingest_embed_batch_size: int = Field(default=64, ge=1)
+    ingest_embed_concurrency: int = Field(default=4, ge=1)
+    ingest_upsert_batch_size: int = Field(default=256, ge=1)
+    ingest_job_workers: int = Field(default=1, ge=1)
+    ingest_job_lease_seconds: float = Field(default=60.0, gt=0)
+    answer_cache_enabled: bool = Field(default=True)
+    answer_cache_size: int = Field(default=512, ge=1)
+    answer_cache_ttl_seconds: float = Field(default=3600.0, gt=0)
+    answer_cache_similarity: float = Field(default=0.93, ge=0.0, le=1.0)
+    summary_every_n_turns: int = Field(default=1, ge=1)
+    summary_min_transcript_chars: int = Field(default=0, ge=0)
+    summary_queue_size: int = Field(default=256, ge=1)
+    summary_workers: int = Field(default=2, ge=1)
+    debug_timings_header: str = Field(default="X-Debug-Timings")
+    request_id_header: str = Field(default="X-Request-ID")
+    warmup_on_startup: bool = Field(default=True)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,111 @@
+"""Warm read-only state in a pre-fork master so workers share it copy-on-write.
+
+``preload`` runs once in the server master before workers are forked
+(``gunicorn -c gunicorn.conf.py main:app``). It imports the workflow stack,
+initializes Chroma's modules on a throwaway in-memory client, parses the
+persisted BM25 index, compiles the intent matcher and freezes the garbage
+collector, so those pages stay shared between workers. It opens no sockets, database connections or
+threads; each worker still builds its own knowledge base, Gemini transport
+and memory backend during warm-up.
+"""
+
+from __future__ import annotations
+
+import gc
+import importlib
+import logging
+import os
+import sys
+
+from app.core.startup import get_startup_profile
+
+logger = logging.getLogger(__name__)
+
+# Modules whose import cost (LangChain, LangGraph, Chroma, the Gemini SDK) every worker
+# would repeat.
+PRELOAD_MODULES = (
+    "app.core.prompts",
+    "app.services.domain",
+    "app.services.intent",
+    "app.services.sparse",
+    "app.services.retrieval",
+    "app.services.llm",
+    "app.services.ingestion",
+    "app.services.jobs",
+    "app.workflows.dragon_funded_graph",
+)
+
+_preloaded = False
+
+
+def preload() -> None:
+    """Import and initialize everything workers can share; safe to call more than once."""
+    global _preloaded  # pylint: disable=global-statement
+    if _preloaded:
+        return
+    profile = get_startup_profile()
+    with profile.phase("preload_imports"):
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+    with profile.phase("preload_vector_store"):
+        _warm_chroma()
+    with profile.phase("preload_indexes"):
+        from app.services.intent import get_intent_classifier
+        from app.services.retrieval import preload_sparse_index
+
+        get_intent_classifier()
+        sparse_docs = preload_sparse_index()
+    # Objects created so far are never collected; keeping the collector off
+    # them stops it from writing to (and un-sharing) their pages in workers.
+    gc.freeze()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_after_fork)
+    _preloaded = True
+    logger.info(
+        "Preloaded shared state for workers (%s BM25 documents): %s",
+        sparse_docs,
+        profile.snapshot()["phases_ms"],
+    )
+
+
+def _warm_chroma() -> None:
+    """Load Chroma's lazily imported components without keeping a client open."""
+    # pylint: disable=import-outside-toplevel
+    import chromadb
+    from chromadb.api.client import SharedSystemClient
+    from chromadb.config import Settings as ChromaSettings
+
+    client = chromadb.EphemeralClient(settings=ChromaSettings(anonymized_telemetry=False))
+    try:
+        client.get_or_create_collection("prefork_warmup").count()
+    finally:
+        SharedSystemClient.clear_system_cache()
+        _stop_telemetry_client()
+
+
+def _stop_telemetry_client() -> None:
+    """Stop the consumer thread Chroma's telemetry client starts even when disabled.
+
+    The thread would not survive the fork; workers create their own client.
+    """
+    try:
+        import posthog  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return
+    if getattr(posthog, "default_client", None) is not None:
+        posthog.shutdown()
+        posthog.default_client = None
+
+
+def _after_fork() -> None:
+    """Drop process-bound state inherited from the master."""
+    get_startup_profile().restart_clock()
+    # gRPC channels and sqlite connections must not be shared across processes.
+    # Normally the master never built them; if it did, forget them without closing.
+    transport = sys.modules.get("app.services.transport")
+    if transport is not None:
+        transport.get_gemini_transport.cache_clear()
+    support = sys.modules.get("app.routers.support")
+    if support is not None:
+        for factory in (support.get_orchestrator, support.get_job_manager, support.get_kb):
+            factory.cache_clear()
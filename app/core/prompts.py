@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
 from textwrap import dedent
 from typing import Dict, Optional
@@ -205,6 +206,13 @@ INSTRUCTIONS_SECTION = PromptSection(
 )
 
 
+STATIC_PROMPT_PREFIX = "\n\n".join(
+    section.strip() for section in (SYSTEM_PROMPT, INSTRUCTIONS_SECTION.template)
+)
+# Identifies the static prefix so a server-side cache is only rebuilt when its text changes.
+STATIC_PROMPT_HASH = hashlib.sha256(STATIC_PROMPT_PREFIX.encode("utf-8")).hexdigest()
+
+
 def assemble_prompt(
     retrieved_chunks: str,
     session_summary: str,
@@ -220,19 +228,37 @@ def assemble_prompt(
         ),
         INSTRUCTIONS_SECTION.template,
     ]
+    sections.append(render_overrides(dynamic_overrides))
+    return "\n\n".join(section.strip() for section in sections if section.strip())
 
-    if dynamic_overrides:
-        sections.append(
-            dedent(
-                """
-                <dynamic_overrides>
-                {overrides}
-                </dynamic_overrides>
-                """
-            ).strip().format(
-                overrides="\n".join(f"- {k}: {v}" for k, v in dynamic_overrides.items())
-            )
-        )
 
+def assemble_turn_prompt(
+    retrieved_chunks: str,
+    session_summary: str,
+    latest_user_turn: str,
+    dynamic_overrides: Optional[Dict[str, str]] = None,
+) -> str:
+    """Combine only the per-turn sections, for use after ``STATIC_PROMPT_PREFIX``."""
+    sections = [
+        RETRIEVAL_SECTION.template.format(retrieved_chunks=retrieved_chunks),
+        MEMORY_SECTION.template.format(
+            session_summary=session_summary, latest_user_turn=latest_user_turn
+        ),
+    ]
+    sections.append(render_overrides(dynamic_overrides))
     return "\n\n".join(section.strip() for section in sections if section.strip())
 
+
+def render_overrides(dynamic_overrides: Optional[Dict[str, str]]) -> str:
+    """Render intent-specific overrides, or an empty string when there are none."""
+    if not dynamic_overrides:
+        return ""
+    return (
+        dedent("""
+        <dynamic_overrides>
+        {overrides}
+        </dynamic_overrides>
+        """)
+        .strip()
+        .format(overrides="\n".join(f"- {k}: {v}" for k, v in dynamic_overrides.items()))
+    )
@@ -0,0 +1,88 @@
+"""Readiness state and a phase-by-phase profile of API startup."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+
+from app import IMPORT_STARTED
+
+
+class StartupProfile:
+    """Whether the API has finished warming up, and how long each phase took.
+
+    ``started`` is the clock reading when the ``app`` package was first
+    imported, so the ``import`` phase covers the framework and router imports
+    that run before the application object exists.
+    """
+
+    def __init__(self, started: float) -> None:
+        self._started = started
+        self._lock = threading.Lock()
+        self._phases: Dict[str, float] = {}
+        self._status = "starting"
+        self._error: Optional[str] = None
+        self._ready_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once warm-up has completed successfully."""
+        return self._status == "ready"
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Store the duration of ``phase``."""
+        with self._lock:
+            self._phases[phase] = round(seconds * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the ``with`` block as phase ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def restart_clock(self) -> None:
+        """Measure from now, e.g. in a worker forked from a preloaded master."""
+        with self._lock:
+            self._started = time.perf_counter()
+            self._status = "starting"
+            self._error = None
+            self._ready_at = None
+
+    def mark_warming(self) -> None:
+        """Warm-up has started in the background."""
+        with self._lock:
+            self._status = "warming"
+
+    def mark_ready(self) -> None:
+        """Every component is built; requests will not pay for initialization."""
+        with self._lock:
+            self._status = "ready"
+            self._ready_at = time.perf_counter()
+
+    def mark_failed(self, exc: BaseException) -> None:
+        """Warm-up raised; the first request will retry the lazy initialization."""
+        with self._lock:
+            self._status = "failed"
+            self._error = f"{type(exc).__name__}: {exc}"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Status, phase durations and time to ready in milliseconds."""
+        with self._lock:
+            snapshot: Dict[str, Any] = {"status": self._status, "phases_ms": dict(self._phases)}
+            if self._ready_at is not None:
+                snapshot["ready_after_ms"] = round((self._ready_at - self._started) * 1000, 1)
+            if self._error:
+                snapshot["error"] = self._error
+        return snapshot
+
+
+@lru_cache
+def get_startup_profile() -> StartupProfile:
+    """Startup profile of this process."""
+    return StartupProfile(started=IMPORT_STARTED)
@@ -1,16 +1,112 @@
 """FastAPI entrypoint for the Prop Firm Dragon Funded customer support bot."""
 
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app import IMPORT_STARTED
 from app.core.config import get_settings
+from app.core.startup import StartupProfile, get_startup_profile
 from app.routers import support
-from app.utils.logger import configure_logging
+from app.services.memory import MemoryPersistError
+from app.services.metrics import CONTENT_TYPE, get_metrics
+from app.utils.logger import (
+    bind_correlation_id,
+    configure_logging,
+    new_correlation_id,
+    reset_correlation_id,
+    stop_logging,
+)
 
 logger = logging.getLogger(__name__)
 
+get_startup_profile().record("import", time.perf_counter() - IMPORT_STARTED)
+
+
+def _validate_config() -> None:
+    """Validate configuration on startup."""
+    try:
+        settings = get_settings()
+        if not settings.gemini_api_key or len(settings.gemini_api_key.strip()) == 0:
+            logger.error("GEMINI_API_KEY is not set or is empty!")
+            logger.error("Please set it as an environment variable or in a .env file")
+        else:
+            # Mask the API key for logging
+            masked_key = (
+                settings.gemini_api_key[:8] + "..." if len(settings.gemini_api_key) > 8 else "***"
+            )
+            logger.info("Gemini API key configured: %s", masked_key)
+            logger.info("Using model: %s", settings.gemini_model)
+            logger.info("Using embedding model: %s", settings.embedding_model)
+    except Exception as exc:
+        logger.error("Failed to load configuration: %s", exc)
+        logger.error("Make sure GEMINI_API_KEY is set in your environment or .env file")
+
+
+async def _resume_ingestion_jobs() -> None:
+    """Pick up ingestion jobs interrupted by the previous shutdown."""
+    try:
+        await support.get_job_manager().resume()
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("Failed to resume ingestion jobs: %s", exc)
+
+
+async def _warm_up(profile: StartupProfile) -> None:
+    """Build the workflow off the event loop so the first request does not pay for it."""
+    profile.mark_warming()
+    try:
+        await asyncio.to_thread(support.warm_up, profile)
+    except Exception as exc:  # pylint: disable=broad-except
+        profile.mark_failed(exc)
+        logger.error("Warm-up failed; components will be built on first use: %s", exc)
+        return
+    with profile.phase("resume_jobs"):
+        await _resume_ingestion_jobs()
+    profile.mark_ready()
+    logger.info("Startup profile: %s", profile.snapshot())
+
+
+async def _drain_background_work() -> None:
+    """Let queued background jobs finish before the process exits."""
+    if support.get_orchestrator.cache_info().currsize:
+        try:
+            await support.get_orchestrator().aclose()
+        except MemoryPersistError as exc:
+            logger.error("Conversation memory lost on shutdown: %s", exc)
+    if support.get_job_manager.cache_info().currsize:
+        await support.get_job_manager().stop()
+    from app.services.transport import get_gemini_transport
+
+    if get_gemini_transport.cache_info().currsize:
+        get_gemini_transport().close()
+    stop_logging()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Start warm-up without delaying the server from accepting connections; drain on exit."""
+    _validate_config()
+    profile = get_startup_profile()
+    warm_up = None
+    if get_settings().warmup_on_startup:
+        warm_up = asyncio.create_task(_warm_up(profile))
+    else:
+        await _resume_ingestion_jobs()
+        profile.mark_ready()
+    try:
+        yield
+    finally:
+        if warm_up is not None:
+            # Components under construction must exist before they can be closed.
+            await warm_up
+        await _drain_background_work()
+
 
 def create_app() -> FastAPI:
     """Instantiate and configure the FastAPI application."""
@@ -23,6 +119,7 @@ def create_app() -> FastAPI:
             "powered by retrieval-augmented generation and LangGraph workflows."
         ),
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # Add CORS middleware to allow all origins (including localhost:3000 and 3001)
@@ -37,35 +134,49 @@ def create_app() -> FastAPI:
     # Add middleware for request logging
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        """Log all incoming requests."""
-        logger.info("🌐 %s %s", request.method, request.url.path)
-        response = await call_next(request)
-        logger.info("📤 Response status: %d", response.status_code)
-        return response
-
-    @app.on_event("startup")
-    async def validate_config() -> None:
-        """Validate configuration on startup."""
+        """Tag the request's log records with a correlation id and record its latency by route."""
+        header = get_settings().request_id_header
+        correlation_id = (request.headers.get(header) or new_correlation_id())[:64]
+        token = bind_correlation_id(correlation_id)
         try:
-            settings = get_settings()
-            if not settings.gemini_api_key or len(settings.gemini_api_key.strip()) == 0:
-                logger.error("GEMINI_API_KEY is not set or is empty!")
-                logger.error("Please set it as an environment variable or in a .env file")
-            else:
-                # Mask the API key for logging
-                masked_key = settings.gemini_api_key[:8] + "..." if len(settings.gemini_api_key) > 8 else "***"
-                logger.info("Gemini API key configured: %s", masked_key)
-                logger.info("Using model: %s", settings.gemini_model)
-                logger.info("Using embedding model: %s", settings.embedding_model)
-        except Exception as exc:
-            logger.error("Failed to load configuration: %s", exc)
-            logger.error("Make sure GEMINI_API_KEY is set in your environment or .env file")
+            logger.debug("🌐 %s %s", request.method, request.url.path)
+            started = time.perf_counter()
+            response = await call_next(request)
+            elapsed = time.perf_counter() - started
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            get_metrics().http_seconds.observe(
+                elapsed, method=request.method, route=route, status=str(response.status_code)
+            )
+            response.headers[header] = correlation_id
+            logger.info(
+                "%s %s -> %d (%.1f ms)",
+                request.method,
+                request.url.path,
+                response.status_code,
+                elapsed * 1000,
+            )
+            return response
+        finally:
+            reset_correlation_id(token)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        """Prometheus scrape endpoint."""
+        return PlainTextResponse(get_metrics().render(), media_type=CONTENT_TYPE)
+
+    @app.get("/health", include_in_schema=False)
+    async def health() -> Dict[str, str]:
+        """Liveness probe; answers as soon as the server accepts connections."""
+        return {"status": "ok"}
+
+    @app.get("/ready", include_in_schema=False)
+    async def ready() -> JSONResponse:
+        """Readiness probe with the startup profile; 503 until warm-up has finished."""
+        profile = get_startup_profile()
+        return JSONResponse(profile.snapshot(), status_code=200 if profile.ready else 503)
 
     app.include_router(support.router, prefix="/api/v1")
     return app
 
 
 app = create_app()
-
-
-
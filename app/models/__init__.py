@@ -1,7 +1,9 @@
 """Expose shared schema models."""
 
 from .schemas import (
+    DocumentIngestionResult,
     IngestionDocument,
+    IngestionJob,
     IngestionResult,
     RetrievedDocument,
     SupportQuery,
@@ -10,7 +12,9 @@ from .schemas import (
 )
 
 __all__ = [
+    "DocumentIngestionResult",
     "IngestionDocument",
+    "IngestionJob",
     "IngestionResult",
     "RetrievedDocument",
     "SupportQuery",
@@ -4,10 +4,11 @@ from __future__ import annotations
 
 from datetime import datetime
 from uuid import uuid4
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
+from app.core.config import get_settings
 
 class RetrievedDocument(BaseModel):
     """Structure for retrieved knowledge base documents."""
@@ -19,12 +20,41 @@ class RetrievedDocument(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0)
     last_reviewed: Optional[datetime] = None
     provenance: Optional[str] = None
+    chunk_index: Optional[int] = None
+    score: Optional[float] = None
 
 
 class SupportRequest(BaseModel):
     """Minimal payload accepted from the client."""
 
     query: str = Field(..., min_length=1, description="End-user message text.")
+    conversation_id: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        max_length=128,
+        description="Id returned by a previous reply; omit to start a new conversation.",
+    )
+    user_id: Optional[str] = Field(default=None, max_length=128)
+    channel: str = Field(default="web", description="Surface the message came from.")
+
+    @field_validator("channel")
+    @classmethod
+    def _check_channel(cls, channel: str) -> str:
+        """Accept only channels enabled in settings."""
+        allowed = get_settings().allowed_channels
+        if channel not in allowed:
+            raise ValueError(f"channel must be one of: {', '.join(allowed)}")
+        return channel
+
+    def to_query(self) -> "SupportQuery":
+        """Internal representation of this turn.
+
+        A new conversation id is minted when none was sent.
+        """
+        query = SupportQuery(message=self.query.strip(), user_id=self.user_id, channel=self.channel)
+        if self.conversation_id:
+            query.conversation_id = self.conversation_id
+        return query
 
 
 class SupportQuery(BaseModel):
@@ -36,17 +66,28 @@ class SupportQuery(BaseModel):
     channel: str = "web"
     locale: str = "en-US"
 
+    @property
+    def memory_key(self) -> str:
+        """Conversation memory key, scoped to the user so one caller cannot read another's history.
+
+        The user id is length-prefixed, so no pair of ids can produce the same key.
+        """
+        owner = self.user_id or ""
+        return f"{len(owner)}:{owner}:{self.conversation_id}"
+
 
 class SupportResponse(BaseModel):
     """Customer-facing response."""
 
     reply: str
+    conversation_id: Optional[str] = None
     follow_up_questions: List[str] = Field(default_factory=list)
     suggested_actions: List[str] = Field(default_factory=list)
     confidence: float = Field(ge=0.0, le=1.0)
     sources: List[RetrievedDocument] = Field(default_factory=list)
     escalation_required: bool = False
     workflow_steps: List[str] = Field(default_factory=list)
+    node_timings_ms: Optional[Dict[str, float]] = None
 
 
 class IngestionDocument(BaseModel):
@@ -65,10 +106,37 @@ class IngestionDocument(BaseModel):
     source_url: Optional[str] = None
 
 
+class DocumentIngestionResult(BaseModel):
+    """Outcome of ingesting a single document."""
+
+    id: str
+    status: Literal["indexed", "unchanged", "failed"]
+    chunks_added: int = 0
+    chunks_removed: int = 0
+    error: Optional[str] = None
+
+
 class IngestionResult(BaseModel):
     """Return payload for ingestion operations."""
 
     indexed: int
     skipped: int
     detail: Optional[str] = None
+    documents: List[DocumentIngestionResult] = Field(default_factory=list)
+
 
+class IngestionJob(BaseModel):
+    """Status of a background ingestion job."""
+
+    id: str
+    status: Literal["queued", "running", "completed", "failed"]
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total_documents: int = 0
+    documents_done: int = 0
+    documents_failed: int = 0
+    chunks_embedded: int = 0
+    documents_per_second: Optional[float] = None
+    errors: List[str] = Field(default_factory=list)
+    result: Optional[IngestionResult] = None
@@ -2,71 +2,150 @@
 
 from __future__ import annotations
 
+import functools
+import importlib
+import json
 import logging
+import threading
 from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, TypeVar
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 
+from app.core.config import get_settings
+from app.core.startup import StartupProfile
 from app.models.schemas import (
     IngestionDocument,
-    IngestionResult,
-    SupportQuery,
+    IngestionJob,
     SupportRequest,
     SupportResponse,
 )
-from app.services.ingestion import IngestionPipeline
-from app.services.retrieval import DragonKnowledgeBase
-from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+from app.services.hedging import get_hedge_budget
+
+if TYPE_CHECKING:
+    # langchain, Chroma, LangGraph and the Gemini SDK load on first use (see ``warm_up``).
+    from app.services.jobs import IngestionJobManager
+    from app.services.retrieval import DragonKnowledgeBase
+    from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["dragon-funded-support"])
 
+T = TypeVar("T")
+_build_lock = threading.RLock()
+
+
+def _singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """``lru_cache`` for a factory that may be called from several threads at once.
+
+    Warm-up builds components on a worker thread while early requests resolve
+    the same dependencies; the lock makes them wait instead of building twice.
+    """
+    cached = lru_cache(factory)
+
+    @functools.wraps(factory)
+    def get() -> T:
+        if cached.cache_info().currsize:
+            return cached()
+        with _build_lock:
+            return cached()
+
+    get.cache_info = cached.cache_info  # type: ignore[attr-defined]
+    get.cache_clear = cached.cache_clear  # type: ignore[attr-defined]
+    return get
+
 
-@lru_cache
+@_singleton
 def get_kb() -> DragonKnowledgeBase:
     """Singleton knowledge base instance."""
+    from app.services.retrieval import DragonKnowledgeBase
+
     return DragonKnowledgeBase()
 
 
-@lru_cache
+@_singleton
 def get_orchestrator() -> DragonFundedOrchestrator:
     """Provide orchestrator instance."""
+    from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+
     return DragonFundedOrchestrator(kb=get_kb())
 
 
+@_singleton
+def get_job_manager() -> IngestionJobManager:
+    """Singleton background ingestion job manager."""
+    from app.services.ingestion import IngestionPipeline
+    from app.services.jobs import IngestionJobManager, IngestionJobStore
+
+    settings = get_settings()
+    store = IngestionJobStore(Path(settings.vector_store_path) / "ingestion_jobs.sqlite3")
+    return IngestionJobManager(
+        store=store,
+        pipeline_factory=lambda: IngestionPipeline(get_kb()),
+        workers=settings.ingest_job_workers,
+        lease_seconds=settings.ingest_job_lease_seconds,
+    )
+
+
+def warm_up(profile: StartupProfile) -> None:
+    """Import the workflow stack and build the shared components; blocks the calling thread."""
+    with profile.phase("import_workflow"):
+        for module in ("app.services.jobs", "app.workflows.dragon_funded_graph"):
+            importlib.import_module(module)
+    with profile.phase("init_knowledge_base"):
+        get_kb()
+    with profile.phase("init_orchestrator"):
+        get_orchestrator()
+    with profile.phase("init_job_manager"):
+        get_job_manager()
+
+
 @router.post("/support/query", response_model=SupportResponse)
-def handle_support_query(
+async def handle_support_query(
     payload: SupportRequest,
     request: Request,
     orchestrator: DragonFundedOrchestrator = Depends(get_orchestrator),
 ) -> SupportResponse:
     """Process an end-user support query."""
-    logger.info("=" * 80)
-    logger.info("📥 POST /api/v1/support/query - Request received")
-    logger.info("Query: %s", payload.query[:100] + "..." if len(payload.query) > 100 else payload.query)
-    logger.info("Client: %s", request.client.host if request.client else "unknown")
-    
+    logger.debug("=" * 80)
+    logger.debug("📥 POST /api/v1/support/query - Request received")
+    logger.debug(
+        "Query: %s", payload.query[:100] + "..." if len(payload.query) > 100 else payload.query
+    )
+    logger.debug("Client: %s", request.client.host if request.client else "unknown")
+
     try:
         if not payload.query.strip():
             logger.warning("Empty query received")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Message payload cannot be empty."
             )
-        
-        logger.info("Processing query through orchestrator...")
-        support_query = SupportQuery(message=payload.query.strip())
-        response = orchestrator.run(support_query)
-        
-        logger.info("✅ Query processed successfully")
-        logger.info("Response length: %d characters", len(response.reply))
-        logger.info("Confidence: %.2f", response.confidence)
-        logger.info("Sources found: %d", len(response.sources))
-        logger.info("Escalation required: %s", response.escalation_required)
-        logger.info("=" * 80)
-        
+
+        logger.debug("Processing query through orchestrator...")
+        support_query = payload.to_query()
+        response = await orchestrator.arun(support_query)
+        if not _wants_timings(request):
+            response.node_timings_ms = None
+
+        logger.debug("✅ Query processed successfully")
+        logger.debug("Response length: %d characters", len(response.reply))
+        logger.debug("Confidence: %.2f", response.confidence)
+        logger.debug("Sources found: %d", len(response.sources))
+        logger.debug("Escalation required: %s", response.escalation_required)
+        logger.debug("=" * 80)
+        logger.info(
+            "Answered query for conversation %s (confidence %.2f, %d sources, escalation %s)",
+            response.conversation_id,
+            response.confidence,
+            len(response.sources),
+            response.escalation_required,
+        )
+
         return response
-        
+
     except HTTPException:
         # Re-raise HTTP exceptions (they're intentional)
         raise
@@ -74,26 +153,127 @@ def handle_support_query(
         error_type = type(exc).__name__
         error_msg = str(exc)
         logger.exception("❌ ERROR processing query [%s]: %s", error_type, error_msg)
-        logger.error("Full traceback:", exc_info=True)
-        logger.info("=" * 80)
+        logger.debug("=" * 80)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {error_type} - {error_msg}",
         )
 
 
-@router.post("/knowledge/ingest", response_model=IngestionResult)
-def ingest_knowledge(
+@router.post("/support/query/stream")
+async def stream_support_query(
+    payload: SupportRequest,
+    request: Request,
+    orchestrator: DragonFundedOrchestrator = Depends(get_orchestrator),
+) -> StreamingResponse:
+    """Stream an answer as Server-Sent Events.
+
+    ``token`` events carry partial reply text, ``escalation`` fires once when the
+    handoff check trips, and ``complete`` carries the full ``SupportResponse``.
+    """
+    if not payload.query.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Message payload cannot be empty."
+        )
+
+    support_query = payload.to_query()
+    with_timings = _wants_timings(request)
+
+    async def event_source() -> AsyncIterator[str]:
+        try:
+            async for event, data in orchestrator.astream(support_query):
+                if event == "complete" and not with_timings:
+                    data["node_timings_ms"] = None
+                yield _format_sse(event, data)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("❌ ERROR streaming query [%s]: %s", type(exc).__name__, exc)
+            yield _format_sse("error", {"detail": f"Internal server error: {type(exc).__name__}"})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _wants_timings(request: Request) -> bool:
+    """Whether the caller asked for per-node durations via the debug header."""
+    value = request.headers.get(get_settings().debug_timings_header, "")
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post(
+    "/knowledge/ingest",
+    response_model=IngestionJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def ingest_knowledge(
     documents: list[IngestionDocument],
-) -> IngestionResult:
-    """Ingest FAQ or playbook documents into the knowledge base."""
-    kb = get_kb()
-    pipeline = IngestionPipeline(kb)
-    result = pipeline.run(documents)
-    if result.indexed == 0:
+    jobs: IngestionJobManager = Depends(get_job_manager),
+) -> IngestionJob:
+    """Queue FAQ or playbook documents for background ingestion."""
+    if not documents:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to ingest documents: {result.detail}",
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No documents provided."
+        )
+    return await jobs.submit(documents)
+
+
+@router.get("/knowledge/jobs/{job_id}", response_model=IngestionJob)
+async def get_ingestion_job(
+    job_id: str,
+    jobs: IngestionJobManager = Depends(get_job_manager),
+) -> IngestionJob:
+    """Report progress, throughput and errors for an ingestion job."""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Ingestion job not found."
         )
-    return result
+    return job
+
+
+@router.get("/diagnostics/memory")
+async def get_memory_stats(
+    orchestrator: DragonFundedOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, Any]:
+    """Session count, size and eviction metrics of conversation memory."""
+    return orchestrator.memory.stats
+
+
+@router.get("/diagnostics/transport")
+async def get_transport_stats() -> Dict[str, Any]:
+    """Connection pool metrics for the shared Gemini transport."""
+    from app.services.transport import get_gemini_transport
+
+    return get_gemini_transport().stats
+
+
+@router.get("/diagnostics/rate-limits")
+async def get_rate_limit_stats() -> Dict[str, Any]:
+    """Admission counters and remaining quota for the Gemini rate limiters."""
+    from app.services.rate_limit import get_embedding_limiter, get_generation_limiter
+
+    return {
+        "generation": get_generation_limiter().stats,
+        "embedding": get_embedding_limiter().stats,
+    }
+
+
+@router.get("/diagnostics/models")
+async def get_model_stats() -> Dict[str, Any]:
+    """Model routing decisions and per-model latency and token usage."""
+    from app.services.llm import get_model_router
+
+    return get_model_router().stats
+
 
+@router.get("/diagnostics/hedging")
+async def get_hedging_stats() -> Dict[str, Any]:
+    """How many Gemini calls were hedged and how often the duplicate answered first."""
+    return get_hedge_budget().stats
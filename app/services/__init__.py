@@ -1,13 +1,14 @@
 """Service layer exports."""
 
-from .llm import get_gemini_client
-
-__all__ = ["get_gemini_client"]
-
-
-
-
+from typing import Any
 
+__all__ = ["get_gemini_client", "get_model_router"]
 
 
+def __getattr__(name: str) -> Any:
+    # Resolved on first use so light services do not import the Gemini SDK.
+    if name in __all__:
+        from . import llm
 
+        return getattr(llm, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
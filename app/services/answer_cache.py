@@ -0,0 +1,175 @@
+"""Semantic answer cache for repeated Dragon Funded support questions."""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.models.schemas import SupportResponse
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class AnswerCacheProbe:
+    """Lookup keys computed for one user turn."""
+
+    normalized: str
+    intent: str
+    revision: int = 0
+    embedding: Optional[List[float]] = None
+    hit: Optional[SupportResponse] = None
+
+
+@dataclass
+class _CacheEntry:
+    """Stored answer plus the keys it can be matched by."""
+
+    intent: str
+    embedding: Optional[np.ndarray]
+    response: SupportResponse
+    expires_at: float
+
+
+class AnswerCache:
+    """TTL- and size-bounded cache of ``SupportResponse`` objects.
+
+    Answers match on normalized question text, or on query-embedding cosine
+    similarity above ``similarity_threshold`` when the classified intent agrees.
+    Entries are tied to the knowledge-base revision recorded in the shared
+    manifest, so a write from any process drops the whole cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.93,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._revision: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Canonical form used for exact matching."""
+        text = _NON_WORD.sub(" ", text.lower())
+        return _WHITESPACE.sub(" ", text).strip()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters since process start."""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+    def get_exact(self, probe: AnswerCacheProbe, revision: int) -> Optional[SupportResponse]:
+        """Return a cached answer for the identical normalized question."""
+        with self._lock:
+            self._sync_revision(revision)
+            entry = self._entries.get(probe.normalized)
+            if entry is None or entry.expires_at < time.monotonic():
+                return None
+            self._entries.move_to_end(probe.normalized)
+            self._stats["exact_hits"] += 1
+            return entry.response.model_copy(deep=True)
+
+    def get_similar(self, probe: AnswerCacheProbe, revision: int) -> Optional[SupportResponse]:
+        """Return the closest cached answer with the same intent, if close enough.
+
+        Scores every cached answer of that intent with one matrix product,
+        computed outside the lock; numpy releases the GIL while it runs.
+        """
+        if probe.embedding is None:
+            return None
+        query = _unit(probe.embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_revision(revision)
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry.intent == probe.intent
+                and entry.embedding is not None
+                and entry.embedding.shape == query.shape
+                and entry.expires_at >= now
+            ]
+        best = None
+        if candidates:
+            scores = np.stack([entry.embedding for _, entry in candidates]) @ query
+            index = int(np.argmax(scores))
+            if scores[index] >= self._similarity_threshold:
+                best = candidates[index]
+        with self._lock:
+            # The entry may have been replaced or invalidated while scoring.
+            if best is None or self._entries.get(best[0]) is not best[1]:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best[0])
+            self._stats["semantic_hits"] += 1
+            return best[1].response.model_copy(deep=True)
+
+    def record_miss(self) -> None:
+        """Count a lookup that ended without scoring, such as one without a query vector."""
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def put(self, probe: AnswerCacheProbe, response: SupportResponse, revision: int) -> None:
+        """Store an answer, evicting expired and then least recently used entries."""
+        now = time.monotonic()
+        with self._lock:
+            self._sync_revision(revision)
+            self._entries[probe.normalized] = _CacheEntry(
+                intent=probe.intent,
+                embedding=_unit(probe.embedding) if probe.embedding is not None else None,
+                response=response.model_copy(deep=True),
+                expires_at=now + self._ttl_seconds,
+            )
+            self._entries.move_to_end(probe.normalized)
+            if len(self._entries) > self._max_entries:
+                for key in [key for key, entry in self._entries.items() if entry.expires_at < now]:
+                    del self._entries[key]
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def _sync_revision(self, revision: int) -> None:
+        """Invalidate when the knowledge base has changed since entries were stored."""
+        if self._revision != revision:
+            if self._entries:
+                logger.info(
+                    "Knowledge base changed; dropping %s cached answers.", len(self._entries)
+                )
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._revision = revision
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    """Scale a vector to unit length so cosine similarity is a dot product."""
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
@@ -0,0 +1,150 @@
+"""Token-budgeted packing of retrieved knowledge into the prompt."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.models.schemas import RetrievedDocument
+
+# Gemini tokenizes English prose at roughly four characters per token.
+CHARS_PER_TOKEN = 4.0
+# Splitter overlap is 75 characters; allow some slack for separator trimming.
+MAX_OVERLAP_CHARS = 120
+# Shorter shared runs are more likely coincidence than splitter overlap.
+MIN_OVERLAP_CHARS = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local approximation of the model's token count."""
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+@dataclass
+class Passage:
+    """One or more adjacent chunks of a document merged into a single excerpt."""
+
+    document: RetrievedDocument
+    text: str
+    score: float
+    rank: int
+    chunk_indexes: List[int] = field(default_factory=list)
+
+
+@dataclass
+class PackedContext:
+    """Knowledge section text plus what went into it."""
+
+    text: str
+    tokens: int
+    chunks_in: int
+    passages: List[Passage] = field(default_factory=list)
+    dropped: int = 0
+
+
+def pack_context(docs: List[RetrievedDocument], budget_tokens: int) -> PackedContext:
+    """Deduplicate, merge and greedily pack retrieved chunks by score into ``budget_tokens``.
+
+    ``docs`` are expected in ranking order; that order breaks score ties.
+    """
+    passages = _merge_passages(_dedupe(docs))
+    passages.sort(key=lambda passage: (-passage.score, passage.rank))
+
+    packed: List[Passage] = []
+    rendered: List[str] = []
+    used = 0
+    for passage in passages:
+        block = render_passage(passage)
+        cost = estimate_tokens(block) + 1
+        if used + cost > budget_tokens:
+            continue
+        packed.append(passage)
+        rendered.append(block)
+        used += cost
+
+    if not packed and passages:
+        # Nothing fits whole; keep the best passage cut down to the budget.
+        best = passages[0]
+        overhead = estimate_tokens(
+            render_passage(Passage(best.document, "", best.score, best.rank))
+        )
+        keep_chars = int(max(0, budget_tokens - overhead) * CHARS_PER_TOKEN)
+        best.text = _truncate(best.text, keep_chars)
+        packed.append(best)
+        rendered.append(render_passage(best))
+        used = estimate_tokens(rendered[0])
+
+    return PackedContext(
+        text="\n".join(rendered),
+        tokens=used,
+        chunks_in=len(docs),
+        passages=packed,
+        dropped=len(passages) - len(packed),
+    )
+
+
+def render_passage(passage: Passage) -> str:
+    """Compact prompt form of a passage."""
+    doc = passage.document
+    source = f" source='{doc.provenance}'" if doc.provenance else ""
+    return f"<doc title='{doc.title}'{source}>\n{passage.text}\n</doc>"
+
+
+def _dedupe(docs: List[RetrievedDocument]) -> List[Tuple[RetrievedDocument, float, int]]:
+    """Drop repeated chunks, keeping the first (best ranked) copy with its score and rank."""
+    seen = set()
+    unique: List[Tuple[RetrievedDocument, float, int]] = []
+    for rank, doc in enumerate(docs):
+        key = (doc.id, doc.chunk_index) if doc.chunk_index is not None else None
+        digest = hashlib.sha1(doc.content.strip().encode("utf-8")).hexdigest()
+        if key in seen or digest in seen:
+            continue
+        seen.update(item for item in (key, digest) if item is not None)
+        score = doc.score if doc.score is not None else 1.0 / (rank + 1)
+        unique.append((doc, score, rank))
+    return unique
+
+
+def _merge_passages(docs: List[Tuple[RetrievedDocument, float, int]]) -> List[Passage]:
+    """Join chunks of the same document whose indexes are consecutive."""
+    by_document: Dict[str, List[Tuple[RetrievedDocument, float, int]]] = {}
+    passages: List[Passage] = []
+    for doc, score, rank in docs:
+        if doc.chunk_index is None:
+            passages.append(Passage(doc, doc.content.strip(), score, rank))
+        else:
+            by_document.setdefault(doc.id, []).append((doc, score, rank))
+
+    for chunks in by_document.values():
+        chunks.sort(key=lambda item: item[0].chunk_index)
+        current: Optional[Passage] = None
+        for doc, score, rank in chunks:
+            if current is not None and doc.chunk_index == current.chunk_indexes[-1] + 1:
+                current.text = _join_overlapping(current.text, doc.content.strip())
+                current.score = max(current.score, score)
+                current.rank = min(current.rank, rank)
+                current.chunk_indexes.append(doc.chunk_index)
+                continue
+            current = Passage(doc, doc.content.strip(), score, rank, [doc.chunk_index])
+            passages.append(current)
+    return passages
+
+
+def _join_overlapping(left: str, right: str) -> str:
+    """Concatenate two neighbouring chunks, removing the text they share."""
+    for size in range(min(len(left), len(right), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left}\n{right}"
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Cut text at a whitespace boundary."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars].rstrip() + " …"
@@ -0,0 +1,239 @@
+"""Persistent embedding cache for Dragon Funded knowledge retrieval."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from langchain_core.embeddings import Embeddings
+
+from app.services.context_packing import estimate_tokens
+from app.services.rate_limit import GeminiRateLimiter, Priority, is_quota_error, retry_delay
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+T = TypeVar("T")
+
+
+class CachedEmbeddings(Embeddings):
+    """Embedding function that reuses vectors keyed by (model, sha256(text)).
+
+    Lookups go through an in-process LRU first, then a SQLite table of float32
+    blobs, and only then to the wrapped embedding API. Query and document
+    embeddings are cached separately because the API embeds them with
+    different task types. Rows written by any other model are purged on open.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        model: str,
+        cache_path: Path,
+        lru_size: int = 4096,
+    ) -> None:
+        self._inner = inner
+        self._model = model
+        self._lru_size = lru_size
+        self._lru: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self._conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, kind TEXT NOT NULL, text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, kind, text_hash))"
+        )
+        purged = self._conn.execute("DELETE FROM embeddings WHERE model != ?", (model,)).rowcount
+        self._conn.commit()
+        if purged:
+            logger.info("Embedding model changed to %s; purged %s cached vectors.", model, purged)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters since process start."""
+        with self._lock:
+            return dict(self._stats, memory_entries=len(self._lru))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, calling the API only for uncached texts."""
+        return self._embed_many("document", texts, self._inner.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query, reusing a cached vector when available."""
+        return self._embed_many(
+            "query", [text], lambda missing: [self._inner.embed_query(missing[0])]
+        )[0]
+
+    def cached_query(self, text: str) -> Optional[List[float]]:
+        """The cached query vector for ``text``, or ``None``; never calls the API."""
+        key = ("query", hashlib.sha256(text.encode("utf-8")).hexdigest())
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return vector
+            vector = self._load("query", {key[1]}).get(key[1])
+            if vector is not None:
+                self._remember(key, vector)
+                self._stats["disk_hits"] += 1
+            return vector
+
+    def _embed_many(
+        self, kind: str, texts: List[str], compute: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """Resolve vectors from memory, then disk, then the wrapped embedder."""
+        hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+
+        with self._lock:
+            for idx, text_hash in enumerate(hashes):
+                cached = self._lru.get((kind, text_hash))
+                if cached is not None:
+                    self._lru.move_to_end((kind, text_hash))
+                    vectors[idx] = cached
+                    self._stats["memory_hits"] += 1
+
+            pending = {hashes[idx] for idx, vector in enumerate(vectors) if vector is None}
+            if pending:
+                loaded = self._load(kind, pending)
+                for text_hash, vector in loaded.items():
+                    self._remember((kind, text_hash), vector)
+                for idx, text_hash in enumerate(hashes):
+                    if vectors[idx] is None and text_hash in loaded:
+                        vectors[idx] = loaded[text_hash]
+                        self._stats["disk_hits"] += 1
+
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors  # type: ignore[return-value]
+
+        # Embed each distinct missing text once.
+        unique: Dict[str, int] = {}
+        for idx in missing:
+            unique.setdefault(hashes[idx], idx)
+        computed = compute([texts[idx] for idx in unique.values()])
+
+        with self._lock:
+            self._stats["misses"] += len(missing)
+            fresh = dict(zip(unique.keys(), computed))
+            self._store(kind, fresh)
+            for text_hash, vector in fresh.items():
+                self._remember((kind, text_hash), vector)
+        for idx in missing:
+            vectors[idx] = fresh[hashes[idx]]
+        return vectors  # type: ignore[return-value]
+
+    def _remember(self, key: CacheKey, vector: List[float]) -> None:
+        """Insert into the LRU front, evicting the least recently used entry."""
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._lru_size:
+            self._lru.popitem(last=False)
+
+    def _load(self, kind: str, hashes: Set[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given text hashes."""
+        found: Dict[str, List[float]] = {}
+        ordered = list(hashes)
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(ordered), 500):
+            batch = ordered[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                "SELECT text_hash, vector FROM embeddings"
+                f" WHERE model = ? AND kind = ? AND text_hash IN ({placeholders})",
+                (self._model, kind, *batch),
+            )
+            for text_hash, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[text_hash] = vector.tolist()
+        return found
+
+    def _store(self, kind: str, vectors: Dict[str, List[float]]) -> None:
+        """Write freshly computed vectors as float32 blobs."""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, kind, text_hash, vector)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (self._model, kind, text_hash, array("f", vector).tobytes())
+                for text_hash, vector in vectors.items()
+            ],
+        )
+        self._conn.commit()
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Embedding function that schedules every API call through a rate limiter.
+
+    Document batches only happen during ingestion and are admitted at
+    ``Priority.INGESTION``; query embeddings serve live turns and are
+    admitted as ``Priority.INTERACTIVE``. Quota and availability errors are
+    retried with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        limiter: GeminiRateLimiter,
+        batch_size: int = 100,
+        max_retries: int = 3,
+        interactive_deadline_seconds: float = 30.0,
+        background_deadline_seconds: float = 300.0,
+    ) -> None:
+        self._inner = inner
+        self._limiter = limiter
+        self._batch_size = batch_size
+        self._max_retries = max_retries
+        self._deadlines = {
+            Priority.INTERACTIVE: interactive_deadline_seconds,
+            Priority.INGESTION: background_deadline_seconds,
+        }
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents as background ingestion work."""
+        # The wrapped client splits large inputs into several batch requests.
+        requests = max(1, math.ceil(len(texts) / self._batch_size))
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return self._call(
+            lambda: self._inner.embed_documents(texts), Priority.INGESTION, requests, tokens
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query ahead of background work."""
+        return self._call(
+            lambda: self._inner.embed_query(text), Priority.INTERACTIVE, 1, estimate_tokens(text)
+        )
+
+    def _call(self, func: Callable[[], T], priority: Priority, requests: int, tokens: int) -> T:
+        """Admit, run and retry one embedding call."""
+        deadline = time.monotonic() + self._deadlines[priority]
+        attempt = 0
+        while True:
+            for _ in range(requests):
+                self._limiter.acquire_sync(max(1, tokens // requests), priority, deadline)
+            try:
+                return func()
+            except Exception as exc:  # pylint: disable=broad-except
+                delay = retry_delay(exc, attempt, deadline, self._max_retries)
+                if delay is None:
+                    raise
+                if is_quota_error(exc):
+                    self._limiter.throttle(delay)
+                logger.warning(
+                    "Embedding call failed [%s]; retrying in %.2fs", type(exc).__name__, delay
+                )
+                attempt += 1
+                time.sleep(delay)
@@ -0,0 +1,117 @@
+"""Hedged Gemini requests: a duplicate call when the first is slower than usual."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import get_settings
+
+
+class HedgeBudget:
+    """Process-wide cap on duplicate requests as a fraction of eligible calls.
+
+    Every eligible call earns ``ratio`` of a hedge and each hedge spends one,
+    so over time at most ``ratio`` extra requests are sent; ``burst`` bounds
+    how many unspent hedges can accumulate during quiet periods.
+    """
+
+    def __init__(self, ratio: float = 0.05, burst: float = 5.0) -> None:
+        self._ratio = ratio
+        self._burst = burst
+        self._balance = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"eligible": 0, "hedged": 0, "hedge_wins": 0, "denied": 0}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hedge counters and the share of hedges that answered first."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["balance"] = round(self._balance, 3)
+        stats["extra_request_ratio"] = (
+            round(stats["hedged"] / stats["eligible"], 4) if stats["eligible"] else 0.0
+        )
+        stats["win_rate"] = (
+            round(stats["hedge_wins"] / stats["hedged"], 4) if stats["hedged"] else None
+        )
+        return stats
+
+    def earn(self) -> None:
+        """Credit the budget for one eligible call."""
+        with self._lock:
+            self._stats["eligible"] += 1
+            self._balance = min(self._burst, self._balance + self._ratio)
+
+    def spend(self) -> bool:
+        """Take one hedge from the budget; False when it is exhausted."""
+        with self._lock:
+            if self._balance < 1.0:
+                self._stats["denied"] += 1
+                return False
+            self._balance -= 1.0
+            self._stats["hedged"] += 1
+            return True
+
+    def refund(self) -> None:
+        """Return a hedge taken by ``spend`` that was not sent after all."""
+        with self._lock:
+            self._balance = min(self._burst, self._balance + 1.0)
+            self._stats["hedged"] -= 1
+            self._stats["denied"] += 1
+
+    def record_win(self) -> None:
+        """Count a hedge that returned before the original call."""
+        with self._lock:
+            self._stats["hedge_wins"] += 1
+
+
+class HedgePolicy:
+    """When one client should send a duplicate request.
+
+    The trigger is ``percentile`` of the client's recent call latencies, never
+    below ``min_delay_seconds``. Until ``min_samples`` latencies have been seen
+    no hedges are sent.
+    """
+
+    def __init__(
+        self,
+        budget: HedgeBudget,
+        percentile: float = 0.95,
+        min_delay_seconds: float = 0.5,
+        min_samples: int = 20,
+        window: int = 512,
+    ) -> None:
+        self._budget = budget
+        self._percentile = percentile
+        self._min_delay = min_delay_seconds
+        self._min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def budget(self) -> HedgeBudget:
+        """The shared budget hedges are drawn from."""
+        return self._budget
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging the next call, or ``None`` to not hedge."""
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        trigger = ordered[min(len(ordered) - 1, int(self._percentile * len(ordered)))]
+        return max(self._min_delay, trigger)
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a completed call."""
+        with self._lock:
+            self._latencies.append(latency)
+
+
+@lru_cache
+def get_hedge_budget() -> HedgeBudget:
+    """Budget shared by every Gemini client in the process."""
+    return HedgeBudget(ratio=get_settings().gemini_hedge_budget_ratio)
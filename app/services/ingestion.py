@@ -3,38 +3,243 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable
-
-from app.models.schemas import IngestionDocument, IngestionResult
-from app.services.retrieval import DragonKnowledgeBase
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.core.config import get_settings
+from app.models.schemas import DocumentIngestionResult, IngestionDocument, IngestionResult
+from app.services.retrieval import DragonKnowledgeBase, KnowledgeChunk, split_document
 
 logger = logging.getLogger(__name__)
 
 
-class IngestionPipeline:
-    """Handles preprocessing and indexing operations."""
-
-    def __init__(self, kb: DragonKnowledgeBase) -> None:
-        self._kb = kb
-
-    def run(self, documents: Iterable[IngestionDocument]) -> IngestionResult:
-        """Execute the ingestion pipeline."""
-        docs = list(documents)
-        if not docs:
-            logger.info("No documents supplied to ingestion pipeline.")
-            return IngestionResult(indexed=0, skipped=0, detail="No documents provided.")
-
-        try:
-            self._kb.ingest(docs)
-            return IngestionResult(indexed=len(docs), skipped=0)
-        except Exception as exc:  # pylint: disable=broad-except
-            logger.exception("Ingestion failed: %s", exc)
-            return IngestionResult(indexed=0, skipped=len(docs), detail=str(exc))
-
+@dataclass
+class IngestionProgress:
+    """Running totals reported after each window of documents."""
 
+    documents_done: int = 0
+    documents_failed: int = 0
+    chunks_embedded: int = 0
+    chunks_removed: int = 0
+    elapsed_seconds: float = 0.0
 
 
+ProgressCallback = Callable[[IngestionProgress], None]
 
 
+class IngestionPipeline:
+    """Streams documents through split, embed and upsert stages.
+
+    Documents are consumed in windows so arbitrarily large inputs never sit in
+    memory at once. Within a window, splitting fans out to a process pool
+    (spawned, not forked: the server holds gRPC channels and worker threads),
+    embedding runs as fixed-size batches on a bounded thread pool, and Chroma
+    writes are chunked. Only the writes hold the store's cross-process lock.
+    A failing document is reported and skipped without affecting the rest of
+    the run.
+    """
+
+    def __init__(
+        self,
+        kb: DragonKnowledgeBase,
+        split_workers: Optional[int] = None,
+        window_size: Optional[int] = None,
+        embed_batch_size: Optional[int] = None,
+        embed_concurrency: Optional[int] = None,
+        upsert_batch_size: Optional[int] = None,
+    ) -> None:
+        settings = get_settings()
+        self._kb = kb
+        workers = settings.ingest_split_workers if split_workers is None else split_workers
+        self._split_workers = workers or os.cpu_count() or 1
+        self._window_size = window_size or settings.ingest_window_size
+        self._embed_batch_size = embed_batch_size or settings.ingest_embed_batch_size
+        self._embed_concurrency = embed_concurrency or settings.ingest_embed_concurrency
+        self._upsert_batch_size = upsert_batch_size or settings.ingest_upsert_batch_size
+
+    def run(
+        self,
+        documents: Iterable[IngestionDocument],
+        progress: Optional[ProgressCallback] = None,
+    ) -> IngestionResult:
+        """Execute the ingestion pipeline."""
+        results: List[DocumentIngestionResult] = []
+        totals = IngestionProgress()
+        started = time.perf_counter()
+        split_pool: Optional[ProcessPoolExecutor] = None
 
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self._embed_concurrency, thread_name_prefix="ingest-embed"
+            ) as embed_pool:
+                for window in _windows(documents, self._window_size):
+                    if split_pool is None and len(window) > 1 and self._split_workers > 1:
+                        split_pool = ProcessPoolExecutor(
+                            max_workers=self._split_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+
+                    results.extend(self._process_window(window, split_pool, embed_pool, totals))
+
+                    totals.elapsed_seconds = time.perf_counter() - started
+                    logger.info(
+                        "Ingestion progress: %s documents done, %s failed, %s chunks embedded"
+                        " (%.1fs)",
+                        totals.documents_done,
+                        totals.documents_failed,
+                        totals.chunks_embedded,
+                        totals.elapsed_seconds,
+                    )
+                    if progress is not None:
+                        progress(replace(totals))
+        finally:
+            if split_pool is not None:
+                split_pool.shutdown(cancel_futures=True)
+
+        if not results:
+            logger.info("No documents supplied to ingestion pipeline.")
+            return IngestionResult(indexed=0, skipped=0, detail="No documents provided.")
 
+        failed = [result for result in results if result.status == "failed"]
+        detail = None
+        if failed:
+            detail = f"{len(failed)} of {len(results)} documents failed: " + "; ".join(
+                f"{result.id}: {result.error}" for result in failed[:5]
+            )
+        return IngestionResult(
+            indexed=len(results) - len(failed),
+            skipped=len(failed),
+            detail=detail,
+            documents=results,
+        )
+
+    def _process_window(
+        self,
+        window: List[IngestionDocument],
+        split_pool: Optional[Executor],
+        embed_pool: Executor,
+        totals: IngestionProgress,
+    ) -> List[DocumentIngestionResult]:
+        """Split and embed one window of documents, then upsert it under the store lock.
+
+        Splitting and the embedding round-trips run without the lock, against
+        the indexes as last persisted. Each document is planned again under
+        the lock, so only chunks the manifest still has not seen are written,
+        and a chunk another process dropped meanwhile is embedded then (or
+        served from the embedding cache).
+        """
+        outcomes: Dict[int, DocumentIngestionResult] = {}
+        chunked: Dict[int, List[KnowledgeChunk]] = {}
+        self._kb.refresh()
+
+        for position, (doc, chunks) in enumerate(zip(window, self._split(window, split_pool))):
+            if isinstance(chunks, Exception):
+                outcomes[position] = _failure(doc.id, chunks)
+            else:
+                chunked[position] = chunks
+
+        # Queue every embedding batch in the window before waiting on any of them.
+        batches: Dict[int, Tuple[List[KnowledgeChunk], List[Future]]] = {}
+        for position, chunks in chunked.items():
+            try:
+                new_chunks = self._kb.plan_document(window[position].id, chunks).new_chunks
+            except Exception as exc:  # pylint: disable=broad-except
+                outcomes[position] = _failure(window[position].id, exc)
+                continue
+            texts = [chunk.text for chunk in new_chunks]
+            batches[position] = (
+                new_chunks,
+                [
+                    embed_pool.submit(
+                        self._kb.embeddings.embed_documents,
+                        texts[start : start + self._embed_batch_size],
+                    )
+                    for start in range(0, len(texts), self._embed_batch_size)
+                ],
+            )
+
+        embedded: Dict[int, Dict[str, List[float]]] = {}
+        for position, (new_chunks, futures) in batches.items():
+            try:
+                vectors = [vector for future in futures for vector in future.result()]
+            except Exception as exc:  # pylint: disable=broad-except
+                outcomes[position] = _failure(window[position].id, exc)
+                continue
+            embedded[position] = {chunk.id: vector for chunk, vector in zip(new_chunks, vectors)}
+
+        # One lock per window, so other processes can write between windows.
+        with self._kb.writing():
+            for position, vectors_by_id in embedded.items():
+                try:
+                    plan = self._kb.plan_document(window[position].id, chunked[position])
+                    missing = [chunk for chunk in plan.new_chunks if chunk.id not in vectors_by_id]
+                    if missing:
+                        texts = [chunk.text for chunk in missing]
+                        vectors = self._kb.embeddings.embed_documents(texts)
+                        vectors_by_id.update(zip([chunk.id for chunk in missing], vectors))
+                    vectors = [vectors_by_id[chunk.id] for chunk in plan.new_chunks]
+                    self._kb.apply_plan(plan, vectors, batch_size=self._upsert_batch_size)
+                except Exception as exc:  # pylint: disable=broad-except
+                    outcomes[position] = _failure(window[position].id, exc)
+                    continue
+                removed = len(plan.stale_ids) + len(plan.legacy_ids)
+                totals.chunks_embedded += len(plan.new_chunks)
+                totals.chunks_removed += removed
+                outcomes[position] = DocumentIngestionResult(
+                    id=plan.document_id,
+                    status="indexed" if plan.new_chunks or removed else "unchanged",
+                    chunks_added=len(plan.new_chunks),
+                    chunks_removed=removed,
+                )
+            self._kb.persist_indexes()
+
+        ordered = [outcomes[position] for position in range(len(window))]
+        for result in ordered:
+            if result.status == "failed":
+                totals.documents_failed += 1
+            else:
+                totals.documents_done += 1
+        return ordered
+
+    def _split(
+        self, window: List[IngestionDocument], split_pool: Optional[Executor]
+    ) -> List[Union[List[KnowledgeChunk], Exception]]:
+        """Chunk every document in the window, in worker processes when available."""
+        if split_pool is None:
+            return [_capture(self._kb.chunk_document, doc) for doc in window]
+
+        futures = [split_pool.submit(split_document, doc) for doc in window]
+        return [_capture(future.result) for future in futures]
+
+
+def _windows(
+    documents: Iterable[IngestionDocument], size: int
+) -> Iterator[List[IngestionDocument]]:
+    """Yield consecutive lists of at most ``size`` documents."""
+    iterator = iter(documents)
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+
+def _capture(func: Callable, *args):
+    """Call ``func`` and return its exception instead of raising it."""
+    try:
+        return func(*args)
+    except Exception as exc:  # pylint: disable=broad-except
+        return exc
+
+
+def _failure(document_id: str, exc: Exception) -> DocumentIngestionResult:
+    """Log and describe a document that could not be ingested."""
+    logger.error("Ingestion failed for document %s: %s", document_id, exc, exc_info=exc)
+    return DocumentIngestionResult(
+        id=document_id, status="failed", error=f"{type(exc).__name__}: {exc}"
+    )
@@ -0,0 +1,225 @@
+"""Keyword intent classification with a compiled Aho–Corasick matcher.
+
+All keywords of all intents are compiled into one automaton, so a message is
+scanned once regardless of vocabulary size. Keywords only match whole words:
+``link`` matches "link" and "links" but not "unlinked". A trailing ``*``
+marks a stem that may be followed by further letters (``withdraw*`` matches
+"withdrawal" and "withdrawing"). Multi-word keywords match across any run of
+whitespace.
+
+An intent scores one point per distinct keyword word it matched, so phrases
+such as "daily loss" outweigh a single generic word. Intents are ranked by
+score, ties keeping vocabulary order.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "challenge_rules": ["challenge", "phase", "rule", "drawdown", "news", "daily loss"],
+    "kyc": ["kyc", "verification", "identity", "passport", "compliance"],
+    "withdrawal": ["withdraw*", "payout", "bank", "usdt", "payment"],
+    "referral": ["referral", "affiliate", "commission", "link"],
+    "dragon_club": ["dragon club", "trustpilot", "review*", "video", "social"],
+}
+
+GENERAL_INTENT = "general"
+STEM_MARKER = "*"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase ``text`` and collapse whitespace, as keywords are compiled."""
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    """An intent found in a message, with its score and the keywords that matched."""
+
+    intent: str
+    score: float
+    keywords: Tuple[str, ...]
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton reporting every occurrence of a set of keywords in one pass.
+
+    Failure links are folded into a full transition table when the automaton
+    is built, so scanning costs one dictionary lookup per character.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords: List[str] = []
+        self._delta: List[Dict[str, int]] = [{}]
+        self._output: List[Tuple[int, ...]] = [()]
+        for keyword in dict.fromkeys(keywords):
+            if keyword:
+                self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            nxt = self._delta[state].get(char)
+            if nxt is None:
+                nxt = len(self._delta)
+                self._delta[state][char] = nxt
+                self._delta.append({})
+                self._output.append(())
+            state = nxt
+        self._output[state] += (len(self.keywords),)
+        self.keywords.append(keyword)
+
+    def _link(self) -> None:
+        """Breadth-first over the trie, inheriting each state's failure transitions and outputs."""
+        fail = [0] * len(self._delta)
+        trie = [dict(edges) for edges in self._delta]
+        queue = deque(trie[0].values())
+        while queue:
+            state = queue.popleft()
+            # Characters without a trie edge go wherever the failure state goes.
+            self._delta[state] = {**self._delta[fail[state]], **trie[state]}
+            for char, nxt in trie[state].items():
+                queue.append(nxt)
+                fail[nxt] = self._delta[fail[state]].get(char, 0) if state else 0
+                self._output[nxt] += self._output[fail[nxt]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(start, end, keyword index)`` for every occurrence in ``text``."""
+        delta, output, keywords = self._delta, self._output, self.keywords
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for index in output[state]:
+                    yield end - len(keywords[index]), end, index
+
+
+class _CompiledVocabulary:
+    """Automaton plus, per keyword, the intents it votes for; immutable once built."""
+
+    def __init__(self, vocabulary: Mapping[str, Tuple[str, ...]]) -> None:
+        self.order = {intent: rank for rank, intent in enumerate(vocabulary)}
+        # keyword text -> (is stem, word count, intents)
+        entries: Dict[str, Tuple[bool, int, List[str]]] = {}
+        for intent, keywords in vocabulary.items():
+            for raw in keywords:
+                stem = raw.endswith(STEM_MARKER)
+                text = normalize_text(raw.rstrip(STEM_MARKER))
+                if not text:
+                    continue
+                entry = entries.setdefault(text, (stem, len(text.split(" ")), []))
+                if intent not in entry[2]:
+                    entry[2].append(intent)
+        self.automaton = KeywordAutomaton(entries)
+        self.entries = [entries[keyword] for keyword in self.automaton.keywords]
+
+    def match(self, text: str) -> Dict[str, Dict[str, int]]:
+        """Intent -> {matched keyword: weight} for whole-word matches in normalized ``text``."""
+        found: Dict[str, Dict[str, int]] = {}
+        for start, end, index in self.automaton.finditer(text):
+            stem, weight, intents = self.entries[index]
+            if not _word_boundary(text, start, end, stem):
+                continue
+            keyword = self.automaton.keywords[index]
+            for intent in intents:
+                found.setdefault(intent, {})[keyword] = weight
+        return found
+
+
+def _word_boundary(text: str, start: int, end: int, stem: bool) -> bool:
+    """Whether ``text[start:end]`` is a whole word, allowing a plural ``s`` or a stem's suffix."""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if stem or end == len(text) or not text[end].isalnum():
+        return True
+    return text[end] == "s" and (end + 1 == len(text) or not text[end + 1].isalnum())
+
+
+class IntentClassifier:
+    """Rank the intents whose vocabulary appears in a message.
+
+    The vocabulary is compiled once; ``extend`` compiles a new matcher and
+    swaps it in with a single assignment, so ``classify`` never takes a lock
+    and never recompiles per request.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Mapping[str, Iterable[str]],
+        max_intents: int = 2,
+        secondary_min_ratio: float = 0.5,
+    ) -> None:
+        self._max_intents = max_intents
+        self._secondary_min_ratio = secondary_min_ratio
+        self._lock = threading.Lock()
+        self._vocabulary: Dict[str, Tuple[str, ...]] = {
+            intent: tuple(dict.fromkeys(keywords)) for intent, keywords in vocabulary.items()
+        }
+        self._compiled = _CompiledVocabulary(self._vocabulary)
+
+    @property
+    def vocabulary(self) -> Dict[str, List[str]]:
+        """Keywords per intent, in ranking order."""
+        return {intent: list(keywords) for intent, keywords in self._vocabulary.items()}
+
+    def extend(self, intent: str, keywords: Iterable[str]) -> None:
+        """Add keywords to ``intent`` (creating it if needed) and recompile the matcher."""
+        with self._lock:
+            vocabulary = dict(self._vocabulary)
+            vocabulary[intent] = tuple(dict.fromkeys((*vocabulary.get(intent, ()), *keywords)))
+            compiled = _CompiledVocabulary(vocabulary)
+            self._vocabulary, self._compiled = vocabulary, compiled
+        logger.info(
+            "Intent vocabulary for %s now has %s keywords.", intent, len(vocabulary[intent])
+        )
+
+    def classify(self, message: str, limit: Optional[int] = None) -> List[IntentMatch]:
+        """Matched intents, best first; secondary intents must reach a share of the top score."""
+        compiled = self._compiled
+        found = compiled.match(normalize_text(message))
+        if not found:
+            return []
+        ranked = sorted(
+            (
+                IntentMatch(
+                    intent=intent, score=float(sum(keywords.values())), keywords=tuple(keywords)
+                )
+                for intent, keywords in found.items()
+            ),
+            key=lambda match: (-match.score, compiled.order[match.intent]),
+        )
+        floor = ranked[0].score * self._secondary_min_ratio
+        ranked = [match for match in ranked if match.score >= floor]
+        return ranked[: limit or self._max_intents]
+
+    def primary(self, message: str) -> str:
+        """Best intent for ``message``, or ``general`` when nothing matched."""
+        ranked = self.classify(message, limit=1)
+        return ranked[0].intent if ranked else GENERAL_INTENT
+
+
+@lru_cache
+def get_intent_classifier() -> IntentClassifier:
+    """Process-wide classifier over ``INTENT_KEYWORDS`` and ``intent_extra_keywords``."""
+    settings = get_settings()
+    vocabulary = {intent: list(keywords) for intent, keywords in INTENT_KEYWORDS.items()}
+    for intent, keywords in settings.intent_extra_keywords.items():
+        vocabulary[intent] = [*vocabulary.get(intent, []), *keywords]
+    return IntentClassifier(
+        vocabulary,
+        max_intents=settings.intent_max_results,
+        secondary_min_ratio=settings.intent_secondary_min_ratio,
+    )
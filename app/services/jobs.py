@@ -0,0 +1,323 @@
+"""Background ingestion jobs for the Dragon Funded knowledge base."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from app.models.schemas import IngestionDocument, IngestionJob, IngestionResult
+from app.services.ingestion import IngestionPipeline, IngestionProgress
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    "id",
+    "status",
+    "submitted_at",
+    "started_at",
+    "finished_at",
+    "total_documents",
+    "documents_done",
+    "documents_failed",
+    "chunks_embedded",
+    "errors",
+    "result",
+)
+
+
+class IngestionJobStore:
+    """SQLite-backed record of ingestion jobs and their pending payloads.
+
+    Several processes may share one database. A worker claims a job with a
+    conditional update and holds it under a lease that it renews while the
+    job runs; a running job whose lease expired (its process died) can be
+    claimed again.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingestion_jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, submitted_at TEXT NOT NULL,"
+            " started_at TEXT, finished_at TEXT, total_documents INTEGER NOT NULL DEFAULT 0,"
+            " documents_done INTEGER NOT NULL DEFAULT 0,"
+            " documents_failed INTEGER NOT NULL DEFAULT 0,"
+            " chunks_embedded INTEGER NOT NULL DEFAULT 0, errors TEXT NOT NULL DEFAULT '[]',"
+            " result TEXT, payload TEXT, lease_owner TEXT, lease_expires_at TEXT)"
+        )
+        self._conn.commit()
+
+    def create(self, documents: List[IngestionDocument]) -> IngestionJob:
+        """Persist a new queued job together with its documents."""
+        job = IngestionJob(
+            id=str(uuid4()),
+            status="queued",
+            submitted_at=_now(),
+            total_documents=len(documents),
+        )
+        payload = json.dumps([doc.model_dump(mode="json") for doc in documents])
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO ingestion_jobs (id, status, submitted_at, total_documents, payload)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, job.submitted_at.isoformat(), job.total_documents, payload),
+            )
+            self._conn.commit()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Load a job's current status."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM ingestion_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _to_job(dict(zip(_COLUMNS, row))) if row else None
+
+    def load_payload(self, job_id: str) -> List[IngestionDocument]:
+        """Return the documents submitted with a job."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM ingestion_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if not row or not row[0]:
+            return []
+        return [IngestionDocument.model_validate(item) for item in json.loads(row[0])]
+
+    def unfinished(self) -> List[str]:
+        """Ids of queued jobs and of running jobs whose lease has expired."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM ingestion_jobs WHERE status = 'queued'"
+                " OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?))"
+                " ORDER BY submitted_at",
+                (_now().isoformat(),),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Atomically take a queued or abandoned job; False if another worker holds it."""
+        now = _now()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE ingestion_jobs SET status = 'running',"
+                " started_at = COALESCE(started_at, ?), lease_owner = ?, lease_expires_at = ?"
+                " WHERE id = ? AND (status = 'queued'"
+                " OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)))",
+                (
+                    now.isoformat(),
+                    owner,
+                    (now + timedelta(seconds=lease_seconds)).isoformat(),
+                    job_id,
+                    now.isoformat(),
+                ),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend the lease ``owner`` holds on a running job; False if it was lost."""
+        expires = (_now() + timedelta(seconds=lease_seconds)).isoformat()
+        return self._update_owned(job_id, owner, lease_expires_at=expires)
+
+    def record_progress(self, job_id: str, owner: str, progress: IngestionProgress) -> None:
+        """Store running totals reported by the pipeline."""
+        self._update_owned(
+            job_id,
+            owner,
+            documents_done=progress.documents_done,
+            documents_failed=progress.documents_failed,
+            chunks_embedded=progress.chunks_embedded,
+        )
+
+    def mark_finished(
+        self,
+        job_id: str,
+        owner: str,
+        result: Optional[IngestionResult],
+        error: Optional[str] = None,
+    ) -> None:
+        """Store the final outcome, drop the payload and release the lease."""
+        errors: List[str] = []
+        if result is not None:
+            errors = [
+                f"{doc.id}: {doc.error}" for doc in result.documents if doc.status == "failed"
+            ]
+        if error:
+            errors.append(error)
+        self._update_owned(
+            job_id,
+            owner,
+            status=(
+                "failed" if error or (result is not None and result.indexed == 0) else "completed"
+            ),
+            finished_at=_now().isoformat(),
+            errors=json.dumps(errors),
+            result=result.model_dump_json() if result is not None else None,
+            payload=None,
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+
+    def _update_owned(self, job_id: str, owner: str, **fields: Any) -> bool:
+        """Write the given columns for a running job if ``owner`` still holds its lease."""
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE ingestion_jobs SET {assignments}"
+                " WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (*fields.values(), job_id, owner),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+
+class IngestionJobManager:
+    """Runs ingestion jobs on asyncio worker tasks, off the request path."""
+
+    def __init__(
+        self,
+        store: IngestionJobStore,
+        pipeline_factory: Callable[[], IngestionPipeline],
+        workers: int = 1,
+        lease_seconds: float = 60.0,
+    ) -> None:
+        self._store = store
+        self._pipeline_factory = pipeline_factory
+        self._worker_count = max(1, workers)
+        self._lease_seconds = lease_seconds
+        self._owner = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def submit(self, documents: List[IngestionDocument]) -> IngestionJob:
+        """Persist a job and queue it for processing."""
+        job = await asyncio.to_thread(self._store.create, documents)
+        self._ensure_started()
+        self._queue.put_nowait(job.id)
+        logger.info("Queued ingestion job %s with %s documents", job.id, job.total_documents)
+        return job
+
+    async def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Return the current status of a job."""
+        return await asyncio.to_thread(self._store.get, job_id)
+
+    async def resume(self) -> int:
+        """Re-queue queued jobs and running jobs whose worker stopped renewing its lease."""
+        job_ids = await asyncio.to_thread(self._store.unfinished)
+        if job_ids:
+            self._ensure_started()
+            for job_id in job_ids:
+                self._queue.put_nowait(job_id)
+            logger.info("Resumed %s interrupted ingestion jobs", len(job_ids))
+        return len(job_ids)
+
+    async def stop(self) -> None:
+        """Cancel worker tasks; unfinished jobs resume on next start."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def _ensure_started(self) -> None:
+        """Start worker tasks on the running loop."""
+        if self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            loop.create_task(self._worker(), name=f"ingestion-worker-{idx}")
+            for idx in range(self._worker_count)
+        ]
+
+    async def _worker(self) -> None:
+        """Process queued jobs one at a time, skipping those another worker claimed."""
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                claimed = await asyncio.to_thread(
+                    self._store.claim, job_id, self._owner, self._lease_seconds
+                )
+                if not claimed:
+                    logger.info("Ingestion job %s is held by another worker; skipping", job_id)
+                    continue
+                heartbeat = asyncio.create_task(self._heartbeat(job_id))
+                try:
+                    await asyncio.to_thread(self._process, job_id)
+                finally:
+                    heartbeat.cancel()
+            finally:
+                queue.task_done()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew the job's lease well before it expires."""
+        while True:
+            await asyncio.sleep(self._lease_seconds / 3)
+            renewed = await asyncio.to_thread(
+                self._store.renew_lease, job_id, self._owner, self._lease_seconds
+            )
+            if not renewed:
+                logger.warning("Lost the lease on ingestion job %s", job_id)
+                return
+
+    def _process(self, job_id: str) -> None:
+        """Run the ingestion pipeline for a claimed job and record the outcome."""
+        owner = self._owner
+        try:
+            documents = self._store.load_payload(job_id)
+            result = self._pipeline_factory().run(
+                documents,
+                progress=lambda progress: self._store.record_progress(job_id, owner, progress),
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Ingestion job %s failed: %s", job_id, exc)
+            self._store.mark_finished(job_id, owner, None, error=f"{type(exc).__name__}: {exc}")
+            return
+        self._store.mark_finished(job_id, owner, result)
+        logger.info(
+            "Ingestion job %s finished: %s indexed, %s failed",
+            job_id,
+            result.indexed,
+            result.skipped,
+        )
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _to_job(row: Dict[str, Any]) -> IngestionJob:
+    """Build the API model from a database row."""
+    started = datetime.fromisoformat(row["started_at"]) if row["started_at"] else None
+    finished = datetime.fromisoformat(row["finished_at"]) if row["finished_at"] else None
+    throughput = None
+    if started is not None:
+        elapsed = ((finished or _now()) - started).total_seconds()
+        processed = row["documents_done"] + row["documents_failed"]
+        throughput = round(processed / elapsed, 3) if elapsed > 0 else None
+    return IngestionJob(
+        id=row["id"],
+        status=row["status"],
+        submitted_at=datetime.fromisoformat(row["submitted_at"]),
+        started_at=started,
+        finished_at=finished,
+        total_documents=row["total_documents"],
+        documents_done=row["documents_done"],
+        documents_failed=row["documents_failed"],
+        chunks_embedded=row["chunks_embedded"],
+        documents_per_second=throughput,
+        errors=json.loads(row["errors"] or "[]"),
+        result=IngestionResult.model_validate_json(row["result"]) if row["result"] else None,
+    )
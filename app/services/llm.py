@@ -2,23 +2,303 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import functools
+import inspect
 import logging
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
 from functools import lru_cache
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
 
 import google.generativeai as genai
+from google.generativeai import caching
 
 from app.core.config import get_settings
+from app.core.prompts import STATIC_PROMPT_HASH, STATIC_PROMPT_PREFIX
+from app.services.context_packing import estimate_tokens
+from app.services.hedging import HedgeBudget, HedgePolicy, get_hedge_budget
+from app.services.metrics import get_metrics
+from app.services.rate_limit import (
+    GeminiRateLimiter,
+    Priority,
+    get_generation_limiter,
+    is_quota_error,
+    retry_delay,
+)
+from app.services.transport import GeminiTransport, bind_client, get_gemini_transport
 
 logger = logging.getLogger(__name__)
 
+CACHE_DISPLAY_PREFIX = "dragon-support"
+
+
+class FallbackReply(str):
+    """Apology or error text returned in place of a model answer."""
+
+
+class CallClass(str, Enum):
+    """Kind of work a Gemini call performs, used to pick a model."""
+
+    SUMMARY = "summary"
+    CLASSIFICATION = "classification"
+    ANSWER = "answer"
+
+
+@dataclass(frozen=True)
+class RouteHints:
+    """What the caller knows about a turn that bears on model choice."""
+
+    intent: Optional[str] = None
+    confidence: Optional[float] = None
+
+
+class ModelStats:
+    """Latency and token usage of the calls sent to one model."""
+
+    def __init__(self, window: int = 512) -> None:
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, latency: float, response: Any = None, failed: bool = False) -> None:
+        """Record one finished call and the usage Gemini reported for it."""
+        usage = getattr(response, "usage_metadata", None)
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.failures += 1
+                return
+            self._latencies.append(latency)
+            self.prompt_tokens += getattr(usage, "prompt_token_count", 0) or 0
+            self.output_tokens += getattr(usage, "candidates_token_count", 0) or 0
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """Latency at ``quantile`` (0-1) over the recent successful calls, in seconds."""
+        with self._lock:
+            ordered = sorted(self._latencies)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters and latency percentiles in milliseconds."""
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+
+
+class StaticPrefixCache:
+    """Gemini cached content holding the static prompt prefix.
+
+    The cache is looked up by a display name derived from the prefix hash, so
+    restarts reuse it and only a changed prompt creates a new one. Its TTL is
+    extended shortly before expiry. When caching is unavailable (unsupported
+    model, prefix below the minimum size, API errors) ``model()`` returns
+    ``None`` and callers fall back to a plain system instruction.
+    """
+
+    retry_after_seconds = 300.0
+
+    def __init__(
+        self,
+        model_name: str,
+        prefix: str,
+        prefix_hash: str,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+    ) -> None:
+        self._model_name = model_name
+        self._prefix = prefix
+        self._display_name = f"{CACHE_DISPLAY_PREFIX}-{prefix_hash[:16]}"
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._refresh_margin = refresh_margin_seconds
+        self._cached: Optional[caching.CachedContent] = None
+        self._model: Optional[genai.GenerativeModel] = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def fresh(self) -> bool:
+        """True when the current handle can be used without contacting the API."""
+        return (
+            self._model is not None and time.monotonic() < self._expires_at - self._refresh_margin
+        )
+
+    def model(self) -> Optional[genai.GenerativeModel]:
+        """Return a model bound to the cached prefix, creating or extending the cache if needed."""
+        if self.fresh:
+            return self._model
+        with self._lock:
+            if self.fresh:
+                return self._model
+            if time.monotonic() < self._retry_at:
+                return None
+            try:
+                if self._cached is None:
+                    self._cached = self._find_existing() or self._create()
+                else:
+                    self._cached.update(ttl=self._ttl)
+                remaining = (self._cached.expire_time - datetime.now(timezone.utc)).total_seconds()
+                self._expires_at = time.monotonic() + remaining
+                self._model = genai.GenerativeModel.from_cached_content(self._cached)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning(
+                    "Gemini context cache unavailable for %s;"
+                    " sending the prompt prefix as a system instruction: %s",
+                    self._model_name,
+                    exc,
+                )
+                self._cached = None
+                self._model = None
+                self._retry_at = time.monotonic() + self.retry_after_seconds
+            return self._model
+
+    def _find_existing(self) -> Optional[caching.CachedContent]:
+        """Reuse a live cache created for the same prefix and model by an earlier process."""
+        for cached in caching.CachedContent.list(page_size=100):
+            if (
+                cached.display_name == self._display_name
+                and cached.model.split("/")[-1] == self._model_name
+            ):
+                cached.update(ttl=self._ttl)
+                logger.info("Reusing Gemini context cache %s", cached.name)
+                return cached
+        return None
+
+    def _create(self) -> caching.CachedContent:
+        """Register the prefix as new cached content."""
+        cached = caching.CachedContent.create(
+            model=self._model_name,
+            display_name=self._display_name,
+            system_instruction=self._prefix,
+            ttl=self._ttl,
+        )
+        # Caches for superseded prefixes are left to expire so older replicas keep working.
+        logger.info("Created Gemini context cache %s (%s)", cached.name, self._display_name)
+        return cached
+
+
+def _observed(method: Callable) -> Callable:
+    """Record the duration of a ``GeminiClient`` call, retries included, in the metrics.
+
+    The outcome label is ``ok``, ``fallback`` when an apology replaced the model
+    answer, ``cancelled`` when the caller stopped waiting, or ``error``.
+    """
+    name = method.__name__
+
+    def observe(client: "GeminiClient", started: float, outcome: str) -> None:
+        get_metrics().gemini_seconds.observe(
+            time.perf_counter() - started, model=client.model_name, method=name, outcome=outcome
+        )
+
+    if inspect.isasyncgenfunction(method):
+
+        @functools.wraps(method)
+        async def stream(self: "GeminiClient", *args: Any, **kwargs: Any) -> AsyncIterator[str]:
+            started, outcome, fallback = time.perf_counter(), "error", False
+            chunks = method(self, *args, **kwargs)
+            try:
+                async for chunk in chunks:
+                    fallback = fallback or isinstance(chunk, FallbackReply)
+                    yield chunk
+                outcome = "fallback" if fallback else "ok"
+            except (asyncio.CancelledError, GeneratorExit):
+                outcome = "cancelled"
+                raise
+            finally:
+                await chunks.aclose()
+                observe(self, started, outcome)
+
+        return stream
+
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def acall(self: "GeminiClient", *args: Any, **kwargs: Any) -> str:
+            started, outcome = time.perf_counter(), "error"
+            try:
+                reply = await method(self, *args, **kwargs)
+                outcome = "fallback" if isinstance(reply, FallbackReply) else "ok"
+                return reply
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                observe(self, started, outcome)
+
+        return acall
+
+    @functools.wraps(method)
+    def call(self: "GeminiClient", *args: Any, **kwargs: Any) -> str:
+        started, outcome = time.perf_counter(), "error"
+        try:
+            reply = method(self, *args, **kwargs)
+            outcome = "fallback" if isinstance(reply, FallbackReply) else "ok"
+            return reply
+        finally:
+            observe(self, started, outcome)
+
+    return call
+
 
 class GeminiClient:
     """Convenience wrapper for Gemini Pro completions."""
 
-    def __init__(self, api_key: str, model: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        static_prefix: Optional[str] = None,
+        static_prefix_hash: Optional[str] = None,
+        context_cache: bool = True,
+        context_cache_ttl_seconds: int = 3600,
+        context_cache_refresh_seconds: int = 300,
+        transport: Optional[GeminiTransport] = None,
+        limiter: Optional[GeminiRateLimiter] = None,
+        max_retries: int = 3,
+        interactive_deadline_seconds: float = 30.0,
+        background_deadline_seconds: float = 300.0,
+        hedge: Optional[HedgePolicy] = None,
+    ) -> None:
         genai.configure(api_key=api_key)
         self._model = model
+        self._hedge = hedge
+        self._transport = transport
+        self._limiter = limiter
+        self._max_retries = max_retries
+        self._stats = ModelStats()
+        self._deadlines = {
+            Priority.INTERACTIVE: interactive_deadline_seconds,
+            Priority.SUMMARY: background_deadline_seconds,
+            Priority.INGESTION: background_deadline_seconds,
+        }
+        self._static_prefix = static_prefix
+        # Per model variant, one copy bound to each pooled transport client.
+        self._bound: (
+            "weakref.WeakKeyDictionary[genai.GenerativeModel, Dict[int, genai.GenerativeModel]]"
+        ) = weakref.WeakKeyDictionary()
+        self._bound_lock = threading.Lock()
+        self._prefix_client: Optional[genai.GenerativeModel] = None
+        self._prefix_cache: Optional[StaticPrefixCache] = None
         # Remove 'models/' prefix if present - the SDK handles it
         clean_model = model.replace("models/", "") if model.startswith("models/") else model
         logger.info("Initializing Gemini client with model: %s", clean_model)
@@ -34,6 +314,7 @@ class GeminiClient:
                     logger.info("Trying fallback model: %s", fallback)
                     self._client = genai.GenerativeModel(model_name=fallback)
                     self._model = fallback
+                    clean_model = fallback
                     logger.info("Successfully initialized with fallback model: %s", fallback)
                     break
                 except Exception:
@@ -41,6 +322,87 @@ class GeminiClient:
             else:
                 raise ValueError(f"Could not initialize any Gemini model. Original error: {e}")
 
+        if static_prefix:
+            self._prefix_client = genai.GenerativeModel(
+                model_name=clean_model, system_instruction=static_prefix
+            )
+            if context_cache:
+                self._prefix_cache = StaticPrefixCache(
+                    model_name=clean_model,
+                    prefix=static_prefix,
+                    prefix_hash=static_prefix_hash or STATIC_PROMPT_HASH,
+                    ttl_seconds=context_cache_ttl_seconds,
+                    refresh_margin_seconds=context_cache_refresh_seconds,
+                )
+
+    @property
+    def static_prefix(self) -> Optional[str]:
+        """Instructions sent ahead of every ``with_static_prefix`` request, if configured."""
+        return self._static_prefix
+
+    @property
+    def model_name(self) -> str:
+        """Model the client actually sends requests to."""
+        return self._model
+
+    @property
+    def stats(self) -> ModelStats:
+        """Latency and token usage of this client's calls."""
+        return self._stats
+
+    @property
+    def transport(self) -> Optional[GeminiTransport]:
+        """Shared connection pool the client sends requests over, if any."""
+        return self._transport
+
+    def _base_model(self, with_static_prefix: bool) -> genai.GenerativeModel:
+        """Pick the plain model, the context-cached model, or the system-instruction model."""
+        if not with_static_prefix or self._prefix_client is None:
+            return self._client
+        if self._prefix_cache is not None:
+            return self._prefix_cache.model() or self._prefix_client
+        return self._prefix_client
+
+    def _select_model(self, with_static_prefix: bool) -> genai.GenerativeModel:
+        """Model for a blocking call, bound to the next pooled connection if there is a pool."""
+        model = self._base_model(with_static_prefix)
+        if self._transport is None:
+            return model
+        return self._bind(model, "_client", self._transport.client())
+
+    async def _aselect_model(self, with_static_prefix: bool) -> genai.GenerativeModel:
+        """``_select_model`` for asyncio calls.
+
+        Creates or extends the context cache off the event loop.
+        """
+        if with_static_prefix and self._prefix_cache is not None and not self._prefix_cache.fresh:
+            model = await asyncio.to_thread(self._base_model, with_static_prefix)
+        else:
+            model = self._base_model(with_static_prefix)
+        if self._transport is None:
+            return model
+        return self._bind(model, "_async_client", self._transport.async_client())
+
+    def _bind(
+        self, model: genai.GenerativeModel, attribute: str, client: Any
+    ) -> genai.GenerativeModel:
+        """Copy of ``model`` that sends requests through ``client``, built once per pair.
+
+        The SDK otherwise creates its own per-process client. Binding copies
+        instead of reassigning the shared model's client keeps concurrent calls
+        on the connection they were given.
+        """
+        with self._bound_lock:
+            copies = self._bound.setdefault(model, {})
+            bound = copies.get(id(client))
+            if bound is None:
+                bound = copy.copy(model)
+                bind_client(bound, attribute, client)
+                # The copy holds ``client``, so its id cannot be reused while the entry exists.
+                copies[id(client)] = bound
+            return bound
+
+    @_observed
     def generate(
         self,
         prompt: str,
@@ -49,21 +411,275 @@ class GeminiClient:
         top_k: int = 32,
         max_output_tokens: int = 300,
         metadata: Optional[Dict[str, Any]] = None,
+        with_static_prefix: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> str:
+        """Generate a response from Gemini Pro.
+
+        With ``with_static_prefix`` the prompt is sent after the configured
+        static prefix, served from the context cache when available. Calls are
+        admitted by the rate limiter in ``priority`` order and transient quota
+        or availability errors are retried with jittered backoff until the
+        priority's deadline.
+        """
+        request_kwargs = self._build_request_kwargs(temperature, top_p, top_k, max_output_tokens)
+        tokens = self._request_tokens(prompt, max_output_tokens, with_static_prefix)
+        deadline = time.monotonic() + self._deadlines[priority]
+
+        response = None
+        attempt = 0
+        while True:
+            started = None
+            try:
+                if self._limiter is not None:
+                    self._limiter.acquire_sync(tokens, priority, deadline)
+                model = self._select_model(with_static_prefix)
+                started = time.perf_counter()
+                response = model.generate_content(prompt, **request_kwargs)
+                self._stats.record(time.perf_counter() - started, response)
+                self._settle(tokens, response)
+                return self._extract_text(response)
+            except Exception as exc:  # pylint: disable=broad-except
+                if started is not None and response is None:
+                    self._stats.record(time.perf_counter() - started, failed=True)
+                delay = self._backoff(exc, attempt, deadline)
+                if delay is None:
+                    return FallbackReply(self._failure_message(exc, response))
+                attempt += 1
+                time.sleep(delay)
+
+    @_observed
+    async def agenerate(
+        self,
+        prompt: str,
+        temperature: float = 0.2,
+        top_p: float = 0.8,
+        top_k: int = 32,
+        max_output_tokens: int = 300,
+        metadata: Optional[Dict[str, Any]] = None,
+        with_static_prefix: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+        hedge: bool = True,
     ) -> str:
-        """Generate a response from Gemini Pro."""
-        generation_config = {
-            "temperature": temperature,
-            "top_p": top_p,
-            "top_k": top_k,
-            "max_output_tokens": max_output_tokens,
+        """Generate a response from Gemini Pro without blocking the event loop.
+
+        With a hedge policy, interactive calls that outlast the policy's
+        latency percentile are duplicated and the first reply wins.
+        ``hedge=False`` skips that for callers that hedge the call themselves.
+        """
+        request_kwargs = self._build_request_kwargs(temperature, top_p, top_k, max_output_tokens)
+        tokens = self._request_tokens(prompt, max_output_tokens, with_static_prefix)
+        deadline = time.monotonic() + self._deadlines[priority]
+
+        response = None
+        attempt = 0
+        while True:
+            started = None
+            try:
+                if self._limiter is not None:
+                    await self._limiter.acquire(tokens, priority, deadline)
+                model = await self._aselect_model(with_static_prefix)
+                started = time.perf_counter()
+                if hedge and self._hedge is not None and priority == Priority.INTERACTIVE:
+                    response = await self._hedged_call(
+                        model, prompt, request_kwargs, tokens, priority, with_static_prefix
+                    )
+                else:
+                    response = await model.generate_content_async(prompt, **request_kwargs)
+                self._stats.record(time.perf_counter() - started, response)
+                self._settle(tokens, response)
+                return self._extract_text(response)
+            except Exception as exc:  # pylint: disable=broad-except
+                if started is not None and response is None:
+                    self._stats.record(time.perf_counter() - started, failed=True)
+                delay = self._backoff(exc, attempt, deadline)
+                if delay is None:
+                    return FallbackReply(self._failure_message(exc, response))
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    @_observed
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.2,
+        top_p: float = 0.8,
+        top_k: int = 32,
+        max_output_tokens: int = 300,
+        metadata: Optional[Dict[str, Any]] = None,
+        with_static_prefix: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[str]:
+        """Stream partial response text from Gemini Pro as it is generated.
+
+        Failures before the first chunk are retried like ``agenerate``; once
+        text has been emitted the stream simply ends.
+        """
+        request_kwargs = self._build_request_kwargs(temperature, top_p, top_k, max_output_tokens)
+        tokens = self._request_tokens(prompt, max_output_tokens, with_static_prefix)
+        deadline = time.monotonic() + self._deadlines[priority]
+
+        emitted = False
+        attempt = 0
+        while True:
+            started = None
+            try:
+                if self._limiter is not None:
+                    await self._limiter.acquire(tokens, priority, deadline)
+                model = await self._aselect_model(with_static_prefix)
+                started = time.perf_counter()
+                response = await model.generate_content_async(prompt, stream=True, **request_kwargs)
+                async for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        emitted = True
+                        yield text
+                self._stats.record(time.perf_counter() - started, response)
+                self._settle(tokens, response)
+                break
+            except Exception as exc:  # pylint: disable=broad-except
+                if started is not None:
+                    self._stats.record(time.perf_counter() - started, failed=True)
+                if emitted:
+                    logger.error("Gemini stream interrupted [%s]: %s", type(exc).__name__, exc)
+                    return
+                delay = self._backoff(exc, attempt, deadline)
+                if delay is None:
+                    yield FallbackReply(self._failure_message(exc, None))
+                    return
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        if not emitted:
+            yield FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
+
+    async def _hedged_call(
+        self,
+        model: genai.GenerativeModel,
+        prompt: str,
+        request_kwargs: Dict[str, Any],
+        tokens: int,
+        priority: Priority,
+        with_static_prefix: bool,
+    ) -> Any:
+        """Send the request, and a duplicate if it is slow and budget and quota allow.
+
+        The first successful response wins and the other call is cancelled.
+        """
+        budget = self._hedge.budget
+        budget.earn()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._timed_call(model, prompt, request_kwargs))
+        calls = {primary: False}
+        try:
+            delay = self._hedge.delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(calls, timeout=delay)
+                hedging = not done and budget.spend()
+                if (
+                    hedging
+                    and self._limiter is not None
+                    and not self._limiter.try_acquire(tokens, priority)
+                ):
+                    # No duplicate is sent, so the hedge goes back to the budget.
+                    budget.refund()
+                    hedging = False
+                if hedging:
+                    # Re-selecting binds the duplicate to the next channel in the pool.
+                    hedge_model = await self._aselect_model(with_static_prefix)
+                    calls[
+                        asyncio.ensure_future(self._timed_call(hedge_model, prompt, request_kwargs))
+                    ] = True
+                    logger.debug("Hedging Gemini call to %s after %.2fs", self._model, delay)
+
+            error: Optional[BaseException] = None
+            pending = set(calls)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if calls[task]:
+                            budget.record_win()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            if not primary.done():
+                # A primary beaten by its hedge took at least this long; leaving it out
+                # would skew the trigger towards fast calls and hedge ever more often.
+                self._hedge.observe(time.perf_counter() - started)
+            for task in calls:
+                task.cancel()
+
+    async def _timed_call(
+        self, model: genai.GenerativeModel, prompt: str, request_kwargs: Dict[str, Any]
+    ) -> Any:
+        """One ``generate_content_async`` call whose latency feeds the hedge policy."""
+        started = time.perf_counter()
+        response = await model.generate_content_async(prompt, **request_kwargs)
+        self._hedge.observe(time.perf_counter() - started)
+        return response
+
+    def _request_tokens(self, prompt: str, max_output_tokens: int, with_static_prefix: bool) -> int:
+        """Tokens to reserve against the TPM budget before sending a request."""
+        tokens = estimate_tokens(prompt) + max_output_tokens
+        if with_static_prefix and self._static_prefix:
+            tokens += estimate_tokens(self._static_prefix)
+        return tokens
+
+    def _settle(self, reserved: int, response: Any) -> None:
+        """Replace the reserved token estimate with the usage Gemini reported."""
+        if self._limiter is None:
+            return
+        usage = getattr(response, "usage_metadata", None)
+        self._limiter.settle(reserved, getattr(usage, "total_token_count", None) or None)
+
+    def _backoff(self, exc: Exception, attempt: int, deadline: float) -> Optional[float]:
+        """Seconds to wait before retrying ``exc``, or ``None`` to give up."""
+        delay = retry_delay(exc, attempt, deadline, self._max_retries)
+        if delay is None:
+            return None
+        if self._limiter is not None and is_quota_error(exc):
+            self._limiter.throttle(delay)
+        logger.warning(
+            "Gemini call failed [%s]; retry %s of %s in %.2fs",
+            type(exc).__name__,
+            attempt + 1,
+            self._max_retries,
+            delay,
+        )
+        return delay
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Return the text carried by a streamed chunk, or an empty string."""
+        try:
+            return chunk.text or ""
+        except (KeyError, AttributeError, IndexError, TypeError, ValueError):
+            # Final chunks may carry only a finish reason and no parts.
+            return ""
+
+    @staticmethod
+    def _build_request_kwargs(
+        temperature: float, top_p: float, top_k: int, max_output_tokens: int
+    ) -> Dict[str, Any]:
+        """Assemble generation config and safety settings for a request."""
+        request_kwargs: Dict[str, Any] = {
+            "generation_config": {
+                "temperature": temperature,
+                "top_p": top_p,
+                "top_k": top_k,
+                "max_output_tokens": max_output_tokens,
+            }
         }
 
         # Try to use safety settings, but handle errors gracefully
-        safety_settings = None
         try:
             # Try using enum format first (newer API versions)
             if hasattr(genai, 'types') and hasattr(genai.types, 'HarmCategory'):
-                safety_settings = [
+                request_kwargs["safety_settings"] = [
                     {
                         "category": genai.types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
                         "threshold": genai.types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
@@ -83,76 +699,91 @@ class GeminiClient:
                 ]
         except (AttributeError, KeyError, TypeError) as e:
             logger.warning("Could not configure safety settings with enums: %s. Will skip safety settings.", e)
-            safety_settings = None
 
-        response = None
-        try:
-            # Call generate_content with or without safety_settings
-            if safety_settings:
-                response = self._client.generate_content(
-                    prompt, generation_config=generation_config, safety_settings=safety_settings
-                )
-            else:
-                # Call without safety_settings if they cause issues
-                response = self._client.generate_content(
-                    prompt, generation_config=generation_config
-                )
+        return request_kwargs
 
-            if response is None:
-                logger.error("Gemini API returned None response")
-                return "I'm sorry, I'm unable to retrieve the requested information right now."
+    @staticmethod
+    def _extract_text(response: Any) -> str:
+        """Pull the reply text out of a Gemini response object."""
+        if response is None:
+            logger.error("Gemini API returned None response")
+            return FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
 
-            # Method 1: Use the .text property (recommended by Google SDK)
-            # This is the safest and most direct way to get text from Gemini responses
-            try:
-                if hasattr(response, 'text'):
-                    text = response.text
-                    if text and isinstance(text, str) and text.strip():
-                        logger.debug("Successfully extracted text using response.text property")
-                        return text.strip()
-            except (KeyError, AttributeError, IndexError, TypeError) as e:
-                logger.warning("Failed to access response.text property: %s", e)
-            except Exception as e:
-                logger.warning("Unexpected error accessing response.text: %s (type: %s)", e, type(e).__name__)
-
-            # Method 2: Fallback to manual extraction
-            if not response.candidates:
-                logger.warning("Gemini returned no candidates. Response: %s", response)
-                if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
-                    logger.warning("Prompt feedback: %s", response.prompt_feedback)
-                return "I'm sorry, I'm unable to retrieve the requested information right now."
-
-            # Safely extract text content from response
-            candidate = response.candidates[0]
-            if not hasattr(candidate, 'content') or not candidate.content:
-                logger.warning("Candidate has no content. Candidate: %s", candidate)
-                return "I'm sorry, I'm unable to retrieve the requested information right now."
-
-            content_obj = candidate.content
-            if not hasattr(content_obj, 'parts') or not content_obj.parts:
-                logger.warning("Content has no parts. Content: %s", content_obj)
-                return "I'm sorry, I'm unable to retrieve the requested information right now."
-
-            # Try to get text from the first part
-            first_part = content_obj.parts[0]
-            
-            # Try attribute access
-            if hasattr(first_part, 'text'):
-                text = first_part.text
-                if text:
+        # Method 1: Use the .text property (recommended by Google SDK)
+        # This is the safest and most direct way to get text from Gemini responses
+        try:
+            if hasattr(response, "text"):
+                text = response.text
+                if text and isinstance(text, str) and text.strip():
+                    logger.debug("Successfully extracted text using response.text property")
                     return text.strip()
-            
-            logger.warning("First part has no accessible text. Part type: %s, Part: %s", type(first_part), first_part)
-            return "I'm sorry, I'm unable to retrieve the requested information right now."
-        except KeyError as exc:
+        except (KeyError, AttributeError, IndexError, TypeError) as e:
+            logger.warning("Failed to access response.text property: %s", e)
+        except Exception as e:
+            logger.warning(
+                "Unexpected error accessing response.text: %s (type: %s)", e, type(e).__name__
+            )
+
+        # Method 2: Fallback to manual extraction
+        if not response.candidates:
+            logger.warning("Gemini returned no candidates. Response: %s", response)
+            if hasattr(response, "prompt_feedback") and response.prompt_feedback:
+                logger.warning("Prompt feedback: %s", response.prompt_feedback)
+            return FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
+
+        # Safely extract text content from response
+        candidate = response.candidates[0]
+        if not hasattr(candidate, "content") or not candidate.content:
+            logger.warning("Candidate has no content. Candidate: %s", candidate)
+            return FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
+
+        content_obj = candidate.content
+        if not hasattr(content_obj, "parts") or not content_obj.parts:
+            logger.warning("Content has no parts. Content: %s", content_obj)
+            return FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
+
+        # Try to get text from the first part
+        first_part = content_obj.parts[0]
+
+        # Try attribute access
+        if hasattr(first_part, "text"):
+            text = first_part.text
+            if text:
+                return text.strip()
+
+        logger.warning(
+            "First part has no accessible text. Part type: %s, Part: %s",
+            type(first_part),
+            first_part,
+        )
+        return FallbackReply(
+            "I'm sorry, I'm unable to retrieve the requested information right now."
+        )
+
+    def _failure_message(self, exc: Exception, response: Any) -> str:
+        """Translate a failed Gemini call into a user-facing message."""
+        if isinstance(exc, KeyError):
             # Handle KeyError specifically - likely accessing response structure incorrectly
             response_info = f"Response: {response}" if response is not None else "Response not yet created"
-            logger.exception("KeyError accessing Gemini response structure: %s. %s", exc, response_info)
+            logger.error(
+                "KeyError accessing Gemini response structure: %s. %s",
+                exc,
+                response_info,
+                exc_info=exc,
+            )
             return (
                 f"I'm experiencing technical difficulties parsing the AI response "
                 f"(KeyError: {exc}). Please try again or contact support."
             )
-        except ValueError as exc:
+        if isinstance(exc, ValueError):
             # API key or configuration errors
             error_msg = str(exc)
             logger.error("Gemini API configuration error: %s", error_msg)
@@ -162,65 +793,400 @@ class GeminiClient:
                     "Please check your GEMINI_API_KEY environment variable."
                 )
             return f"Configuration error: {error_msg}"
-        except Exception as exc:  # pylint: disable=broad-except
-            error_type = type(exc).__name__
-            error_msg = str(exc)
-            logger.exception("Gemini call failed [%s]: %s", error_type, error_msg)
-            
-            # Handle rate limit / quota exceeded errors
-            if ("ResourceExhausted" in error_type or 
-                "429" in error_msg or 
-                "quota" in error_msg.lower() or 
-                "rate limit" in error_msg.lower() or
-                "exceeded" in error_msg.lower() and "quota" in error_msg.lower()):
-                # Extract retry delay if available
-                retry_seconds = None
-                if "retry in" in error_msg.lower():
-                    try:
-                        import re
-                        match = re.search(r"retry in ([\d.]+)s", error_msg.lower())
-                        if match:
-                            retry_seconds = int(float(match.group(1)))
-                    except Exception:
-                        pass
-                
-                logger.warning("Rate limit exceeded for model '%s'. Error: %s", self._model, error_msg[:200])
-                if retry_seconds:
-                    return (
-                        f"I'm currently experiencing high demand. Please wait about {retry_seconds} seconds and try again. "
-                        f"This is due to API rate limits on the free tier (2 requests per minute)."
-                    )
-                else:
-                    return (
-                        "I'm currently experiencing high demand. Please wait a moment and try again. "
-                        "This is due to API rate limits on the free tier (2 requests per minute)."
-                    )
-            
-            # Handle NotFound error in error message (check error type and message)
-            if ("NotFound" in error_type or 
-                "not found" in error_msg.lower() or 
-                "404" in error_msg or 
-                "NotFoundError" in error_type or
-                "does not exist" in error_msg.lower() or
-                "model" in error_msg.lower() and "not found" in error_msg.lower()):
-                logger.error("Model '%s' not found. Available models: gemini-pro, gemini-1.5-flash", self._model)
+
+        error_type = type(exc).__name__
+        error_msg = str(exc)
+        logger.error("Gemini call failed [%s]: %s", error_type, error_msg, exc_info=exc)
+
+        # Handle rate limit / quota exceeded errors
+        if (
+            "ResourceExhausted" in error_type
+            or "429" in error_msg
+            or "quota" in error_msg.lower()
+            or "rate limit" in error_msg.lower()
+            or "exceeded" in error_msg.lower()
+            and "quota" in error_msg.lower()
+        ):
+            # Extract retry delay if available
+            retry_seconds = None
+            if "retry in" in error_msg.lower():
+                try:
+                    match = re.search(r"retry in ([\d.]+)s", error_msg.lower())
+                    if match:
+                        retry_seconds = int(float(match.group(1)))
+                except Exception:
+                    pass
+
+            logger.warning(
+                "Rate limit exceeded for model '%s'. Error: %s", self._model, error_msg[:200]
+            )
+            if retry_seconds:
+                return (
+                    "I'm currently experiencing high demand. "
+                    f"Please wait about {retry_seconds} seconds and try again. "
+                    f"This is due to API rate limits on the free tier (2 requests per minute)."
+                )
+            else:
                 return (
-                    f"Configuration error: The AI model '{self._model}' was not found. "
-                    f"Please check your API key and ensure you have access to Gemini models. "
-                    f"Try setting GEMINI_MODEL=gemini-pro in your environment."
+                    "I'm currently experiencing high demand. Please wait a moment and try again. "
+                    "This is due to API rate limits on the free tier (2 requests per minute)."
                 )
-            
+
+        # Handle NotFound error in error message (check error type and message)
+        if (
+            "NotFound" in error_type
+            or "not found" in error_msg.lower()
+            or "404" in error_msg
+            or "NotFoundError" in error_type
+            or "does not exist" in error_msg.lower()
+            or "model" in error_msg.lower()
+            and "not found" in error_msg.lower()
+        ):
+            logger.error(
+                "Model '%s' not found. Available models: gemini-pro, gemini-1.5-flash", self._model
+            )
             return (
-                f"I'm experiencing technical difficulties reaching our knowledge services "
-                f"(Error: {error_type}: {error_msg[:200]}). Let me connect you with a human specialist."
+                f"Configuration error: The AI model '{self._model}' was not found. "
+                f"Please check your API key and ensure you have access to Gemini models. "
+                f"Try setting GEMINI_MODEL=gemini-pro in your environment."
             )
 
+        return (
+            f"I'm experiencing technical difficulties reaching our knowledge services "
+            f"(Error: {error_type}: {error_msg[:200]}). Let me connect you with a human specialist."
+        )
 
-@lru_cache
-def get_gemini_client() -> GeminiClient:
-    """Return a cached Gemini client instance."""
+
+class ModelRouter:
+    """Chooses a Gemini model per call and hedges slow interactive calls onto a second model.
+
+    Summaries and classification go to the light model. Answers go to the
+    light model only for intents listed as simple, when retrieval confidence
+    is high and the prompt is small; everything else uses the answer model.
+    When both models are distinct, an interactive call that has not returned
+    within ``fallback_after_seconds`` (or that fails) is also sent to the
+    other model and whichever answers first wins. Sending a slow call to the
+    second model spends from ``hedge_budget`` like any other hedge, and the
+    clients do not hedge such a call again, so it never has more than two
+    requests in flight.
+    """
+
+    def __init__(
+        self,
+        answer_client: GeminiClient,
+        light_client: Optional[GeminiClient] = None,
+        light_intents: Optional[List[str]] = None,
+        light_min_confidence: float = 0.75,
+        light_max_prompt_tokens: int = 1200,
+        fallback_after_seconds: float = 8.0,
+        hedge_budget: Optional[HedgeBudget] = None,
+    ) -> None:
+        self._answer = answer_client
+        self._light = light_client or answer_client
+        self._light_intents = frozenset(light_intents or [])
+        self._light_min_confidence = light_min_confidence
+        self._light_max_prompt_tokens = light_max_prompt_tokens
+        self._fallback_after = fallback_after_seconds
+        self._budget = hedge_budget
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, int]] = {call_class.value: {} for call_class in CallClass}
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._failovers = 0
+
+    @property
+    def static_prefix(self) -> Optional[str]:
+        """Instructions sent ahead of every ``with_static_prefix`` request, if configured."""
+        return self._answer.static_prefix
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Routing decisions, fallback counters and per-model latency and tokens."""
+        clients = {client.model_name: client for client in (self._answer, self._light)}
+        with self._lock:
+            return {
+                "routes": {name: dict(counts) for name, counts in self._routes.items()},
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "failovers": self._failovers,
+                "models": {name: client.stats.snapshot() for name, client in clients.items()},
+            }
+
+    def route(
+        self, call_class: CallClass, prompt: str, hints: Optional[RouteHints] = None
+    ) -> Tuple[GeminiClient, Optional[GeminiClient]]:
+        """Return the client to call and the alternative to fall back to, if any."""
+        if call_class is not CallClass.ANSWER or self._is_simple(prompt, hints):
+            primary, secondary = self._light, self._answer
+        else:
+            primary, secondary = self._answer, self._light
+        with self._lock:
+            counts = self._routes[call_class.value]
+            counts[primary.model_name] = counts.get(primary.model_name, 0) + 1
+        return primary, (secondary if secondary is not primary else None)
+
+    def generate(
+        self,
+        prompt: str,
+        call_class: CallClass = CallClass.ANSWER,
+        hints: Optional[RouteHints] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Blocking ``GeminiClient.generate`` on the routed model, failing over on errors."""
+        primary, secondary = self.route(call_class, prompt, hints)
+        reply = primary.generate(prompt, **kwargs)
+        if (
+            isinstance(reply, FallbackReply)
+            and secondary is not None
+            and self._hedges_allowed(kwargs)
+        ):
+            self._count_hedge(failed=True)
+            retry = secondary.generate(prompt, **kwargs)
+            if not isinstance(retry, FallbackReply):
+                return retry
+        return reply
+
+    async def agenerate(
+        self,
+        prompt: str,
+        call_class: CallClass = CallClass.ANSWER,
+        hints: Optional[RouteHints] = None,
+        **kwargs: Any,
+    ) -> str:
+        """``GeminiClient.agenerate`` on the routed model, hedged onto the other model when slow."""
+        primary, secondary = self.route(call_class, prompt, hints)
+        if secondary is None or not self._hedges_allowed(kwargs):
+            return await primary.agenerate(prompt, **kwargs)
+
+        # This layer hedges the call across models; the clients must not duplicate it again.
+        kwargs["hedge"] = False
+        self._earn_hedge()
+        tasks = {asyncio.ensure_future(primary.agenerate(prompt, **kwargs)): primary}
+        hedge_after: Optional[float] = self._fallback_after or None
+        started_secondary = hedged = False
+        failure: Optional[str] = None
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=None if started_secondary else hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedge_after = None
+                    if self._spend_hedge():
+                        self._count_hedge(failed=False)
+                        tasks[asyncio.ensure_future(secondary.agenerate(prompt, **kwargs))] = (
+                            secondary
+                        )
+                        started_secondary = hedged = True
+                    continue
+                for task in done:
+                    client = tasks.pop(task)
+                    reply = task.result()
+                    if not isinstance(reply, FallbackReply):
+                        self._record_win(client, primary, hedged)
+                        return reply
+                    failure = failure or reply
+                    if not started_secondary:
+                        self._count_hedge(failed=True)
+                        tasks[asyncio.ensure_future(secondary.agenerate(prompt, **kwargs))] = (
+                            secondary
+                        )
+                        started_secondary = True
+            return failure
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        call_class: CallClass = CallClass.ANSWER,
+        hints: Optional[RouteHints] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """``GeminiClient.agenerate_stream`` on the routed model.
+
+        Hedging applies until the first chunk: whichever model produces text
+        first streams the rest of the reply and the other stream is closed.
+        """
+        primary, secondary = self.route(call_class, prompt, hints)
+        if secondary is None or not self._hedges_allowed(kwargs):
+            async for chunk in primary.agenerate_stream(prompt, **kwargs):
+                yield chunk
+            return
+
+        self._earn_hedge()
+        heads: Dict[asyncio.Future, Tuple[GeminiClient, AsyncIterator[str]]] = {}
+        self._open_stream(heads, primary, primary.agenerate_stream(prompt, **kwargs))
+        hedge_after: Optional[float] = self._fallback_after or None
+        started_secondary = hedged = False
+        winner: Optional[Tuple[AsyncIterator[str], str]] = None
+        failure: Optional[str] = None
+        try:
+            while heads and winner is None:
+                done, _ = await asyncio.wait(
+                    heads,
+                    timeout=None if started_secondary else hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedge_after = None
+                    if self._spend_hedge():
+                        self._count_hedge(failed=False)
+                        self._open_stream(
+                            heads, secondary, secondary.agenerate_stream(prompt, **kwargs)
+                        )
+                        started_secondary = hedged = True
+                    continue
+                for task in done:
+                    client, stream = heads.pop(task)
+                    chunk = task.result()
+                    if chunk is not None and not isinstance(chunk, FallbackReply):
+                        self._record_win(client, primary, hedged)
+                        winner = (stream, chunk)
+                        break
+                    failure = failure or chunk
+                    await stream.aclose()
+                    if not started_secondary:
+                        self._count_hedge(failed=True)
+                        self._open_stream(
+                            heads, secondary, secondary.agenerate_stream(prompt, **kwargs)
+                        )
+                        started_secondary = True
+        finally:
+            for task, (_, stream) in heads.items():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await stream.aclose()
+
+        if winner is None:
+            yield failure or FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
+            return
+        stream, first = winner
+        try:
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def _is_simple(self, prompt: str, hints: Optional[RouteHints]) -> bool:
+        """Whether an answer is cheap enough for the light model."""
+        if hints is None or hints.intent not in self._light_intents:
+            return False
+        if hints.confidence is None or hints.confidence < self._light_min_confidence:
+            return False
+        return estimate_tokens(prompt) <= self._light_max_prompt_tokens
+
+    @staticmethod
+    def _hedges_allowed(kwargs: Dict[str, Any]) -> bool:
+        """Only user-facing calls are worth a second request."""
+        return kwargs.get("priority", Priority.INTERACTIVE) == Priority.INTERACTIVE
+
+    @staticmethod
+    def _open_stream(
+        heads: Dict[asyncio.Future, Tuple[GeminiClient, AsyncIterator[str]]],
+        client: GeminiClient,
+        stream: AsyncIterator[str],
+    ) -> None:
+        """Start waiting for the first chunk of ``stream``."""
+        heads[asyncio.ensure_future(_first_chunk(stream))] = (client, stream)
+
+    def _count_hedge(self, failed: bool) -> None:
+        """Count a call sent to the alternative model after a slow or failed primary."""
+        with self._lock:
+            if failed:
+                self._failovers += 1
+            else:
+                self._hedges += 1
+        logger.info(
+            "Sending Gemini call to the fallback model (%s)",
+            "failure" if failed else "slow response",
+        )
+
+    def _earn_hedge(self) -> None:
+        """Credit the shared budget for a call this router may hedge."""
+        if self._budget is not None:
+            self._budget.earn()
+
+    def _spend_hedge(self) -> bool:
+        """Whether the shared budget allows sending a slow call to the second model."""
+        return self._budget is None or self._budget.spend()
+
+    def _record_win(self, client: GeminiClient, primary: GeminiClient, hedged: bool) -> None:
+        """Count replies delivered by the alternative model."""
+        if client is not primary:
+            with self._lock:
+                self._hedge_wins += 1
+            if hedged and self._budget is not None:
+                self._budget.record_win()
+
+
+async def _first_chunk(stream: AsyncIterator[str]) -> Optional[str]:
+    """Next item of ``stream``, or ``None`` when it ends without one."""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def _create_client(model: str) -> GeminiClient:
+    """Build a client for ``model`` on the shared transport and rate limiter."""
+    settings = get_settings()
+    return GeminiClient(
+        api_key=settings.gemini_api_key,
+        model=model,
+        static_prefix=STATIC_PROMPT_PREFIX,
+        static_prefix_hash=STATIC_PROMPT_HASH,
+        context_cache=settings.gemini_context_cache_enabled,
+        context_cache_ttl_seconds=settings.gemini_context_cache_ttl_seconds,
+        context_cache_refresh_seconds=settings.gemini_context_cache_refresh_seconds,
+        transport=get_gemini_transport(),
+        limiter=get_generation_limiter(),
+        max_retries=settings.gemini_max_retries,
+        interactive_deadline_seconds=settings.gemini_interactive_deadline_seconds,
+        background_deadline_seconds=settings.gemini_background_deadline_seconds,
+        hedge=_create_hedge_policy(),
+    )
+
+
+def _create_hedge_policy() -> Optional[HedgePolicy]:
+    """Per-client hedge trigger drawing on the process-wide budget, if hedging is enabled."""
     settings = get_settings()
-    return GeminiClient(api_key=settings.gemini_api_key, model=settings.gemini_model)
+    if not settings.gemini_hedge_enabled:
+        return None
+    return HedgePolicy(
+        budget=get_hedge_budget(),
+        percentile=settings.gemini_hedge_percentile,
+        min_delay_seconds=settings.gemini_hedge_min_delay_seconds,
+        min_samples=settings.gemini_hedge_min_samples,
+    )
+
 
+@lru_cache
+def get_gemini_client() -> GeminiClient:
+    """Return a cached Gemini client instance for the answer model."""
+    return _create_client(get_settings().gemini_model)
 
 
+@lru_cache
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model router."""
+    settings = get_settings()
+    answer_client = get_gemini_client()
+    light_client = None
+    if settings.gemini_light_model != settings.gemini_model:
+        light_client = _create_client(settings.gemini_light_model)
+    return ModelRouter(
+        answer_client,
+        light_client,
+        light_intents=settings.model_router_light_intents,
+        light_min_confidence=settings.model_router_light_min_confidence,
+        light_max_prompt_tokens=settings.model_router_light_max_prompt_tokens,
+        fallback_after_seconds=settings.model_router_fallback_after_seconds,
+        hedge_budget=get_hedge_budget(),
+    )
@@ -2,80 +2,601 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from collections import deque
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Deque, Dict, List, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+HISTORY_TURNS = 12
+TRANSCRIPT_TURNS = 6
+DIGEST_TURNS = 4
+
+Mutation = Callable[["SessionMemory"], None]
+
+
+class MemoryPersistError(Exception):
+    """Raised by ``close`` when buffered sessions could not be written to the store."""
+
+    def __init__(self, unpersisted: int) -> None:
+        super().__init__(f"{unpersisted} conversation sessions could not be persisted")
+        self.unpersisted = unpersisted
+
 
-@dataclass
 class MemoryRecord:
-    """Single conversational turn."""
+    """Single conversational turn, kept pre-rendered as ``role: content``.
+
+    Roles are interned so every record shares one string per role, and the
+    record keeps no separate content string: ``content`` is sliced from the
+    rendered line when asked for.
+    """
+
+    __slots__ = ("role", "line")
+
+    def __init__(self, role: str, content: str) -> None:
+        self.role = sys.intern(role)
+        self.line = f"{self.role}: {content}"
+
+    @property
+    def content(self) -> str:
+        """Message text without the role prefix."""
+        return self.line[len(self.role) + 2 :]
 
-    role: str
-    content: str
+    def __repr__(self) -> str:
+        return f"MemoryRecord(role={self.role!r}, content={self.content!r})"
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionMemory:
-    """Aggregated memory for a conversation."""
+    """Aggregated memory for a conversation.
+
+    ``history`` is a short list trimmed to ``HISTORY_TURNS``, which costs
+    less per session than a bounded deque. The latest user turn and the
+    default transcript are maintained as turns arrive rather than searched
+    for or re-joined on every read. The transcript is the one cached
+    rendering; the shorter digest is joined on demand.
+    """
 
     conversation_id: str
-    history: Deque[MemoryRecord] = field(default_factory=lambda: deque(maxlen=12))
+    history: List[MemoryRecord] = field(default_factory=list)
     summary: str = ""
+    user_turns: int = 0
+    latest_user: Optional[MemoryRecord] = field(default=None, repr=False)
+    _transcript: str = field(default="", init=False, repr=False)
 
+    def add(self, role: str, content: str) -> None:
+        """Append a turn, counting it if it came from the user."""
+        self._push(MemoryRecord(role, content))
+        if role == "user":
+            self.user_turns += 1
 
-class ConversationMemoryManager:
-    """Manages short-term and optional episodic memory."""
+    def transcript(self, turns: int = TRANSCRIPT_TURNS) -> str:
+        """Newline-joined ``role: content`` lines of the last ``turns`` records."""
+        if turns == TRANSCRIPT_TURNS:
+            return self._transcript
+        return "\n".join(record.line for record in self.history[-turns:])
+
+    def digest(self) -> str:
+        """Heuristic summary of the last few records, used until an LLM summary exists."""
+        return " | ".join(record.line for record in self.history[-DIGEST_TURNS:])
+
+    def _push(self, record: MemoryRecord) -> None:
+        self.history.append(record)
+        self._transcript = _slide(self._transcript, self.history, TRANSCRIPT_TURNS, "\n")
+        if len(self.history) > HISTORY_TURNS:
+            del self.history[0]
+        if record.role == "user":
+            self.latest_user = record
+
+    def to_json(self) -> str:
+        """Serialize for a persistent backend."""
+        return json.dumps(
+            {
+                "history": [[record.role, record.content] for record in self.history],
+                "summary": self.summary,
+                "user_turns": self.user_turns,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, conversation_id: str, payload: str) -> "SessionMemory":
+        """Rebuild a session written by ``to_json``."""
+        data = json.loads(payload)
+        session = cls(
+            conversation_id, summary=data.get("summary", ""), user_turns=data.get("user_turns", 0)
+        )
+        for role, content in data.get("history", []):
+            session._push(MemoryRecord(role, content))
+        return session
+
+
+def _slide(rendered: str, history: List[MemoryRecord], window: int, separator: str) -> str:
+    """Advance ``rendered``, the joined last ``window`` lines, past the record just appended.
+
+    The line leaving the window is cut off by its known length, so lines may
+    themselves contain the separator.
+    """
+    if len(history) > window:
+        dropped = history[-window - 1].line
+        rendered = rendered[len(dropped) + len(separator) :] if window > 1 else ""
+    line = history[-1].line
+    return f"{rendered}{separator}{line}" if rendered else line
+
+
+class MemoryBackend(ABC):
+    """Storage for conversation sessions."""
+
+    @abstractmethod
+    def get(self, conversation_id: str) -> Optional[SessionMemory]:
+        """Return the live session, or ``None`` if unknown or expired."""
+
+    @abstractmethod
+    def update(self, conversation_id: str, mutate: Mutation) -> SessionMemory:
+        """Apply ``mutate`` to the session (created if missing) atomically; return the result."""
+
+    @property
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Size and activity metrics."""
+
+    def close(self) -> None:
+        """Release resources, persisting anything still buffered.
+
+        Raises ``MemoryPersistError`` if buffered sessions could not be written.
+        """
+
+
+class InProcessMemoryBackend(MemoryBackend):
+    """LRU of sessions in this process, bounded by count and idle time."""
+
+    def __init__(self, max_sessions: int = 10_000, ttl_seconds: float = 86_400.0) -> None:
+        self._max_sessions = max_sessions
+        self._ttl = ttl_seconds
+        self._sessions: "OrderedDict[str, Tuple[SessionMemory, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, conversation_id: str) -> Optional[SessionMemory]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(conversation_id)
+            if entry is not None and now - entry[1] > self._ttl:
+                del self._sessions[conversation_id]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._sessions[conversation_id] = (entry[0], now)
+            self._sessions.move_to_end(conversation_id)
+            return entry[0]
+
+    def update(self, conversation_id: str, mutate: Mutation) -> SessionMemory:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(conversation_id)
+            if entry is None or now - entry[1] > self._ttl:
+                session = self._new_session(conversation_id)
+            else:
+                session = entry[0]
+            mutate(session)
+            self._sessions[conversation_id] = (session, now)
+            self._sessions.move_to_end(conversation_id)
+            self._evict(now)
+            return session
+
+    def _new_session(self, conversation_id: str) -> SessionMemory:
+        """Empty session for a conversation seen for the first time."""
+        return SessionMemory(conversation_id)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = [session for session, _ in self._sessions.values()]
+            counters = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+        return {
+            "backend": "memory",
+            "sessions": len(sessions),
+            "max_sessions": self._max_sessions,
+            "records": sum(len(session.history) for session in sessions),
+            "content_bytes": sum(_content_bytes(session) for session in sessions),
+            **counters,
+        }
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions from the cold end, then the least recent beyond capacity."""
+        while self._sessions:
+            conversation_id, (_, touched) = next(iter(self._sessions.items()))
+            if now - touched <= self._ttl:
+                break
+            del self._sessions[conversation_id]
+            self._expirations += 1
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
+            self._evictions += 1
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """Sessions in a SQLite (WAL) file shared by the workers on one host.
+
+    ``update`` applies the change to a local view of the session and buffers
+    the change itself, not the resulting session. A writer thread commits the
+    buffer every ``flush_interval_seconds`` or once ``batch_size`` sessions
+    are pending, so requests never wait on disk. Each flush is one
+    ``BEGIN IMMEDIATE`` transaction that re-reads every affected row and
+    applies the buffered changes to it, so workers updating the same
+    conversation never overwrite each other's turns. Reads see this process's
+    buffered changes through the local view until they are flushed. Expired
+    sessions and those beyond ``max_sessions`` (oldest first) are purged
+    periodically.
+    """
+
+    sweep_interval_seconds = 30.0
+    # The flush on close is the last one, so a failure is retried before giving up.
+    close_flush_attempts = 3
+    close_retry_delay_seconds = 0.5
+
+    def __init__(
+        self,
+        path: Path,
+        max_sessions: int = 10_000,
+        ttl_seconds: float = 86_400.0,
+        flush_interval_seconds: float = 0.25,
+        batch_size: int = 128,
+    ) -> None:
+        self._path = path
+        self._max_sessions = max_sessions
+        self._ttl = ttl_seconds
+        self._flush_interval = flush_interval_seconds
+        self._batch_size = batch_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._reader = self._connect()
+        self._reader.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_memory ("
+            " conversation_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._reader.execute(
+            "CREATE INDEX IF NOT EXISTS conversation_memory_updated"
+            " ON conversation_memory (updated_at)"
+        )
+        self._reader.commit()
+        self._read_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # Changes not yet committed, and this process's view of those sessions with them applied.
+        self._pending: Dict[str, List[Mutation]] = {}
+        self._views: Dict[str, SessionMemory] = {}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._stats = {
+            "flushes": 0,
+            "rows_written": 0,
+            "purged": 0,
+            "write_errors": 0,
+            "last_flush_ms": 0.0,
+        }
+        self._writer = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._writer.start()
+
+    def get(self, conversation_id: str) -> Optional[SessionMemory]:
+        with self._lock:
+            view = self._views.get(conversation_id)
+        if view is not None:
+            return view
+        return self._load(conversation_id)
+
+    def update(self, conversation_id: str, mutate: Mutation) -> SessionMemory:
+        with self._lock:
+            view = self._views.get(conversation_id)
+        if view is None:
+            view = self._load(conversation_id) or SessionMemory(conversation_id)
+        with self._lock:
+            # Another thread may have created the view while this one was reading.
+            view = self._views.setdefault(conversation_id, view)
+            mutate(view)
+            self._pending.setdefault(conversation_id, []).append(mutate)
+            full = len(self._pending) >= self._batch_size
+        if full:
+            self._wake.set()
+        return view
+
+    def _load(self, conversation_id: str) -> Optional[SessionMemory]:
+        """Read a committed, unexpired session."""
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT payload FROM conversation_memory"
+                " WHERE conversation_id = ? AND updated_at >= ?",
+                (conversation_id, time.time() - self._ttl),
+            ).fetchone()
+        return SessionMemory.from_json(conversation_id, row[0]) if row else None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._read_lock:
+            sessions = self._reader.execute("SELECT COUNT(*) FROM conversation_memory").fetchone()[
+                0
+            ]
+            page_count = self._reader.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._reader.execute("PRAGMA page_size").fetchone()[0]
+        with self._lock:
+            pending = len(self._views)
+            counters = dict(self._stats)
+        return {
+            "backend": "sqlite",
+            "path": str(self._path),
+            "sessions": sessions,
+            "max_sessions": self._max_sessions,
+            "pending_writes": pending,
+            "file_bytes": page_count * page_size,
+            **counters,
+        }
+
+    def close(self) -> None:
+        self._stopping = True
+        self._wake.set()
+        self._writer.join(timeout=10)
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            unpersisted = len(self._pending)
+        if unpersisted:
+            raise MemoryPersistError(unpersisted)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so ``_flush`` can open its transaction with BEGIN IMMEDIATE.
+        conn = sqlite3.connect(
+            str(self._path), check_same_thread=False, timeout=5.0, isolation_level=None
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self) -> None:
+        """Writer thread: commit buffered sessions in batches and purge old ones."""
+        conn = self._connect()
+        next_sweep = time.monotonic() + self.sweep_interval_seconds
+        while True:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            flushed = self._flush(conn)
+            if self._stopping:
+                for _ in range(self.close_flush_attempts - 1):
+                    if flushed:
+                        break
+                    time.sleep(self.close_retry_delay_seconds)
+                    flushed = self._flush(conn)
+                break
+            if time.monotonic() >= next_sweep:
+                self._sweep(conn)
+                next_sweep = time.monotonic() + self.sweep_interval_seconds
+        conn.close()
+
+    def _flush(self, conn: sqlite3.Connection) -> bool:
+        """Apply every buffered change to the stored sessions in a single transaction.
+
+        Returns ``False`` if the write failed and the changes were buffered again.
+        """
+        with self._lock:
+            if not self._pending:
+                return True
+            batch, self._pending = self._pending, {}
+        started = time.perf_counter()
+        now = time.time()
+        try:
+            # Take the write lock before reading, so no other process commits in between.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = []
+                for conversation_id, mutations in batch.items():
+                    row = conn.execute(
+                        "SELECT payload FROM conversation_memory"
+                        " WHERE conversation_id = ? AND updated_at >= ?",
+                        (conversation_id, now - self._ttl),
+                    ).fetchone()
+                    session = (
+                        SessionMemory.from_json(conversation_id, row[0])
+                        if row
+                        else SessionMemory(conversation_id)
+                    )
+                    for mutate in mutations:
+                        mutate(session)
+                    rows.append((conversation_id, session.to_json(), now))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO conversation_memory"
+                    " (conversation_id, payload, updated_at)"
+                    " VALUES (?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as exc:
+            logger.warning("Failed to persist %d conversation sessions: %s", len(batch), exc)
+            with self._lock:
+                # Retry the changes before any buffered since, preserving their order.
+                for conversation_id, mutations in batch.items():
+                    self._pending[conversation_id] = mutations + self._pending.get(
+                        conversation_id, []
+                    )
+                self._stats["write_errors"] += 1
+            return False
+        with self._lock:
+            # Sessions without newer changes are read from the file again, including other
+            # workers' turns.
+            for conversation_id in batch:
+                if conversation_id not in self._pending:
+                    self._views.pop(conversation_id, None)
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(batch)
+            self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+    def _sweep(self, conn: sqlite3.Connection) -> None:
+        """Delete expired sessions and the oldest beyond ``max_sessions``."""
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                purged = conn.execute(
+                    "DELETE FROM conversation_memory WHERE updated_at < ?",
+                    (time.time() - self._ttl,),
+                ).rowcount
+                excess = (
+                    conn.execute("SELECT COUNT(*) FROM conversation_memory").fetchone()[0]
+                    - self._max_sessions
+                )
+                if excess > 0:
+                    purged += conn.execute(
+                        "DELETE FROM conversation_memory WHERE conversation_id IN ("
+                        " SELECT conversation_id FROM conversation_memory"
+                        " ORDER BY updated_at LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+        except sqlite3.Error as exc:
+            logger.warning("Failed to purge conversation sessions: %s", exc)
+            return
+        with self._lock:
+            self._stats["purged"] += purged
+
+
+def create_memory_backend(settings: Settings) -> MemoryBackend:
+    """Build the backend selected by ``settings.memory_backend``."""
+    if settings.memory_backend == "sqlite":
+        return SQLiteMemoryBackend(
+            Path(settings.memory_store_path),
+            max_sessions=settings.memory_max_sessions,
+            ttl_seconds=settings.memory_session_ttl_seconds,
+            flush_interval_seconds=settings.memory_flush_interval_seconds,
+            batch_size=settings.memory_flush_batch_size,
+        )
+    return InProcessMemoryBackend(
+        max_sessions=settings.memory_max_sessions,
+        ttl_seconds=settings.memory_session_ttl_seconds,
+    )
+
+
+def _content_bytes(session: SessionMemory) -> int:
+    """UTF-8 size of the text a session holds."""
+    text: List[str] = [session.summary] + [record.content for record in session.history]
+    return sum(len(part.encode("utf-8")) for part in text)
+
+
+class _RequestSessions:
+    """Sessions already read during one request, so each is deserialized at most once."""
 
     def __init__(self) -> None:
+        self.active = True
+        self.sessions: Dict[str, Optional[SessionMemory]] = {}
+
+
+class ConversationMemoryManager:
+    """Manages short-term and optional episodic memory.
+
+    Inside ``request_scope`` a session is read from the backend once and
+    reused by the later reads of that request; writes go through the
+    backend's atomic ``update`` and refresh the cached copy.
+    """
+
+    def __init__(self, backend: Optional[MemoryBackend] = None) -> None:
         settings = get_settings()
         self._enable_episodic = settings.enable_episodic_memory
-        self._sessions: Dict[str, SessionMemory] = {}
+        self._backend = backend or create_memory_backend(settings)
+        self._request: ContextVar[Optional[_RequestSessions]] = ContextVar(
+            f"memory_request_{id(self)}", default=None
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Size and activity metrics of the session store."""
+        return self._backend.stats
+
+    def close(self) -> None:
+        """Persist buffered sessions and release the backend; see ``MemoryBackend.close``."""
+        self._backend.close()
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """Cache the sessions read until the block exits."""
+        scope = _RequestSessions()
+        self._request.set(scope)
+        try:
+            yield
+        finally:
+            # Deactivated rather than reset: tasks started inside the block inherit the
+            # context, and a streaming generator may be finalized from another one.
+            scope.active = False
+            scope.sessions.clear()
+
+    def _get(self, conversation_id: str) -> Optional[SessionMemory]:
+        scope = self._request.get()
+        if scope is None or not scope.active:
+            return self._backend.get(conversation_id)
+        if conversation_id not in scope.sessions:
+            scope.sessions[conversation_id] = self._backend.get(conversation_id)
+        return scope.sessions[conversation_id]
+
+    def _update(self, conversation_id: str, mutate: Mutation) -> None:
+        session = self._backend.update(conversation_id, mutate)
+        scope = self._request.get()
+        if scope is not None and scope.active:
+            scope.sessions[conversation_id] = session
 
     def append(self, conversation_id: str, role: str, content: str) -> None:
         """Add a new message to the conversation."""
-        session = self._sessions.setdefault(conversation_id, SessionMemory(conversation_id))
-        session.history.append(MemoryRecord(role=role, content=content))
+        self._update(conversation_id, lambda session: session.add(role, content))
 
     def get_latest_turn(self, conversation_id: str) -> str:
         """Return the latest user turn for prompting."""
-        session = self._sessions.get(conversation_id)
-        if not session or not session.history:
+        session = self._get(conversation_id)
+        if not session or session.latest_user is None:
             return ""
-        latest = [record for record in reversed(session.history) if record.role == "user"]
-        return latest[0].content if latest else ""
+        return session.latest_user.content
+
+    def get_user_turn_count(self, conversation_id: str) -> int:
+        """Return how many user turns the conversation has seen."""
+        session = self._get(conversation_id)
+        return session.user_turns if session else 0
 
     def get_session_summary(self, conversation_id: str) -> str:
         """Return or compute a rolling summary."""
-        session = self._sessions.get(conversation_id)
+        session = self._get(conversation_id)
         if not session:
             return ""
         if session.summary:
             return session.summary
-        return self._summarize_history(session.history)
+        return session.digest()
 
-    def get_recent_transcript(self, conversation_id: str, turns: int = 6) -> str:
+    def get_recent_transcript(self, conversation_id: str, turns: int = TRANSCRIPT_TURNS) -> str:
         """Return the most recent conversational transcript."""
-        session = self._sessions.get(conversation_id)
-        if not session or not session.history:
+        session = self._get(conversation_id)
+        if not session:
             return ""
-        recent = list(session.history)[-turns:]
-        return "\n".join(f"{record.role}: {record.content}" for record in recent)
+        return session.transcript(turns)
 
     def update_summary(self, conversation_id: str, summary: str) -> None:
         """Persist a summary from the LangGraph workflow."""
-        session = self._sessions.setdefault(conversation_id, SessionMemory(conversation_id))
-        session.summary = summary
 
-    @staticmethod
-    def _summarize_history(history: Deque[MemoryRecord]) -> str:
-        """Fallback summarization heuristic when LLM summary isn't present."""
-        turns = list(history)[-4:]
-        chunks = [f"{record.role}: {record.content}" for record in turns]
-        return " | ".join(chunks)
+        def set_summary(session: SessionMemory) -> None:
+            session.summary = summary
 
+        self._update(conversation_id, set_summary)
@@ -0,0 +1,207 @@
+"""In-process latency histograms and counters exported in Prometheus text format."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond graph nodes up to slow Gemini calls with retries.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric(ABC):
+    """Labelled series of one metric family."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, values: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        """Exposition lines for this family, including HELP and TYPE."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines for every series, without HELP and TYPE."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the series selected by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._bounds = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., sum, count]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation, in seconds for duration metrics."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self._bounds) + 2)
+            for idx, bound in enumerate(self._bounds):
+                if value <= bound:
+                    series[idx] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines: List[str] = []
+        for key, values in series:
+            cumulative = 0.0
+            for bound, count in zip(self._bounds, values):
+                cumulative += count
+                labels = self._format_labels(key, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {_number(cumulative)}")
+            labels = self._format_labels(key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {_number(values[-1])}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(values[-2])}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {_number(values[-1])}")
+        return lines
+
+
+class ServiceMetrics:
+    """Metric families recorded by the API, the workflow and its services."""
+
+    def __init__(self) -> None:
+        self.http_seconds = Histogram(
+            "dragon_http_request_duration_seconds",
+            "HTTP request latency by route and status.",
+            ["method", "route", "status"],
+        )
+        self.node_seconds = Histogram(
+            "dragon_workflow_node_duration_seconds",
+            "Time spent in each support workflow node.",
+            ["node"],
+        )
+        self.node_errors = Counter(
+            "dragon_workflow_node_errors_total",
+            "Workflow node executions that raised.",
+            ["node"],
+        )
+        self.gemini_seconds = Histogram(
+            "dragon_gemini_call_duration_seconds",
+            "Gemini calls including rate limiting and retries, by model, method and outcome.",
+            ["model", "method", "outcome"],
+        )
+        self.retrieval_seconds = Histogram(
+            "dragon_retrieval_duration_seconds",
+            "Knowledge base retrieval latency, with or without a tag filter.",
+            ["filtered"],
+        )
+        self._families: List[_Metric] = [
+            self.http_seconds,
+            self.node_seconds,
+            self.node_errors,
+            self.gemini_seconds,
+            self.retrieval_seconds,
+        ]
+
+    def render(self) -> str:
+        """All families in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in self._families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache
+def get_metrics() -> ServiceMetrics:
+    """Process-wide metric families."""
+    return ServiceMetrics()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
@@ -0,0 +1,259 @@
+"""Client-side request scheduling against Gemini RPM/TPM quotas."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import random
+import re
+import threading
+import time
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.api_core import exceptions as core_exceptions
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_RETRY_HINT = re.compile(r"retry in ([\d.]+)s", re.IGNORECASE)
+_RETRYABLE = (
+    core_exceptions.ResourceExhausted,
+    core_exceptions.TooManyRequests,
+    core_exceptions.ServiceUnavailable,
+    core_exceptions.InternalServerError,
+    core_exceptions.DeadlineExceeded,
+)
+# Waiters re-check at least this often so a released head-of-line slot is noticed.
+_POLL_SECONDS = 0.05
+
+
+class Priority(IntEnum):
+    """Scheduling class of a Gemini call; lower values are served first."""
+
+    INTERACTIVE = 0
+    SUMMARY = 1
+    INGESTION = 2
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a request cannot be admitted before its deadline."""
+
+
+class GeminiRateLimiter:
+    """Token buckets for requests and tokens per minute with priority admission.
+
+    Waiting requests are admitted strictly by priority, then arrival order.
+    Background classes additionally leave ``interactive_reserve`` of each bucket
+    untouched so a burst of summaries or ingestion cannot starve user turns.
+    A limit of 0 disables that bucket. Works from both threads and coroutines.
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int, interactive_reserve: float = 0.2) -> None:
+        self._name = name
+        self._buckets: List[Tuple[float, float]] = []  # (capacity, refill per second)
+        for limit in (rpm, tpm):
+            self._buckets.append((float(limit), limit / 60.0))
+        self._levels = [capacity for capacity, _ in self._buckets]
+        self._reserve = interactive_reserve
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "admitted": {priority.name.lower(): 0 for priority in Priority},
+            "timeouts": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Admission counters and current bucket levels."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "name": self._name,
+                "admitted": dict(self._stats["admitted"]),
+                "timeouts": self._stats["timeouts"],
+                "throttled": self._stats["throttled"],
+                "wait_seconds": round(self._stats["wait_seconds"], 3),
+                "waiting": len(self._waiting),
+                "requests_available": _level(self._buckets[0], self._levels[0]),
+                "tokens_available": _level(self._buckets[1], self._levels[1]),
+            }
+
+    async def acquire(self, tokens: int, priority: Priority, deadline: float) -> None:
+        """Wait without blocking the event loop until the request may be sent."""
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_admit(ticket, tokens, deadline)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, _POLL_SECONDS))
+        finally:
+            self._leave(ticket, started)
+
+    def acquire_sync(self, tokens: int, priority: Priority, deadline: float) -> None:
+        """Blocking variant of ``acquire`` for worker threads."""
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_admit(ticket, tokens, deadline)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, _POLL_SECONDS))
+        finally:
+            self._leave(ticket, started)
+
+    def try_acquire(self, tokens: int, priority: Priority) -> bool:
+        """Take capacity only if it is free right now and nobody is queued ahead."""
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            return self._try_admit(ticket, tokens, math.inf) <= 0
+        finally:
+            self._leave(ticket, started)
+
+    def settle(self, reserved: int, actual: Optional[int]) -> None:
+        """Correct the token bucket once the real usage of a request is known."""
+        if actual is None or not self._buckets[1][0]:
+            return
+        with self._lock:
+            capacity = self._buckets[1][0]
+            self._levels[1] = min(capacity, self._levels[1] + reserved - actual)
+
+    def throttle(self, seconds: float) -> None:
+        """Hold every request back after the server reported quota exhaustion."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["throttled"] += 1
+
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        ticket = (int(priority), next(self._sequence))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _leave(self, ticket: Tuple[int, int], started: float) -> None:
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+            self._stats["wait_seconds"] += time.monotonic() - started
+
+    def _try_admit(self, ticket: Tuple[int, int], tokens: int, deadline: float) -> float:
+        """Take capacity for ``ticket`` and return 0, or return how long to wait."""
+        now = time.monotonic()
+        with self._lock:
+            if now >= deadline:
+                self._stats["timeouts"] += 1
+                raise RateLimitTimeout(
+                    f"Client-side rate limit: {self._name} request not admitted before its deadline"
+                )
+            self._refill(now)
+            if self._paused_until > now:
+                return self._paused_until - now
+            if self._waiting[0] != ticket:
+                return _POLL_SECONDS
+
+            wait = 0.0
+            takes = [0.0, 0.0]
+            for idx, ((capacity, rate), need) in enumerate(
+                zip(self._buckets, (1.0, float(tokens)))
+            ):
+                if not capacity:
+                    continue
+                floor = capacity * self._reserve if ticket[0] != Priority.INTERACTIVE else 0.0
+                # Oversized requests may drain the bucket down to their floor rather than wait
+                # forever; background classes never take the interactive reserve.
+                takes[idx] = min(need, capacity - floor)
+                shortfall = takes[idx] + floor - self._levels[idx]
+                if shortfall > 0:
+                    wait = max(wait, shortfall / rate)
+            if wait > 0:
+                return wait
+
+            for idx, take in enumerate(takes):
+                self._levels[idx] -= take
+            heapq.heappop(self._waiting)
+            self._stats["admitted"][Priority(ticket[0]).name.lower()] += 1
+            return 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        for idx, (capacity, rate) in enumerate(self._buckets):
+            self._levels[idx] = min(capacity, self._levels[idx] + elapsed * rate)
+
+
+def _level(bucket: Tuple[float, float], level: float) -> Optional[int]:
+    """Bucket level for reporting; ``None`` when unlimited."""
+    return int(level) if bucket[0] else None
+
+
+def retry_delay(exc: Exception, attempt: int, deadline: float, max_retries: int) -> Optional[float]:
+    """Backoff before retrying ``exc``, or ``None`` when it should not be retried.
+
+    Uses full-jitter exponential backoff, never shorter than a server-provided
+    "retry in Ns" hint, and gives up if the wait would overrun ``deadline``.
+    """
+    if attempt >= max_retries or not is_retryable(exc):
+        return None
+    delay = random.uniform(0.0, min(8.0, 0.5 * 2**attempt))
+    hint = _RETRY_HINT.search(str(exc))
+    if hint:
+        delay = max(delay, float(hint.group(1)))
+    if time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Transient quota and availability failures."""
+    if isinstance(exc, _RETRYABLE):
+        return True
+    # LangChain's embedding wrapper re-raises API errors as plain exceptions.
+    message = str(exc)
+    return "429" in message or "ResourceExhausted" in message or "503" in message
+
+
+def is_quota_error(exc: Exception) -> bool:
+    """Whether the server rejected a call for exceeding quota."""
+    if isinstance(exc, (core_exceptions.ResourceExhausted, core_exceptions.TooManyRequests)):
+        return True
+    message = str(exc)
+    return "429" in message or "ResourceExhausted" in message
+
+
+@lru_cache
+def get_generation_limiter() -> GeminiRateLimiter:
+    """Limiter shared by all calls to the generation model."""
+    settings = get_settings()
+    return GeminiRateLimiter(
+        "generation",
+        rpm=settings.gemini_rpm,
+        tpm=settings.gemini_tpm,
+        interactive_reserve=settings.rate_limit_interactive_reserve,
+    )
+
+
+@lru_cache
+def get_embedding_limiter() -> GeminiRateLimiter:
+    """Limiter shared by all calls to the embedding model."""
+    settings = get_settings()
+    return GeminiRateLimiter(
+        "embedding",
+        rpm=settings.embedding_rpm,
+        tpm=settings.embedding_tpm,
+        interactive_reserve=settings.rate_limit_interactive_reserve,
+    )
@@ -2,82 +2,643 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 from app.core.config import get_settings
 from app.models.schemas import IngestionDocument, RetrievedDocument
+from app.services.embeddings import CachedEmbeddings, RateLimitedEmbeddings
+from app.services.metrics import get_metrics
+from app.services.rate_limit import get_embedding_limiter
+from app.services.sparse import BM25Index
+from app.services.transport import bind_client, get_gemini_transport
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_FILENAME = "ingest_manifest.json"
+SPARSE_INDEX_FILENAME = "bm25_index.json"
+LOCK_FILENAME = ".kb.lock"
+# Bumped when chunk metadata gains keys that existing stores must be backfilled with.
+METADATA_VERSION = 2
+TAG_FLAG_PREFIX = "tag_"
+_NON_IDENTIFIER = re.compile(r"[^a-z0-9]+")
+# Emoji and numbering before a seed heading's text, e.g. "⭐ 10. ".
+_SEED_HEADING_PREFIX = re.compile(r"^[^\w(]*(\d+\.\s*)?")
+# Seed sections whose heading mentions a keyword get the tag.
+SEED_SECTION_TAGS: Dict[str, Tuple[str, ...]] = {"withdrawal": ("payout", "withdrawal")}
+# The seed was once a single document carrying every tag; bootstrap deletes it.
+RETIRED_SEED_DOCUMENT_IDS = ("dragon-faq-core",)
+
+# (chunk text, chunk metadata, relevance score)
+ScoredChunk = Tuple[str, Dict[str, Any], float]
+
+# BM25 indexes parsed before the server forks, keyed by path: (file mtime, index).
+_preloaded_sparse: Dict[Path, Tuple[float, BM25Index]] = {}
+
+
+@dataclass(frozen=True)
+class KnowledgeChunk:
+    """A content-addressed split of an ingestion document."""
+
+    id: str
+    document_id: str
+    text: str
+    metadata: Dict[str, Any]
+
+
+@dataclass
+class DocumentPlan:
+    """Difference between a document's current chunks and what is indexed."""
+
+    document_id: str
+    chunks: List[KnowledgeChunk]
+    new_chunks: List[KnowledgeChunk]
+    stale_ids: List[str]
+    kept: List[KnowledgeChunk]
+    legacy_ids: List[str] = field(default_factory=list)
+    reindex_kept: bool = False
+
+
+@dataclass
+class IngestStats:
+    """Outcome of an incremental ingestion pass."""
+
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    documents: List[str] = field(default_factory=list)
+
+
+def tag_flag(tag: str) -> str:
+    """Boolean metadata key marking a chunk with ``tag``, usable in Chroma ``where`` filters."""
+    return TAG_FLAG_PREFIX + _NON_IDENTIFIER.sub("_", tag.lower()).strip("_")
+
+
+def tag_flags(tags: Iterable[str]) -> Dict[str, bool]:
+    """Per-tag boolean metadata for a chunk."""
+    return {tag_flag(tag): True for tag in tags if tag}
+
+
+def build_splitter() -> RecursiveCharacterTextSplitter:
+    """Splitter shared by in-process and worker-process chunking."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=500,
+        chunk_overlap=75,
+        separators=["\n## ", "\n### ", "\n", ".", " "],
+    )
+
+
+_worker_splitter: Optional[RecursiveCharacterTextSplitter] = None
+
+
+def split_document(
+    doc: IngestionDocument, splitter: Optional[RecursiveCharacterTextSplitter] = None
+) -> List[KnowledgeChunk]:
+    """Split a document and assign content-hash chunk ids.
+
+    Module-level so ingestion can fan it out to a process pool.
+    """
+    global _worker_splitter  # pylint: disable=global-statement
+    if splitter is None:
+        if _worker_splitter is None:
+            _worker_splitter = build_splitter()
+        splitter = _worker_splitter
+
+    metadata = {
+        "id": doc.id,
+        "title": doc.title,
+        # Chroma only stores scalar metadata values, so lists are comma-joined.
+        "domain": ",".join(doc.domain),
+        "tags": ",".join(doc.tags),
+        "confidence": doc.confidence,
+        "owner": doc.owner,
+        "effective_at": doc.effective_at.isoformat() if doc.effective_at else None,
+        "expires_at": doc.expires_at.isoformat() if doc.expires_at else None,
+        "source_url": doc.source_url,
+    }
+    fingerprint = json.dumps(metadata, sort_keys=True, default=str)
+    # Derived from ``tags``, so kept out of the fingerprint to leave chunk ids unchanged.
+    metadata.update(tag_flags(doc.tags))
+
+    splits = splitter.split_text(doc.content)
+    chunks: List[KnowledgeChunk] = []
+    occurrences: Dict[str, int] = {}
+    for idx, text in enumerate(splits):
+        # Identical splits inside one document still need distinct ids.
+        occurrence = occurrences.get(text, 0)
+        occurrences[text] = occurrence + 1
+        digest = hashlib.sha256(
+            f"{fingerprint}\x1f{occurrence}\x1f{text}".encode("utf-8")
+        ).hexdigest()
+
+        chunk_metadata = metadata.copy()
+        chunk_metadata.update({"chunk_index": idx, "chunk_count": len(splits)})
+        chunks.append(
+            KnowledgeChunk(
+                id=f"{doc.id}:{digest[:32]}", document_id=doc.id, text=text, metadata=chunk_metadata
+            )
+        )
+    return chunks
+
 
 class DragonKnowledgeBase:
-    """Vector store-backed knowledge base for Dragon Funded content."""
+    """Vector store-backed knowledge base for Dragon Funded content.
+
+    ``embedder`` replaces the rate-limited Gemini embedding API, e.g. with a
+    local function for benchmarks; its ``model`` attribute names the vectors
+    in the embedding cache and manifest.
 
-    def __init__(self) -> None:
+    Several processes may open the same store. Writes hold a file lock in the
+    store directory (see ``writing``), and the manifest, revision and BM25
+    index are reloaded when another process persisted newer ones. Chroma's
+    in-memory vector index is not: a worker only sees vectors another process
+    added after it restarts.
+    """
+
+    def __init__(self, embedder: Optional[Embeddings] = None) -> None:
         settings = get_settings()
         self._persist_path = Path(settings.vector_store_path)
         self._collection = settings.knowledge_base_collection
         self._persist_path.mkdir(parents=True, exist_ok=True)
+        self._embedding_model = (
+            settings.embedding_model
+            if embedder is None
+            else getattr(embedder, "model", type(embedder).__name__)
+        )
+        self._manifest_path = self._persist_path / MANIFEST_FILENAME
+        self._sparse_path = self._persist_path / SPARSE_INDEX_FILENAME
+        self._lock_path = self._persist_path / LOCK_FILENAME
+        self._ingest_lock = threading.Lock()
+        self._store_thread_lock = threading.RLock()
+        self._store_lock_depth = 0
+        self._store_lock_file: Optional[IO[bytes]] = None
+        # Identity of the manifest file this process last loaded or wrote.
+        self._indexes_stamp: Optional[Tuple[int, int, int]] = None
+        self._retrieval_mode = settings.retrieval_mode
+        self._sparse_fast_path = settings.sparse_fast_path
+        self._sparse_decisive_score = settings.sparse_decisive_score
+        self._sparse_decisive_margin = settings.sparse_decisive_margin
+        self._rrf_k = settings.rrf_k
+        self._filter_min_results = settings.filtered_retrieval_min_results
 
-        self._embeddings = GoogleGenerativeAIEmbeddings(
-            model=settings.embedding_model,
-            google_api_key=settings.gemini_api_key,
+        if embedder is None:
+            gemini_embedder = GoogleGenerativeAIEmbeddings(
+                model=settings.embedding_model,
+                google_api_key=settings.gemini_api_key,
+            )
+            # Share the generation client's connection pool instead of a separate channel.
+            bind_client(gemini_embedder, "client", get_gemini_transport().client())
+            embedder = RateLimitedEmbeddings(
+                gemini_embedder,
+                limiter=get_embedding_limiter(),
+                max_retries=settings.gemini_max_retries,
+                interactive_deadline_seconds=settings.gemini_interactive_deadline_seconds,
+                background_deadline_seconds=settings.gemini_background_deadline_seconds,
+            )
+        self._embeddings = CachedEmbeddings(
+            embedder,
+            model=self._embedding_model,
+            cache_path=self._persist_path / "embedding_cache.sqlite3",
+            lru_size=settings.embedding_cache_size,
         )
-        self._vector_store = Chroma(
-            collection_name=self._collection,
-            embedding_function=self._embeddings,
-            persist_directory=str(self._persist_path),
+        self._splitter = build_splitter()
+        with self._store_lock():
+            self._vector_store = Chroma(
+                collection_name=self._collection,
+                embedding_function=self._embeddings,
+                persist_directory=str(self._persist_path),
+            )
+            self._manifest = self._load_manifest()
+            self._sparse = self._load_sparse_index()
+            self._indexes_stamp = self._manifest_stamp()
+            if self._manifest.get("metadata_version") != METADATA_VERSION:
+                self._backfill_tag_flags()
+
+    @property
+    def revision(self) -> int:
+        """Counter bumped whenever ingestion changes the collection, shared through the manifest."""
+        self.refresh()
+        return int(self._manifest.get("revision", 0))
+
+    @property
+    def embeddings(self) -> CachedEmbeddings:
+        """Embedding function shared by ingestion and retrieval."""
+        return self._embeddings
+
+    def ingest(self, documents: Iterable[IngestionDocument]) -> IngestStats:
+        """Incrementally ingest structured documents into the vector store.
+
+        Chunks are keyed by a hash of their text and document metadata, so only
+        new or changed chunks are embedded and chunks that disappeared from a
+        document are deleted. Re-ingesting unchanged content is a no-op.
+        """
+        stats = IngestStats()
+        with self.writing():
+            for doc in documents:
+                plan = self.plan_document(doc.id, self.chunk_document(doc))
+                self.apply_plan(plan)
+                stats.added += len(plan.new_chunks)
+                stats.removed += len(plan.stale_ids)
+                stats.unchanged += len(plan.kept)
+                stats.documents.append(doc.id)
+            self.persist_indexes()
+
+        if stats.added or stats.removed:
+            logger.info(
+                "Ingested %s new knowledge chunks (%s removed, %s unchanged) into collection %s",
+                stats.added,
+                stats.removed,
+                stats.unchanged,
+                self._collection,
+            )
+        else:
+            logger.info(
+                "Knowledge collection %s already up to date (%s chunks).",
+                self._collection,
+                stats.unchanged,
+            )
+        return stats
+
+    def remove_documents(self, document_ids: Iterable[str]) -> int:
+        """Delete documents the manifest knows about; returns the number of chunks removed."""
+        removed = 0
+        with self.writing():
+            for document_id in document_ids:
+                with self._ingest_lock:
+                    indexed = self._manifest["documents"].get(document_id)
+                if indexed is None:
+                    continue
+                self.apply_plan(
+                    DocumentPlan(
+                        document_id=document_id,
+                        chunks=[],
+                        new_chunks=[],
+                        stale_ids=list(indexed),
+                        kept=[],
+                    )
+                )
+                with self._ingest_lock:
+                    del self._manifest["documents"][document_id]
+                removed += len(indexed)
+                logger.info("Removed document %s (%s chunks)", document_id, len(indexed))
+            if removed:
+                self.persist_indexes()
+        return removed
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Hold the store's write lock, starting from the indexes other processes last persisted.
+
+        ``plan_document``, ``apply_plan`` and ``persist_indexes`` must run inside
+        it so concurrent writers neither interleave nor overwrite each other's
+        manifest and BM25 index.
+        """
+        with self._store_lock():
+            self.refresh()
+            yield
+
+    def refresh(self) -> bool:
+        """Reload the manifest and BM25 index if another process persisted newer ones."""
+        stamp = self._manifest_stamp()
+        if stamp == self._indexes_stamp:
+            return False
+        with self._ingest_lock:
+            if stamp == self._indexes_stamp:
+                return False
+            self._manifest = self._load_manifest()
+            self._sparse = BM25Index.load(self._sparse_path)
+            self._indexes_stamp = stamp
+        logger.info(
+            "Reloaded knowledge indexes persisted by another process (revision %s).",
+            self._manifest.get("revision", 0),
         )
+        return True
+
+    @contextmanager
+    def _store_lock(self) -> Iterator[None]:
+        """Exclusive lock on the store across processes; reentrant within this one.
+
+        A POSIX record lock rather than ``flock``: processes forked while it is
+        held (the ingestion split pool) do not inherit it.
+        """
+        with self._store_thread_lock:
+            if self._store_lock_depth == 0 and fcntl is not None:
+                lock_file = open(self._lock_path, "ab")  # pylint: disable=consider-using-with
+                fcntl.lockf(lock_file, fcntl.LOCK_EX)
+                self._store_lock_file = lock_file
+            self._store_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._store_lock_depth -= 1
+                if self._store_lock_depth == 0 and self._store_lock_file is not None:
+                    self._store_lock_file.close()  # releases the lock
+                    self._store_lock_file = None
+
+    def _manifest_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Inode, size and mtime of the manifest, which every ``persist_indexes`` replaces."""
+        try:
+            stat = self._manifest_path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def chunk_document(self, doc: IngestionDocument) -> List[KnowledgeChunk]:
+        """Split a document and assign content-hash chunk ids."""
+        return split_document(doc, self._splitter)
 
-        self._splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=75,
-            separators=["\n## ", "\n### ", "\n", ".", " "],
+    def plan_document(self, document_id: str, chunks: List[KnowledgeChunk]) -> DocumentPlan:
+        """Work out which chunks need embedding, deleting, or only a metadata refresh."""
+        with self._ingest_lock:
+            indexed = self._manifest["documents"].get(document_id)
+        legacy_ids: List[str] = []
+        if indexed is None:
+            # Unknown to the manifest: clear vectors left by earlier, non-incremental ingests.
+            legacy_ids = self._vector_store.get(where={"id": document_id}, include=[])["ids"]
+            indexed = {}
+
+        current = {chunk.id for chunk in chunks}
+        new_chunks = [chunk for chunk in chunks if chunk.id not in indexed]
+        stale_ids = [chunk_id for chunk_id in indexed if chunk_id not in current]
+        kept = [chunk for chunk in chunks if chunk.id in indexed]
+        moved = any(indexed[chunk.id] != chunk.metadata["chunk_index"] for chunk in kept)
+        return DocumentPlan(
+            document_id=document_id,
+            chunks=chunks,
+            new_chunks=new_chunks,
+            stale_ids=stale_ids,
+            kept=kept,
+            legacy_ids=legacy_ids,
+            # Positions shift when neighbours change; refresh metadata without re-embedding.
+            reindex_kept=bool(kept) and (moved or bool(new_chunks) or bool(stale_ids)),
         )
 
-    def ingest(self, documents: Iterable[IngestionDocument]) -> None:
-        """Ingest structured documents into the vector store."""
-        langchain_docs: List[Document] = []
-
-        for doc in documents:
-            metadata = {
-                "id": doc.id,
-                "title": doc.title,
-                "domain": doc.domain,
-                "tags": doc.tags,
-                "confidence": doc.confidence,
-                "owner": doc.owner,
-                "effective_at": doc.effective_at.isoformat() if doc.effective_at else None,
-                "expires_at": doc.expires_at.isoformat() if doc.expires_at else None,
-                "source_url": doc.source_url,
+    def apply_plan(
+        self,
+        plan: DocumentPlan,
+        vectors: Optional[List[List[float]]] = None,
+        batch_size: int = 256,
+    ) -> None:
+        """Write a document plan to Chroma and record it in the manifest.
+
+        ``vectors`` holds precomputed embeddings for ``plan.new_chunks``; when
+        omitted the vector store embeds them itself.
+        """
+        removed = plan.legacy_ids + plan.stale_ids
+        for start in range(0, len(removed), batch_size):
+            self._vector_store.delete(ids=removed[start : start + batch_size])
+        self._sparse.remove(removed)
+        if plan.legacy_ids:
+            logger.info(
+                "Removed %s legacy chunks for document %s", len(plan.legacy_ids), plan.document_id
+            )
+
+        collection = self._vector_store._collection  # pylint: disable=protected-access
+        for start in range(0, len(plan.new_chunks), batch_size):
+            batch = plan.new_chunks[start : start + batch_size]
+            if vectors is None:
+                self._vector_store.add_texts(
+                    texts=[chunk.text for chunk in batch],
+                    metadatas=[chunk.metadata for chunk in batch],
+                    ids=[chunk.id for chunk in batch],
+                )
+            else:
+                collection.upsert(
+                    ids=[chunk.id for chunk in batch],
+                    embeddings=vectors[start : start + batch_size],
+                    metadatas=[chunk.metadata for chunk in batch],
+                    documents=[chunk.text for chunk in batch],
+                )
+        for chunk in plan.new_chunks:
+            self._sparse.add(chunk.id, chunk.text, chunk.metadata)
+        if plan.reindex_kept:
+            for start in range(0, len(plan.kept), batch_size):
+                batch = plan.kept[start : start + batch_size]
+                collection.update(
+                    ids=[chunk.id for chunk in batch], metadatas=[chunk.metadata for chunk in batch]
+                )
+            for chunk in plan.kept:
+                self._sparse.update_metadata(chunk.id, chunk.metadata)
+
+        with self._ingest_lock:
+            self._manifest["documents"][plan.document_id] = {
+                chunk.id: chunk.metadata["chunk_index"] for chunk in plan.chunks
             }
+            if plan.new_chunks or removed:
+                self._manifest["revision"] = self._manifest.get("revision", 0) + 1
 
-            splits = self._splitter.split_text(doc.content)
-            for idx, chunk in enumerate(splits):
-                chunk_metadata = metadata.copy()
-                chunk_metadata.update({"chunk_index": idx, "chunk_count": len(splits)})
-                langchain_docs.append(Document(page_content=chunk, metadata=chunk_metadata))
+    def persist_indexes(self) -> None:
+        """Atomically write the lexical index and then the manifest next to the Chroma store.
 
-        if not langchain_docs:
-            logger.info("No documents to ingest.")
-            return
+        The manifest goes last: other processes reload both when it changes.
+        """
+        with self._store_lock(), self._ingest_lock:
+            self._sparse.save(self._sparse_path)
+            payload = json.dumps(self._manifest, sort_keys=True)
+            tmp_path = self._manifest_path.with_suffix(".tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self._manifest_path)
+            self._indexes_stamp = self._manifest_stamp()
+
+    def _load_sparse_index(self) -> BM25Index:
+        """Load the persisted BM25 index, rebuilding it from Chroma if it is out of step."""
+        index = _take_preloaded_sparse_index(self._sparse_path)
+        if index is None:
+            index = BM25Index.load(self._sparse_path)
+        collection_size = self._vector_store._collection.count()  # pylint: disable=protected-access
+        if len(index) == collection_size:
+            return index
+
+        logger.info("Rebuilding BM25 index from %s stored chunks.", collection_size)
+        index = BM25Index()
+        stored = self._vector_store.get(include=["documents", "metadatas"])
+        for chunk_id, text, metadata in zip(
+            stored["ids"], stored["documents"], stored["metadatas"]
+        ):
+            index.add(chunk_id, text or "", metadata or {})
+        index.save(self._sparse_path)
+        return index
+
+    def _backfill_tag_flags(self, batch_size: int = 256) -> None:
+        """Add per-tag filter keys to chunks indexed before they existed."""
+        stored = self._vector_store.get(include=["metadatas"])
+        collection = self._vector_store._collection  # pylint: disable=protected-access
+        updates = [
+            (chunk_id, dict(metadata, **tag_flags(_split_list(metadata.get("tags")))))
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"])
+            if metadata
+        ]
+        for start in range(0, len(updates), batch_size):
+            batch = updates[start : start + batch_size]
+            collection.update(
+                ids=[chunk_id for chunk_id, _ in batch],
+                metadatas=[metadata for _, metadata in batch],
+            )
+        for chunk_id, metadata in updates:
+            self._sparse.update_metadata(chunk_id, metadata)
+
+        self._manifest["metadata_version"] = METADATA_VERSION
+        self.persist_indexes()
+        if updates:
+            logger.info("Backfilled tag filter metadata on %s stored chunks.", len(updates))
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the record of indexed chunk hashes, discarding it if it no longer applies."""
+        empty = {
+            "collection": self._collection,
+            "embedding_model": self._embedding_model,
+            "metadata_version": METADATA_VERSION,
+            "revision": 0,
+            "documents": {},
+        }
+        if not self._manifest_path.exists():
+            return empty
+        try:
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable ingest manifest %s: %s", self._manifest_path, exc)
+            return empty
+        # Keep the revision moving forward even when the manifest is discarded.
+        empty["revision"] = int(manifest.get("revision", 0)) + 1
+
+        if (
+            manifest.get("collection") != self._collection
+            or manifest.get("embedding_model") != self._embedding_model
+        ):
+            logger.info("Embedding model or collection changed; knowledge will be re-indexed.")
+            return empty
+        if (
+            manifest.get("documents") and self._vector_store._collection.count() == 0
+        ):  # pylint: disable=protected-access
+            logger.info("Vector store is empty; discarding stale ingest manifest.")
+            return empty
+        manifest.setdefault("documents", {})
+        return manifest
+
+    def retrieve(
+        self, query: str, k: int = 4, tags: Optional[Sequence[str]] = None
+    ) -> List[RetrievedDocument]:
+        """Retrieve top-k relevant documents.
+
+        When ``tags`` are given only chunks carrying at least one of them are
+        searched; if that yields fewer than ``filtered_retrieval_min_results``
+        documents the rest are filled from an unfiltered search.
+        """
+        self.refresh()
+        with get_metrics().retrieval_seconds.time(filtered="true" if tags else "false"):
+            return self._retrieve(query, k, tags)
+
+    def narrows(self, tags: Sequence[str]) -> bool:
+        """Whether filtering on ``tags`` searches some, but not all, of the indexed chunks.
+
+        A filter every chunk passes changes nothing, and one no chunk passes
+        falls back to the unfiltered search. Counts the indexes as last loaded,
+        so it is cheap enough for the event loop.
+        """
+        matched = self._sparse.count(list(tag_flags(tags)))
+        return 0 < matched < len(self._sparse)
+
+    def _retrieve(
+        self, query: str, k: int, tags: Optional[Sequence[str]]
+    ) -> List[RetrievedDocument]:
+        """Body of ``retrieve``, timed by the caller."""
+        if not tags:
+            return self._search(query, k)
+
+        docs = self._search(query, k, tags)
+        if len(docs) >= min(k, self._filter_min_results):
+            return docs
+        logger.debug(
+            "Only %s chunks matched tags %s; filling from unfiltered search.", len(docs), list(tags)
+        )
+        seen = {(doc.id, doc.content) for doc in docs}
+        for doc in self._search(query, k):
+            if len(docs) >= k:
+                break
+            if (doc.id, doc.content) not in seen:
+                docs.append(doc)
+        return docs
+
+    def _search(
+        self, query: str, k: int, tags: Optional[Sequence[str]] = None
+    ) -> List[RetrievedDocument]:
+        """Run the configured retrieval strategy, optionally restricted to tagged chunks.
+
+        In hybrid mode BM25 and dense results are merged with reciprocal rank
+        fusion. When the lexical ranking is decisive on its own, the dense
+        search (and its embedding call) is skipped entirely.
+        """
+        candidates = max(k * 2, 10)
+        sparse_hits: List[ScoredChunk] = []
+        if self._retrieval_mode == "hybrid":
+            sparse_hits = [
+                (chunk.text, chunk.metadata, score)
+                for chunk, score in self._sparse.search(
+                    query, k=candidates, flags=list(tag_flags(tags or []))
+                )
+            ]
+            if self._sparse_fast_path and self._is_decisive(sparse_hits):
+                logger.debug("Lexical match is decisive; skipping dense search.")
+                return [
+                    self._to_retrieved(text, metadata, score)
+                    for text, metadata, score in sparse_hits[:k]
+                ]
+
+        dense_hits = self._dense_search(
+            query, candidates if sparse_hits else k, self._tag_filter(tags)
+        )
+        if not sparse_hits:
+            return [
+                self._to_retrieved(text, metadata, score)
+                for text, metadata, score in dense_hits[:k]
+            ]
+        return self._fuse(dense_hits, sparse_hits, k)
 
-        self._vector_store.add_documents(langchain_docs)
-        self._vector_store.persist()
-        logger.info("Ingested %s knowledge chunks into collection %s", len(langchain_docs), self._collection)
+    def serves_lexically(
+        self, query: str, k: int = 4, tags: Optional[Sequence[str]] = None
+    ) -> bool:
+        """Whether ``retrieve`` would answer ``query`` from BM25 alone, without embedding it."""
+        if self._retrieval_mode != "hybrid" or not self._sparse_fast_path:
+            return False
+        self.refresh()
+        hits = [
+            (chunk.text, chunk.metadata, score)
+            for chunk, score in self._sparse.search(
+                query, k=max(k * 2, 10), flags=list(tag_flags(tags or []))
+            )
+        ]
+        if tags and len(hits) < min(k, self._filter_min_results):
+            return False
+        return self._is_decisive(hits)
 
-    def retrieve(self, query: str, k: int = 4) -> List[RetrievedDocument]:
-        """Retrieve top-k relevant documents."""
+    def _dense_search(
+        self, query: str, k: int, where: Optional[Dict[str, Any]] = None
+    ) -> List[ScoredChunk]:
+        """Similarity search against the vector store."""
         try:
-            results = self._vector_store.similarity_search_with_relevance_scores(query, k=k)
-            if not results:
+            results = self._vector_store.similarity_search_with_relevance_scores(
+                query, k=k, filter=where
+            )
+            if not results and where is None:
                 logger.warning("Vector store returned no results for query. Collection may be empty.")
                 return []
         except ValueError as exc:
@@ -90,40 +651,155 @@ class DragonKnowledgeBase:
             error_type = type(exc).__name__
             logger.exception("Similarity search failed [%s]: %s", error_type, exc)
             return []
+        return [(doc.page_content, doc.metadata or {}, score) for doc, score in results]
 
-        retrieved: List[RetrievedDocument] = []
-        for doc, score in results:
-            metadata = doc.metadata or {}
-            retrieved.append(
-                RetrievedDocument(
-                    id=metadata.get("id", ""),
-                    title=metadata.get("title", "Dragon Funded Knowledge"),
-                    content=doc.page_content,
-                    domain=metadata.get("domain", []),
-                    confidence=float(metadata.get("confidence", max(0.4, min(1.0, score)))),
-                    provenance=metadata.get("source_url"),
-                )
-            )
+    @staticmethod
+    def _tag_filter(tags: Optional[Sequence[str]]) -> Optional[Dict[str, Any]]:
+        """Chroma ``where`` clause matching chunks that carry any of ``tags``."""
+        clauses = [{key: True} for key in tag_flags(tags or [])]
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def _is_decisive(self, hits: List[ScoredChunk]) -> bool:
+        """True when the best lexical hit is strong and clearly ahead of the runner-up."""
+        if not hits or hits[0][2] < self._sparse_decisive_score:
+            return False
+        return len(hits) == 1 or hits[0][2] >= self._sparse_decisive_margin * hits[1][2]
+
+    def _fuse(
+        self, dense: List[ScoredChunk], sparse: List[ScoredChunk], k: int
+    ) -> List[RetrievedDocument]:
+        """Reciprocal rank fusion of dense and lexical rankings."""
+        fused: Dict[Tuple[Any, Any], List[Any]] = {}
+        for ranking in (dense, sparse):
+            for rank, (text, metadata, score) in enumerate(ranking):
+                key = (metadata.get("id"), metadata.get("chunk_index"))
+                entry = fused.setdefault(key, [0.0, text, metadata, 0.0])
+                entry[0] += 1.0 / (self._rrf_k + rank + 1)
+                if ranking is dense:
+                    entry[3] = score
+        ranked = sorted(fused.values(), key=lambda entry: entry[0], reverse=True)[:k]
+        return [
+            self._to_retrieved(text, metadata, score, rank_score=fused_score)
+            for fused_score, text, metadata, score in ranked
+        ]
+
+    @staticmethod
+    def _to_retrieved(
+        text: str, metadata: Dict[str, Any], score: float, rank_score: Optional[float] = None
+    ) -> RetrievedDocument:
+        """Convert a stored chunk into the API model.
+
+        ``rank_score`` overrides ``score`` for ordering.
+        """
+        return RetrievedDocument(
+            id=metadata.get("id", ""),
+            title=metadata.get("title", "Dragon Funded Knowledge"),
+            content=text,
+            domain=_split_list(metadata.get("domain")),
+            confidence=float(metadata.get("confidence", max(0.4, min(1.0, score)))),
+            provenance=metadata.get("source_url"),
+            chunk_index=metadata.get("chunk_index"),
+            score=rank_score if rank_score is not None else score,
+        )
+
+    async def aretrieve(
+        self, query: str, k: int = 4, tags: Optional[Sequence[str]] = None
+    ) -> List[RetrievedDocument]:
+        """Retrieve top-k relevant documents without blocking the event loop."""
+        return await asyncio.to_thread(self.retrieve, query, k, tags)
 
-        return retrieved
+
+def preload_sparse_index(persist_path: Optional[str] = None) -> int:
+    """Parse the persisted BM25 index ahead of the first knowledge base; returns its size.
+
+    Called in a pre-fork master so workers inherit the parsed index instead of
+    each re-reading the JSON file.
+    """
+    path = Path(persist_path or get_settings().vector_store_path) / SPARSE_INDEX_FILENAME
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return 0
+    index = BM25Index.load(path)
+    _preloaded_sparse[path.resolve()] = (mtime, index)
+    return len(index)
+
+
+def _take_preloaded_sparse_index(path: Path) -> Optional[BM25Index]:
+    """Hand over a preloaded index once, if the file has not changed since."""
+    entry = _preloaded_sparse.pop(path.resolve(), None)
+    if entry is None:
+        return None
+    try:
+        if path.stat().st_mtime != entry[0]:
+            return None
+    except OSError:
+        return None
+    return entry[1]
+
+
+def _split_list(value: Optional[Any]) -> List[str]:
+    """Decode a list stored as comma-joined Chroma metadata."""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [item for item in str(value).split(",") if item]
 
 
 def load_sample_knowledge(base_dir: str = "app/data") -> List[IngestionDocument]:
-    """Load sample FAQs and playbooks during bootstrap."""
+    """Load sample FAQs and playbooks during bootstrap, one document per ``###`` section.
+
+    Sections are tagged from their headings (see ``SEED_SECTION_TAGS``), so a
+    tag filter only matches the sections that are actually about that topic.
+    """
     sample_path = Path(base_dir) / "seed_knowledge.md"
     if not sample_path.exists():
         logger.warning("Seed knowledge file not found at %s", sample_path)
         return []
 
-    content = sample_path.read_text(encoding="utf-8")
-    return [
-        IngestionDocument(
-            id="dragon-faq-core",
-            title="Dragon Funded Core FAQ",
-            content=content,
-            domain=["dragon_funded", "faq"],
-            tags=["kyc", "withdrawal", "referral", "dragon_club"],
-            owner="KnowledgeOps",
+    documents: List[IngestionDocument] = []
+    product = section = ""
+    lines: List[str] = []
+
+    def flush() -> None:
+        body = "\n".join(lines).strip().strip("-").strip()
+        if not section or not body:
+            return
+        heading = section.lower()
+        documents.append(
+            IngestionDocument(
+                id="dragon-faq-" + _slug(f"{product} {section}"),
+                title=f"{product} – {section}",
+                content=f"## {product}\n\n### {section}\n\n{body}",
+                domain=["dragon_funded", "faq"],
+                tags=[
+                    tag
+                    for tag, keywords in SEED_SECTION_TAGS.items()
+                    if any(keyword in heading for keyword in keywords)
+                ],
+                owner="KnowledgeOps",
+            )
         )
-    ]
 
+    for line in sample_path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("## ") or line.startswith("### "):
+            flush()
+            lines = []
+            if line.startswith("## "):
+                # "🐉 DRAGON 2 – FULL GENERAL FAQ PAGE" -> "DRAGON 2"
+                product = _SEED_HEADING_PREFIX.sub("", line[3:]).split("–")[0].strip()
+                section = ""
+            else:
+                section = _SEED_HEADING_PREFIX.sub("", line[4:]).strip()
+        else:
+            lines.append(line)
+    flush()
+    return documents
+
+
+def _slug(text: str) -> str:
+    """Lower-case, hyphen-separated identifier for ``text``."""
+    return _NON_IDENTIFIER.sub("-", text.lower()).strip("-")
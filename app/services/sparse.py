@@ -0,0 +1,201 @@
+"""Lexical BM25 index over Dragon Funded knowledge chunks."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in is it me my of on or so "
+    "that the this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with common English stopwords removed."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _chunk_flags(metadata: Dict[str, Any]) -> Set[str]:
+    """Metadata keys set to ``True`` on a chunk, such as per-tag filter keys."""
+    return {key for key, value in metadata.items() if value is True}
+
+
+@dataclass
+class SparseChunk:
+    """A chunk as stored in the lexical index."""
+
+    id: str
+    text: str
+    metadata: Dict[str, Any]
+    length: int
+    term_counts: Dict[str, int]
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring.
+
+    Maintained incrementally by ingestion and persisted as JSON next to the
+    Chroma store so restarts don't re-tokenize the corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self._k1 = k1
+        self._b = b
+        self._chunks: Dict[str, SparseChunk] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._flag_postings: Dict[str, Set[str]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def add(self, chunk_id: str, text: str, metadata: Dict[str, Any]) -> None:
+        """Index a chunk, replacing any previous version with the same id."""
+        tokens = tokenize(text)
+        self._insert(
+            SparseChunk(chunk_id, text, dict(metadata), len(tokens), dict(Counter(tokens)))
+        )
+
+    def update_metadata(self, chunk_id: str, metadata: Dict[str, Any]) -> None:
+        """Refresh stored metadata without re-tokenizing."""
+        with self._lock:
+            chunk = self._chunks.get(chunk_id)
+            if chunk is not None:
+                self._unlink_flags(chunk)
+                chunk.metadata = dict(metadata)
+                self._link_flags(chunk)
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Drop chunks from the index."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                chunk = self._chunks.pop(chunk_id, None)
+                if chunk is None:
+                    continue
+                self._total_length -= chunk.length
+                self._unlink_flags(chunk)
+                for term in chunk.term_counts:
+                    posting = self._postings.get(term)
+                    if posting is not None:
+                        posting.pop(chunk_id, None)
+                        if not posting:
+                            del self._postings[term]
+
+    def count(self, flags: Sequence[str]) -> int:
+        """Number of chunks with any of ``flags`` set."""
+        with self._lock:
+            return len(set().union(*(self._flag_postings.get(flag, set()) for flag in flags)))
+
+    def get(self, chunk_id: str) -> Optional[SparseChunk]:
+        """Return a stored chunk."""
+        return self._chunks.get(chunk_id)
+
+    def search(
+        self, query: str, k: int = 10, flags: Optional[Sequence[str]] = None
+    ) -> List[Tuple[SparseChunk, float]]:
+        """Return the top-k chunks by BM25 score, optionally only those with any of ``flags`` set.
+
+        Scores are divided by the best score the query could reach (every term
+        matching with saturated frequency), so they fall in ``[0, 1)`` and can
+        be compared against fixed thresholds regardless of query length.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            total = len(self._chunks)
+            if not terms or not total:
+                return []
+            allowed: Optional[Set[str]] = None
+            if flags:
+                allowed = set().union(*(self._flag_postings.get(flag, set()) for flag in flags))
+                if not allowed:
+                    return []
+            avg_length = self._total_length / total
+            scores: Dict[str, float] = {}
+            ceiling = 0.0
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    # Unknown terms still count against the ceiling so partial matches score lower.
+                    ceiling += math.log(1.0 + (total + 0.5) / 0.5) * (self._k1 + 1.0)
+                    continue
+                idf = math.log(1.0 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                ceiling += idf * (self._k1 + 1.0)
+                for chunk_id, freq in posting.items():
+                    if allowed is not None and chunk_id not in allowed:
+                        continue
+                    norm = self._k1 * (
+                        1.0 - self._b + self._b * self._chunks[chunk_id].length / avg_length
+                    )
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * freq * (self._k1 + 1.0) / (
+                        freq + norm
+                    )
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._chunks[chunk_id], score / ceiling) for chunk_id, score in ranked]
+
+    def save(self, path: Path) -> None:
+        """Atomically write the index to disk."""
+        with self._lock:
+            payload = json.dumps(
+                {
+                    "k1": self._k1,
+                    "b": self._b,
+                    "chunks": [
+                        [chunk.id, chunk.text, chunk.metadata, chunk.length, chunk.term_counts]
+                        for chunk in self._chunks.values()
+                    ],
+                }
+            )
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Read an index written by ``save``; returns an empty index if unreadable."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            if path.exists():
+                logger.warning("Ignoring unreadable BM25 index %s: %s", path, exc)
+            return cls()
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        for chunk_id, text, metadata, length, term_counts in data.get("chunks", []):
+            index._insert(SparseChunk(chunk_id, text, metadata, length, term_counts))
+        return index
+
+    def _insert(self, chunk: SparseChunk) -> None:
+        """Add a tokenized chunk to the postings."""
+        with self._lock:
+            self.remove([chunk.id])
+            self._chunks[chunk.id] = chunk
+            self._total_length += chunk.length
+            for term, freq in chunk.term_counts.items():
+                self._postings.setdefault(term, {})[chunk.id] = freq
+            self._link_flags(chunk)
+
+    def _link_flags(self, chunk: SparseChunk) -> None:
+        """Add a chunk to the flag index."""
+        for flag in _chunk_flags(chunk.metadata):
+            self._flag_postings.setdefault(flag, set()).add(chunk.id)
+
+    def _unlink_flags(self, chunk: SparseChunk) -> None:
+        """Remove a chunk from the flag index."""
+        for flag in _chunk_flags(chunk.metadata):
+            members = self._flag_postings.get(flag)
+            if members is not None:
+                members.discard(chunk.id)
+                if not members:
+                    del self._flag_postings[flag]
@@ -0,0 +1,148 @@
+"""Background conversation summarization for Dragon Funded bot."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from app.services.llm import CallClass, FallbackReply, ModelRouter
+from app.services.memory import ConversationMemoryManager
+from app.services.rate_limit import Priority
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SummaryPolicy:
+    """Decides when a conversation is worth re-summarizing."""
+
+    every_n_turns: int = 1
+    min_transcript_chars: int = 0
+
+    def should_summarize(self, user_turns: int, transcript: str) -> bool:
+        """Return True when the conversation qualifies for a fresh summary."""
+        if not transcript or user_turns <= 0:
+            return False
+        if len(transcript) < self.min_transcript_chars:
+            return False
+        return user_turns % max(1, self.every_n_turns) == 0
+
+
+class BackgroundSummarizer:
+    """Bounded queue of summary jobs drained by asyncio worker tasks."""
+
+    def __init__(
+        self,
+        llm: ModelRouter,
+        memory: ConversationMemoryManager,
+        policy: Optional[SummaryPolicy] = None,
+        max_queue_size: int = 256,
+        workers: int = 2,
+    ) -> None:
+        self._llm = llm
+        self._memory = memory
+        self._policy = policy or SummaryPolicy()
+        self._max_queue_size = max_queue_size
+        self._worker_count = max(1, workers)
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[str] = set()
+
+    def submit(self, conversation_id: str) -> bool:
+        """Queue a conversation for summarization if the policy allows it.
+
+        Never blocks: when the queue is full the job is dropped and the previous
+        summary stays in place until the next qualifying turn.
+        """
+        transcript = self._memory.get_recent_transcript(conversation_id)
+        if not self._policy.should_summarize(
+            self._memory.get_user_turn_count(conversation_id), transcript
+        ):
+            return False
+        if conversation_id in self._pending:
+            return True
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(conversation_id)
+        except asyncio.QueueFull:
+            logger.warning(
+                "Summary queue full; skipping summary for conversation %s", conversation_id
+            )
+            return False
+        self._pending.add(conversation_id)
+        return True
+
+    async def drain(self) -> None:
+        """Wait until every queued summary has been written."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Drain outstanding jobs and cancel the worker tasks."""
+        if self._loop is asyncio.get_running_loop():
+            await self.drain()
+            for task in self._workers:
+                task.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+
+    def _ensure_started(self) -> None:
+        """Start workers on the running loop (restarting if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._pending.clear()
+        # Workers outlive the request that starts them, so they must not inherit its context.
+        self._workers = [
+            contextvars.Context().run(
+                loop.create_task, self._worker(), name=f"summary-worker-{idx}"
+            )
+            for idx in range(self._worker_count)
+        ]
+
+    async def _worker(self) -> None:
+        """Pull conversation ids off the queue and refresh their summaries."""
+        queue = self._queue
+        while True:
+            conversation_id = await queue.get()
+            self._pending.discard(conversation_id)
+            try:
+                summary = await self._summarize(conversation_id)
+                if summary:
+                    self._memory.update_summary(conversation_id, summary)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Background summary failed for %s: %s", conversation_id, exc)
+            finally:
+                queue.task_done()
+
+    async def _summarize(self, conversation_id: str) -> Optional[str]:
+        """Generate a concise summary of the conversation.
+
+        Returns None when the router only produced its fallback apology, so the
+        previous summary stays in place.
+        """
+        latest_turns = self._memory.get_recent_transcript(conversation_id)
+        prompt = (
+            "Summarize the following conversation context in under 60 tokens, "
+            "focusing on user objectives and any commitments. Context:\n"
+            f"{latest_turns}"
+        )
+        summary = await self._llm.agenerate(
+            prompt,
+            call_class=CallClass.SUMMARY,
+            temperature=0.3,
+            max_output_tokens=120,
+            priority=Priority.SUMMARY,
+        )
+        if not summary or isinstance(summary, FallbackReply):
+            return None
+        return summary.strip()
@@ -0,0 +1,317 @@
+"""Shared, pooled gRPC transport for Gemini generation and embedding calls."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import grpc
+from google.ai import generativelanguage_v1beta as glm
+from google.ai.generativelanguage_v1beta.services.generative_service.transports import (
+    GenerativeServiceGrpcAsyncIOTransport,
+    GenerativeServiceGrpcTransport,
+)
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT = "generativelanguage.googleapis.com:443"
+
+
+class _CallDetails(NamedTuple):
+    """Concrete ``grpc.ClientCallDetails`` with an overridden timeout and metadata."""
+
+    method: str
+    timeout: Optional[float]
+    metadata: Optional[Sequence[Tuple[str, str]]]
+    credentials: Optional[grpc.CallCredentials]
+    wait_for_ready: Optional[bool]
+    compression: Optional[grpc.Compression]
+
+
+class TransportStats:
+    """Thread-safe request counters for the pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_latency = 0.0
+        self.channels_opened = 0
+
+    def started(self) -> float:
+        """Record a request start and return its start time."""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return time.perf_counter()
+
+    def finished(self, started: float, failed: bool) -> None:
+        """Record a request completion."""
+        with self._lock:
+            self.in_flight -= 1
+            self.total_latency += time.perf_counter() - started
+            if failed:
+                self.failures += 1
+
+    def channel_opened(self, count: int = 1) -> None:
+        """Record newly created connections."""
+        with self._lock:
+            self.channels_opened += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counter values."""
+        with self._lock:
+            completed = self.requests - self.in_flight
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "channels_opened": self.channels_opened,
+                "avg_latency_ms": (
+                    round(1000 * self.total_latency / completed, 2) if completed else None
+                ),
+            }
+
+
+class _Interceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """Adds the API key and a deadline to every call and feeds ``TransportStats``."""
+
+    def __init__(self, api_key: str, timeout: float, stats: TransportStats) -> None:
+        self._metadata = (("x-goog-api-key", api_key),)
+        self._timeout = timeout
+        self._stats = stats
+
+    def details(self, details: grpc.ClientCallDetails) -> _CallDetails:
+        """Copy call details with the API key and capped timeout applied."""
+        timeout = self._timeout if details.timeout is None else min(details.timeout, self._timeout)
+        return _CallDetails(
+            details.method,
+            timeout,
+            tuple(details.metadata or ()) + self._metadata,
+            details.credentials,
+            details.wait_for_ready,
+            getattr(details, "compression", None),
+        )
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        started = self._stats.started()
+        outcome = continuation(self.details(client_call_details), request)
+        outcome.add_done_callback(
+            lambda future: self._stats.finished(started, future.exception() is not None)
+        )
+        return outcome
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        started = self._stats.started()
+        stream = continuation(self.details(client_call_details), request)
+        stream.add_done_callback(
+            lambda call: self._stats.finished(started, call.code() != grpc.StatusCode.OK)
+        )
+        return stream
+
+
+class _AsyncInterceptor(
+    grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor
+):
+    """Asyncio counterpart of ``_Interceptor``."""
+
+    def __init__(self, sync: _Interceptor, stats: TransportStats) -> None:
+        self._sync = sync
+        self._stats = stats
+
+    def _details(self, details: grpc.aio.ClientCallDetails) -> grpc.aio.ClientCallDetails:
+        patched = self._sync.details(details)
+        return grpc.aio.ClientCallDetails(
+            patched.method,
+            patched.timeout,
+            patched.metadata,
+            patched.credentials,
+            patched.wait_for_ready,
+        )
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await self._intercept(continuation, client_call_details, request)
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        return await self._intercept(continuation, client_call_details, request)
+
+    async def _intercept(self, continuation, client_call_details, request):
+        started = self._stats.started()
+        try:
+            call = await continuation(self._details(client_call_details), request)
+        except BaseException:
+            self._stats.finished(started, True)
+            raise
+        # grpc.aio exposes the status only through a coroutine, so read it in a task.
+        call.add_done_callback(lambda done: asyncio.ensure_future(self._record(done, started)))
+        return call
+
+    async def _record(self, call: grpc.aio.Call, started: float) -> None:
+        try:
+            failed = call.cancelled() or await call.code() != grpc.StatusCode.OK
+        except Exception:  # pylint: disable=broad-except
+            failed = True
+        self._stats.finished(started, failed)
+
+
+class GeminiTransport:
+    """A fixed pool of long-lived HTTP/2 channels to the Gemini API.
+
+    Each channel multiplexes concurrent calls and keeps its connection warm
+    with keep-alive pings, so bursts reuse established TLS sessions instead of
+    dialling new ones. Calls are spread round-robin over ``pool_size``
+    channels. The same pool backs the generation and embedding clients;
+    asyncio channels are created once per event loop because grpc.aio binds
+    them to the loop they were opened on.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        endpoint: str = DEFAULT_ENDPOINT,
+        pool_size: int = 2,
+        timeout_seconds: float = 60.0,
+        keepalive_seconds: float = 30.0,
+        use_tls: bool = True,
+    ) -> None:
+        self._endpoint = endpoint
+        self._pool_size = max(1, pool_size)
+        self._use_tls = use_tls
+        self._stats = TransportStats()
+        self._interceptor = _Interceptor(api_key, timeout_seconds, self._stats)
+        self._options = [
+            ("grpc.keepalive_time_ms", int(keepalive_seconds * 1000)),
+            ("grpc.keepalive_timeout_ms", 10_000),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+            # Without a per-channel subchannel pool gRPC would share one connection across the pool.
+            ("grpc.use_local_subchannel_pool", 1),
+        ]
+        self._lock = threading.Lock()
+        self._channels: List[grpc.Channel] = []
+        self._clients: List[glm.GenerativeServiceClient] = []
+        self._async_pools: Dict[asyncio.AbstractEventLoop, Tuple[List[grpc.aio.Channel], Any]] = {}
+        self._sync_cycle = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Pool configuration and request counters."""
+        snapshot = self._stats.snapshot()
+        snapshot.update(
+            endpoint=self._endpoint,
+            pool_size=self._pool_size,
+            sync_channels=len(self._channels),
+            event_loops=len(self._async_pools),
+        )
+        return snapshot
+
+    def client(self) -> glm.GenerativeServiceClient:
+        """Next blocking client in the pool."""
+        with self._lock:
+            if not self._clients:
+                for _ in range(self._pool_size):
+                    channel = grpc.intercept_channel(self._open_channel(), self._interceptor)
+                    self._channels.append(channel)
+                    self._clients.append(
+                        glm.GenerativeServiceClient(
+                            transport=GenerativeServiceGrpcTransport(
+                                channel=channel, host=self._host
+                            )
+                        )
+                    )
+                self._stats.channel_opened(self._pool_size)
+                self._sync_cycle = itertools.cycle(self._clients)
+            return next(self._sync_cycle)
+
+    def async_client(self) -> glm.GenerativeServiceAsyncClient:
+        """Next asyncio client in the pool for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._async_pools.get(loop)
+            if pool is None:
+                # Forget pools whose loops have gone away (e.g. repeated asyncio.run).
+                for stale in [known for known in self._async_pools if known.is_closed()]:
+                    del self._async_pools[stale]
+                interceptors = [_AsyncInterceptor(self._interceptor, self._stats)]
+                channels = [self._open_async_channel(interceptors) for _ in range(self._pool_size)]
+                clients = [
+                    glm.GenerativeServiceAsyncClient(
+                        transport=GenerativeServiceGrpcAsyncIOTransport(
+                            channel=channel, host=self._host
+                        )
+                    )
+                    for channel in channels
+                ]
+                pool = (channels, itertools.cycle(clients))
+                self._async_pools[loop] = pool
+                self._stats.channel_opened(self._pool_size)
+            return next(pool[1])
+
+    def close(self) -> None:
+        """Close the blocking channels; asyncio channels close with their loops."""
+        with self._lock:
+            for channel in self._channels:
+                channel.close()
+            self._channels, self._clients, self._sync_cycle = [], [], None
+
+    @property
+    def _host(self) -> str:
+        return self._endpoint.rsplit(":", 1)[0]
+
+    def _open_channel(self) -> grpc.Channel:
+        if self._use_tls:
+            return grpc.secure_channel(
+                self._endpoint, grpc.ssl_channel_credentials(), self._options
+            )
+        return grpc.insecure_channel(self._endpoint, self._options)
+
+    def _open_async_channel(self, interceptors: List[Any]) -> grpc.aio.Channel:
+        if self._use_tls:
+            return grpc.aio.secure_channel(
+                self._endpoint,
+                grpc.ssl_channel_credentials(),
+                self._options,
+                interceptors=interceptors,
+            )
+        return grpc.aio.insecure_channel(self._endpoint, self._options, interceptors=interceptors)
+
+
+def bind_client(target: Any, attribute: str, client: Any) -> None:
+    """Point an SDK object's client attribute at a pooled ``client``.
+
+    Neither google-generativeai nor langchain-google-genai accepts an existing
+    client, so ``attribute`` is private to the pinned SDK versions. Without
+    this check a renamed attribute would silently fall back to the SDK's own
+    per-process client and bypass the pool.
+    """
+    if not hasattr(target, attribute):
+        raise RuntimeError(
+            f"{type(target).__name__} has no {attribute!r} attribute; "
+            "the installed SDK no longer matches the version the Gemini transport is pinned to."
+        )
+    setattr(target, attribute, client)
+
+
+@lru_cache
+def get_gemini_transport() -> GeminiTransport:
+    """Return the process-wide Gemini transport."""
+    settings = get_settings()
+    return GeminiTransport(
+        api_key=settings.gemini_api_key,
+        endpoint=settings.gemini_api_endpoint,
+        pool_size=settings.gemini_pool_size,
+        timeout_seconds=settings.gemini_timeout_seconds,
+        keepalive_seconds=settings.gemini_keepalive_seconds,
+        use_tls=settings.gemini_api_tls,
+    )
@@ -1,13 +1,5 @@
 """Utility helpers."""
 
-from .logger import configure_logging
-
-__all__ = ["configure_logging"]
-
-
-
-
-
-
-
+from .logger import bind_correlation_id, configure_logging, get_correlation_id, reset_correlation_id
 
+__all__ = ["bind_correlation_id", "configure_logging", "get_correlation_id", "reset_correlation_id"]
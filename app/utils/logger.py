@@ -1,31 +1,252 @@
-"""Centralized logging utilities."""
+"""Centralized logging utilities.
 
+Records are handed to a background thread through a bounded queue, so the
+event loop and request threads never block on console I/O. Each record
+carries the correlation id of the request that produced it, and INFO-level
+output of chatty loggers can be rate-limited.
+
+Environment variables:
+
+- ``LOG_LEVEL``: root level (default ``INFO``).
+- ``LOG_FORMAT``: ``text`` (default) or ``json`` for one JSON object per line.
+- ``LOG_QUEUE_SIZE``: records buffered before new ones are dropped (default 10000).
+- ``LOG_RATE_LIMITS``: ``logger=records_per_second`` pairs, comma separated,
+  capping INFO and below for that logger and its children. ``off`` disables
+  sampling. Defaults to ``DEFAULT_RATE_LIMITS``.
+"""
+
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+import uuid
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Per-request lines from these loggers are capped in INFO; warnings always pass.
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    "app.main": 50.0,
+    "app.routers.support": 50.0,
+    "app.workflows.dragon_funded_graph": 50.0,
+}
+
+_correlation_id: ContextVar[str] = ContextVar("correlation_id", default="-")
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "correlation_id",
+    "suppressed",
+}
+
+
+def new_correlation_id() -> str:
+    """Random id for a request that did not bring its own."""
+    return uuid.uuid4().hex[:16]
+
+
+def bind_correlation_id(value: str) -> Token:
+    """Tag log records from the current context (and tasks it spawns) with ``value``."""
+    return _correlation_id.set(value)
+
+
+def reset_correlation_id(token: Token) -> None:
+    """Restore the correlation id that was active before ``bind_correlation_id``."""
+    _correlation_id.reset(token)
+
+
+def get_correlation_id() -> str:
+    """Correlation id of the current context, ``-`` outside a request."""
+    return _correlation_id.get()
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Copy the context's correlation id onto each record before it leaves the thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per configured logger prefix for records at INFO and below.
+
+    A burst of one second's worth of records is allowed. The number of
+    records dropped since the last one that passed is attached to the next
+    passing record as ``suppressed``.
+    """
+
+    def __init__(self, limits: Dict[str, float]) -> None:
+        super().__init__()
+        self._prefixes = sorted(limits, key=len, reverse=True)
+        self._limits = limits
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        prefix = self._match(record.name)
+        if prefix is None:
+            return True
+        rate = self._limits[prefix]
+        now = time.monotonic()
+        with self._lock:
+            # [tokens, last refill, dropped since last pass]
+            bucket = self._buckets.setdefault(prefix, [rate, now, 0])
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+    def _match(self, name: str) -> Optional[str]:
+        for prefix in self._prefixes:
+            if name == prefix or name.startswith(prefix + "."):
+                return prefix
+        return None
+
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including ``extra`` fields."""
 
-def configure_logging(level: Optional[str] = None) -> None:
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+        }
+        if getattr(record, "suppressed", 0):
+            payload["suppressed"] = record.suppressed
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _TextFormatter(logging.Formatter):
+    """The classic console format, noting suppressed lines."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} [{suppressed} similar lines suppressed]" if suppressed else text
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` that drops records when the queue is full instead of raising.
+
+    Only the message is interpolated on the calling thread; formatting and
+    I/O happen on the listener thread.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks keep frames alive; render them before handing the record over.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_rate_limits(spec: Optional[str]) -> Dict[str, float]:
+    """Parse ``LOG_RATE_LIMITS``; ``None`` yields the defaults."""
+    if spec is None:
+        return dict(DEFAULT_RATE_LIMITS)
+    if spec.strip().lower() in {"", "off", "none", "0"}:
+        return {}
+    limits: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            limits[name.strip()] = float(rate)
+    return limits
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
+) -> None:
     """Configure application-wide logging."""
+    global _listener  # pylint: disable=global-statement
+
     logging_level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+    log_format = (log_format or os.getenv("LOG_FORMAT", "text")).lower()
+    if rate_limits is None:
+        rate_limits = parse_rate_limits(os.getenv("LOG_RATE_LIMITS"))
 
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    if log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = _TextFormatter(
+            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
-    # Console handler - always show logs in terminal
+    # Console handler - always show logs in terminal, written by the listener thread
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging_level)
     console_handler.setFormatter(formatter)
 
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+        int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    )
+    queue_handler = _NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationIdFilter())
+    if rate_limits:
+        queue_handler.addFilter(RateLimitFilter(rate_limits))
+
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+        _listener = logging.handlers.QueueListener(
+            log_queue, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(logging_level)
     root_logger.handlers.clear()  # Remove any existing handlers
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
 
     # Set specific loggers to appropriate levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -33,4 +254,36 @@ def configure_logging(level: Optional[str] = None) -> None:
     logging.getLogger("fastapi").setLevel(logging.INFO)
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener  # pylint: disable=global-statement
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    """Give a forked child its own queue and listener thread.
+
+    Threads do not survive ``fork``; without this, records from pre-forked
+    workers would pile up in a queue nobody drains. Records still queued in
+    the parent are left to the parent's listener rather than written twice.
+    """
+    global _listener, _listener_lock  # pylint: disable=global-statement
+    _listener_lock = threading.Lock()
+    if _listener is None:
+        return
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(_listener.queue.maxsize)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, _NonBlockingQueueHandler):
+            handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
 
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
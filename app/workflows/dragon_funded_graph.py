@@ -2,17 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
-from typing import List, Optional, TypedDict
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+)
 
 from langgraph.graph import END, START, StateGraph
 
-from app.core.prompts import assemble_prompt
+from app.core.config import get_settings
+from app.core.prompts import (
+    MEMORY_SECTION,
+    STATIC_PROMPT_PREFIX,
+    assemble_prompt,
+    assemble_turn_prompt,
+    render_overrides,
+)
 from app.models.schemas import RetrievedDocument, SupportQuery, SupportResponse
+from app.services.answer_cache import AnswerCache, AnswerCacheProbe
+from app.services.context_packing import estimate_tokens, pack_context
 from app.services.domain import DRAGON_CLUB_REWARDS, REFERRAL_PROGRAM
-from app.services.llm import GeminiClient, get_gemini_client
+from app.services.intent import IntentClassifier, get_intent_classifier
+from app.services.llm import FallbackReply, ModelRouter, RouteHints, get_model_router
 from app.services.memory import ConversationMemoryManager
-from app.services.retrieval import DragonKnowledgeBase, load_sample_knowledge
+from app.services.metrics import get_metrics
+from app.services.retrieval import (
+    RETIRED_SEED_DOCUMENT_IDS,
+    DragonKnowledgeBase,
+    load_sample_knowledge,
+)
+from app.services.summarization import BackgroundSummarizer, SummaryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -21,23 +51,58 @@ class DragonState(TypedDict, total=False):
     """State carried through the LangGraph workflow."""
 
     conversation_id: str
+    memory_key: str
+    user_id: Optional[str]
+    channel: str
+    first_turn: bool
     user_message: str
     intent: str
+    intents: List[str]
     retrieved_docs: List[RetrievedDocument]
     response_text: str
     confidence: float
     workflow_steps: List[str]
     escalate: bool
     session_summary: str
+    degraded: bool
+    node_timings: Dict[str, float]
+
+
+# Knowledge tags that narrow retrieval for each intent. Intents without an entry search
+# everything: "general", and "challenge_rules", whose material (phases, drawdown, news
+# and trading rules) makes up most of the knowledge base and carries no tag of its own.
+INTENT_TAGS = {
+    "kyc": ["kyc"],
+    "withdrawal": ["withdrawal"],
+    "referral": ["referral"],
+    "dragon_club": ["dragon_club"],
+}
 
+ESCALATION_MARKER = "escalate"
 
-INTENT_KEYWORDS = {
-    "challenge_rules": ["challenge", "phase", "rule", "drawdown", "news", "daily loss"],
-    "kyc": ["kyc", "verification", "identity", "passport", "compliance"],
-    "withdrawal": ["withdraw", "payout", "bank", "usdt", "payment"],
-    "referral": ["referral", "affiliate", "commission", "link"],
-    "dragon_club": ["dragon club", "trustpilot", "review", "video", "social"],
-}
+StreamEvent = Tuple[str, Dict[str, Any]]
+WorkflowNode = Callable[[DragonState], Awaitable[DragonState]]
+
+
+def timed_node(name: str, node: WorkflowNode) -> WorkflowNode:
+    """Wrap a workflow node so its duration is exported and kept in ``node_timings`` (ms)."""
+
+    @functools.wraps(node)
+    async def run(state: DragonState) -> DragonState:
+        metrics = get_metrics()
+        started = time.perf_counter()
+        try:
+            state = await node(state)
+        except Exception:
+            metrics.node_errors.inc(node=name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.node_seconds.observe(elapsed, node=name)
+        state.setdefault("node_timings", {})[name] = round(elapsed * 1000, 2)
+        return state
+
+    return run
 
 
 class DragonFundedOrchestrator:
@@ -46,22 +111,56 @@ class DragonFundedOrchestrator:
     def __init__(
         self,
         kb: Optional[DragonKnowledgeBase] = None,
-        llm: Optional[GeminiClient] = None,
+        llm: Optional[ModelRouter] = None,
         memory_manager: Optional[ConversationMemoryManager] = None,
+        intent_classifier: Optional[IntentClassifier] = None,
     ) -> None:
         self._kb = kb or DragonKnowledgeBase()
-        self._llm = llm or get_gemini_client()
+        self._llm = llm or get_model_router()
         self._memory = memory_manager or ConversationMemoryManager()
+        self._intents = intent_classifier or get_intent_classifier()
+
+        settings = get_settings()
+        self._concurrency = asyncio.Semaphore(settings.max_concurrent_workflows)
+        self._retrieval_k = settings.retrieval_top_k
+        self._filtered_retrieval_k = settings.filtered_retrieval_top_k
+        self._prompt_token_budget = settings.prompt_token_budget
+        self._prompt_min_context_tokens = settings.prompt_min_context_tokens
+        self._summarizer = BackgroundSummarizer(
+            llm=self._llm,
+            memory=self._memory,
+            policy=SummaryPolicy(
+                every_n_turns=settings.summary_every_n_turns,
+                min_transcript_chars=settings.summary_min_transcript_chars,
+            ),
+            max_queue_size=settings.summary_queue_size,
+            workers=settings.summary_workers,
+        )
+        self._answer_cache: Optional[AnswerCache] = None
+        if settings.answer_cache_enabled:
+            self._answer_cache = AnswerCache(
+                max_entries=settings.answer_cache_size,
+                ttl_seconds=settings.answer_cache_ttl_seconds,
+                similarity_threshold=settings.answer_cache_similarity,
+            )
 
-        # Seed baseline knowledge if empty
+        # Sync baseline knowledge; unchanged seed content costs no embedding calls
         self._bootstrap_knowledge()
 
+        self._nodes: Dict[str, WorkflowNode] = {
+            name: timed_node(name, node)
+            for name, node in [
+                ("classify_intent", self._classify_intent),
+                ("retrieve_knowledge", self._retrieve_knowledge),
+                ("compose_response", self._compose_response),
+                ("evaluate_handoff", self._evaluate_handoff),
+                ("update_memory", self._update_memory),
+            ]
+        }
+
         graph = StateGraph(DragonState)
-        graph.add_node("classify_intent", self._classify_intent)
-        graph.add_node("retrieve_knowledge", self._retrieve_knowledge)
-        graph.add_node("compose_response", self._compose_response)
-        graph.add_node("evaluate_handoff", self._evaluate_handoff)
-        graph.add_node("update_memory", self._update_memory)
+        for name, node in self._nodes.items():
+            graph.add_node(name, node)
 
         graph.add_edge(START, "classify_intent")
         graph.add_edge("classify_intent", "retrieve_knowledge")
@@ -73,126 +172,354 @@ class DragonFundedOrchestrator:
         self._graph = graph.compile()
 
     def run(self, query: SupportQuery) -> SupportResponse:
+        """Execute workflow for a user query from synchronous code (scripts, CLI)."""
+
+        async def _run_to_completion() -> SupportResponse:
+            response = await self.arun(query)
+            await self._summarizer.drain()
+            return response
+
+        return asyncio.run(_run_to_completion())
+
+    async def arun(self, query: SupportQuery) -> SupportResponse:
         """Execute workflow for a user query."""
-        logger.info("Starting workflow execution for conversation: %s", query.conversation_id)
+        with self._memory.request_scope():
+            async with self._concurrency:
+                return await self._execute(query)
+
+    async def aclose(self) -> None:
+        """Flush background work before shutdown."""
+        await self._summarizer.stop()
+        self._memory.close()
+
+    @property
+    def memory(self) -> ConversationMemoryManager:
+        """Conversation memory used by the workflow."""
+        return self._memory
+
+    async def astream(self, query: SupportQuery) -> AsyncIterator[StreamEvent]:
+        """Execute the workflow, yielding reply text as Gemini produces it.
+
+        Emits ``("token", {"text": ...})`` for each partial chunk, a single
+        ``("escalation", {...})`` as soon as the accumulated text trips the
+        handoff check, and finally ``("complete", SupportResponse payload)``.
+        """
+        with self._memory.request_scope():
+            async for event in self._stream(query):
+                yield event
+
+    async def _stream(self, query: SupportQuery) -> AsyncIterator[StreamEvent]:
+        async with self._concurrency:
+            logger.debug(
+                "Starting streaming workflow for conversation: %s (channel: %s)",
+                query.conversation_id,
+                query.channel,
+            )
+            probe = await self._probe_answer_cache(query)
+            if probe is not None and probe.hit is not None:
+                response = self._serve_cached(query, probe.hit)
+                yield "token", {"text": response.reply}
+                yield "complete", response.model_dump(mode="json")
+                return
+
+            state = self._initial_state(query)
+            state = await self._nodes["classify_intent"](state)
+            state = await self._nodes["retrieve_knowledge"](state)
+
+            started = time.perf_counter()
+            accumulated = ""
+            escalated = False
+            async for chunk in self._llm.agenerate_stream(
+                self._build_prompt(state),
+                temperature=0.6,
+                max_output_tokens=600,
+                with_static_prefix=True,
+                hints=self._route_hints(state),
+            ):
+                scan_from = max(0, len(accumulated) - len(ESCALATION_MARKER) + 1)
+                accumulated += chunk
+                yield "token", {"text": chunk}
+                if not escalated and self._requires_escalation(
+                    state.get("confidence", 0.6), accumulated[scan_from:]
+                ):
+                    escalated = True
+                    yield "escalation", {"escalation_required": True}
+
+            state["response_text"] = accumulated.strip()
+            state["workflow_steps"].append("Streamed response via Gemini Pro.")
+            elapsed = time.perf_counter() - started
+            get_metrics().node_seconds.observe(elapsed, node="compose_response")
+            state.setdefault("node_timings", {})["compose_response"] = round(elapsed * 1000, 2)
+            state = await self._nodes["evaluate_handoff"](state)
+            state = await self._nodes["update_memory"](state)
+            response = self._build_response(state)
+            logger.debug("Streaming workflow completed for conversation: %s", query.conversation_id)
+            yield "complete", response.model_dump(mode="json")
+
+    async def _execute(self, query: SupportQuery) -> SupportResponse:
+        """Run the compiled graph and build the customer-facing response."""
+        logger.debug(
+            "Starting workflow execution for conversation: %s (channel: %s)",
+            query.conversation_id,
+            query.channel,
+        )
         try:
-            self._memory.append(query.conversation_id, "user", query.message)
-
-            initial_state: DragonState = {
-                "conversation_id": query.conversation_id,
-                "user_message": query.message,
-                "workflow_steps": [],
-                "session_summary": self._memory.get_session_summary(query.conversation_id),
-            }
-
-            logger.info("Invoking workflow graph...")
-            final_state = self._graph.invoke(initial_state)
-            logger.info("Workflow graph completed. Steps: %s", final_state.get("workflow_steps", []))
-
-            retrieved_docs = final_state.get("retrieved_docs", [])
-            logger.info("Retrieved %d documents from knowledge base", len(retrieved_docs))
-
-            response = SupportResponse(
-                reply=final_state.get("response_text", ""),
-                confidence=final_state.get("confidence", 0.6),
-                sources=retrieved_docs,
-                workflow_steps=final_state.get("workflow_steps", []),
-                escalation_required=final_state.get("escalate", False),
-                follow_up_questions=self._derive_follow_ups(final_state.get("intent")),
-                suggested_actions=self._derive_suggested_actions(final_state),
+            probe = await self._probe_answer_cache(query)
+            if probe is not None and probe.hit is not None:
+                logger.debug("Answer cache hit for conversation: %s", query.conversation_id)
+                return self._serve_cached(query, probe.hit)
+
+            initial_state = self._initial_state(query)
+
+            logger.debug("Invoking workflow graph...")
+            final_state = await self._graph.ainvoke(initial_state)
+            logger.debug(
+                "Workflow graph completed. Steps: %s", final_state.get("workflow_steps", [])
+            )
+            logger.debug(
+                "Retrieved %d documents from knowledge base",
+                len(final_state.get("retrieved_docs", [])),
             )
 
-            self._memory.append(query.conversation_id, "assistant", response.reply)
-            logger.info("Workflow execution completed successfully")
+            response = self._build_response(final_state)
+            if (
+                probe is not None
+                and not final_state.get("degraded")
+                and not response.escalation_required
+            ):
+                self._answer_cache.put(probe, response, probe.revision)
+            logger.debug("Workflow execution completed successfully")
             return response
         except Exception as exc:
             logger.exception("Workflow execution failed: %s", exc)
             raise
 
-    def _classify_intent(self, state: DragonState) -> DragonState:
-        """Heuristic intent classifier."""
-        message = state["user_message"].lower()
-        for intent, keywords in INTENT_KEYWORDS.items():
-            if any(keyword in message for keyword in keywords):
-                state["intent"] = intent
-                break
-        else:
-            state["intent"] = "general"
+    async def _probe_answer_cache(self, query: SupportQuery) -> Optional[AnswerCacheProbe]:
+        """Look up a stored answer for an opening question.
+
+        Follow-up turns depend on conversation context, so only the first turn
+        of a conversation is served from or written to the cache.
+        """
+        if self._answer_cache is None or self._memory.get_user_turn_count(query.memory_key):
+            return None
+
+        intents = [match.intent for match in self._intents.classify(query.message)]
+        probe = AnswerCacheProbe(
+            normalized=AnswerCache.normalize(query.message),
+            intent=intents[0] if intents else "general",
+        )
+        return await asyncio.to_thread(
+            self._lookup_answer, probe, query.message, self._intent_tags(intents)
+        )
+
+    def _lookup_answer(
+        self, probe: AnswerCacheProbe, message: str, tags: Optional[List[str]]
+    ) -> AnswerCacheProbe:
+        """Exact, then semantic cache lookup; runs off the event loop.
+
+        Reading the revision may reload the shared manifest, and the semantic
+        lookup embeds the question. When retrieval would be served by BM25
+        alone and so never needs the query vector, only an already cached
+        vector is used rather than calling the embedding API.
+        """
+        probe.revision = self._kb.revision
+        probe.hit = self._answer_cache.get_exact(probe, probe.revision)
+        if probe.hit is not None:
+            return probe
+        if tags and not self._kb.narrows(tags):
+            tags = None
+        k = self._filtered_retrieval_k if tags else self._retrieval_k
+        try:
+            if self._kb.serves_lexically(message, k=k, tags=tags):
+                probe.embedding = self._kb.embeddings.cached_query(message)
+            else:
+                # The query vector is cached, so retrieval reuses it on a miss.
+                probe.embedding = self._kb.embeddings.embed_query(message)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Skipping semantic answer cache lookup: %s", exc)
+        if probe.embedding is None:
+            self._answer_cache.record_miss()
+            return probe
+        probe.hit = self._answer_cache.get_similar(probe, probe.revision)
+        return probe
+
+    def _serve_cached(self, query: SupportQuery, response: SupportResponse) -> SupportResponse:
+        """Record a cached answer in memory as if the workflow had produced it."""
+        self._memory.append(query.memory_key, "user", query.message)
+        self._memory.append(query.memory_key, "assistant", response.reply)
+        response.conversation_id = query.conversation_id
+        response.workflow_steps = ["Served answer from cache."]
+        response.node_timings_ms = None
+        # Cached answers only serve opening turns, which have nothing to summarize yet.
+        return response
+
+    def _initial_state(self, query: SupportQuery) -> DragonState:
+        """Record the user turn and seed the workflow state.
+
+        A conversation without earlier turns has no summary to load.
+        """
+        first_turn = not self._memory.get_user_turn_count(query.memory_key)
+        self._memory.append(query.memory_key, "user", query.message)
+        return {
+            "conversation_id": query.conversation_id,
+            "memory_key": query.memory_key,
+            "user_id": query.user_id,
+            "channel": query.channel,
+            "first_turn": first_turn,
+            "user_message": query.message,
+            "workflow_steps": [],
+            "session_summary": (
+                "" if first_turn else self._memory.get_session_summary(query.memory_key)
+            ),
+        }
+
+    def _build_response(self, state: DragonState) -> SupportResponse:
+        """Convert the final workflow state into the customer-facing payload."""
+        return SupportResponse(
+            reply=state.get("response_text", ""),
+            conversation_id=state["conversation_id"],
+            confidence=state.get("confidence", 0.6),
+            sources=state.get("retrieved_docs", []),
+            workflow_steps=state.get("workflow_steps", []),
+            node_timings_ms=state.get("node_timings"),
+            escalation_required=state.get("escalate", False),
+            follow_up_questions=self._derive_follow_ups(state.get("intent")),
+            suggested_actions=self._derive_suggested_actions(state),
+        )
+
+    async def _classify_intent(self, state: DragonState) -> DragonState:
+        """Keyword intent classifier; ``intent`` is the best of the ranked ``intents``."""
+        ranked = self._intents.classify(state["user_message"])
+        state["intents"] = [match.intent for match in ranked]
+        state["intent"] = ranked[0].intent if ranked else "general"
+        logger.debug("Intents: %s", [(match.intent, match.score) for match in ranked])
         return state
 
-    def _retrieve_knowledge(self, state: DragonState) -> DragonState:
-        """Retrieve knowledge snippets."""
-        docs = self._kb.retrieve(state["user_message"], k=6)
+    @staticmethod
+    def _intent_tags(intents: Sequence[str]) -> Optional[List[str]]:
+        """Union of the ranked intents' tags.
+
+        ``None`` (search everything) if any intent has none.
+        """
+        tags: List[str] = []
+        for intent in intents:
+            intent_tags = INTENT_TAGS.get(intent)
+            if not intent_tags:
+                return None
+            tags.extend(tag for tag in intent_tags if tag not in tags)
+        return tags or None
+
+    async def _retrieve_knowledge(self, state: DragonState) -> DragonState:
+        """Retrieve knowledge snippets, restricted to the tags of the detected intents."""
+        tags = self._intent_tags(state.get("intents") or [])
+        if tags and not self._kb.narrows(tags):
+            # Searching the same candidates with a smaller k would only drop context.
+            tags = None
+        k = self._filtered_retrieval_k if tags else self._retrieval_k
+        docs = await self._kb.aretrieve(state["user_message"], k=k, tags=tags)
         state["retrieved_docs"] = docs
         state["confidence"] = max((doc.confidence for doc in docs), default=0.5)
         return state
 
-    def _compose_response(self, state: DragonState) -> DragonState:
+    async def _compose_response(self, state: DragonState) -> DragonState:
         """Invoke Gemini to craft the response."""
-        docs = state.get("retrieved_docs", [])
-        retrieved_chunks = self._format_retrieval(docs)
+        # Use higher temperature and more tokens for more natural, human-like responses
+        response_text = await self._llm.agenerate(
+            self._build_prompt(state),
+            temperature=0.6,  # Increased for more natural variation
+            max_output_tokens=600,  # Increased to allow for natural, flowing responses
+            with_static_prefix=True,
+            hints=self._route_hints(state),
+        )
+        state["response_text"] = response_text
+        state["degraded"] = isinstance(response_text, FallbackReply)
+        state["workflow_steps"].append("Composed response via Gemini Pro.")
+        return state
+
+    @staticmethod
+    def _route_hints(state: DragonState) -> RouteHints:
+        """Intent and retrieval confidence the model router uses to size the model."""
+        return RouteHints(intent=state.get("intent"), confidence=state.get("confidence"))
+
+    def _build_prompt(self, state: DragonState) -> str:
+        """Assemble the generation prompt from retrieval, memory and intent overrides.
+
+        Retrieved chunks are packed into what remains of the token budget after
+        the memory and override sections; estimated section sizes are recorded
+        in ``workflow_steps``.
+        """
         session_summary = state.get("session_summary", "")
-        latest_turn = self._memory.get_latest_turn(state["conversation_id"])
+        latest_turn = self._memory.get_latest_turn(state["memory_key"]) or state["user_message"]
 
+        intents = state.get("intents") or []
         dynamic_overrides = {}
-        if state.get("intent") == "dragon_club":
+        if "dragon_club" in intents:
             dynamic_overrides["dragon_club_rewards"] = "\n".join(
                 f"{key}: {value}" for key, value in DRAGON_CLUB_REWARDS.items()
             )
-        if state.get("intent") == "referral":
+        if "referral" in intents:
             dynamic_overrides["referral_program"] = "\n".join(
                 f"{key}: {value}" for key, value in REFERRAL_PROGRAM.items()
             )
 
-        prompt = assemble_prompt(
-            retrieved_chunks=retrieved_chunks,
+        memory_tokens = estimate_tokens(
+            MEMORY_SECTION.template.format(
+                session_summary=session_summary, latest_user_turn=latest_turn
+            )
+        )
+        override_tokens = estimate_tokens(render_overrides(dynamic_overrides))
+        budget = max(
+            self._prompt_min_context_tokens,
+            self._prompt_token_budget - memory_tokens - override_tokens,
+        )
+        packed = pack_context(state.get("retrieved_docs", []), budget)
+
+        # The client sends the static system prompt and protocol itself when it has them.
+        separate_prefix = bool(self._llm.static_prefix)
+        assemble = assemble_turn_prompt if separate_prefix else assemble_prompt
+        prompt = assemble(
+            retrieved_chunks=packed.text
+            or "No matching documents retrieved. Fall back to policy summary.",
             session_summary=session_summary,
-            latest_user_turn=latest_turn or state["user_message"],
+            latest_user_turn=latest_turn,
             dynamic_overrides=dynamic_overrides or None,
         )
 
-        # Use higher temperature and more tokens for more natural, human-like responses
-        response_text = self._llm.generate(
-            prompt,
-            temperature=0.6,  # Increased for more natural variation
-            max_output_tokens=600,  # Increased to allow for natural, flowing responses
+        prefix_tokens = estimate_tokens(STATIC_PROMPT_PREFIX)
+        total_tokens = estimate_tokens(prompt) + (prefix_tokens if separate_prefix else 0)
+        state["workflow_steps"].append(
+            f"Prompt tokens (est.): knowledge {packed.tokens}/{budget} "
+            f"({len(packed.passages)} passages from {packed.chunks_in} chunks), "
+            f"memory {memory_tokens}, "
+            f"overrides {override_tokens}, system {prefix_tokens}, total {total_tokens}."
         )
-        state["response_text"] = response_text
-        state["workflow_steps"].append("Composed response via Gemini Pro.")
+        return prompt
 
-        # Attempt to extract model-suggested summary
-        summary = self._summarize_conversation(state["conversation_id"])
-        if summary:
-            state["session_summary"] = summary
-
-        return state
-
-    def _evaluate_handoff(self, state: DragonState) -> DragonState:
+    async def _evaluate_handoff(self, state: DragonState) -> DragonState:
         """Decide if human escalation is needed."""
-        confidence = state.get("confidence", 0.6)
-        escalate = confidence < 0.5 or "escalate" in state.get("response_text", "").lower()
+        escalate = self._requires_escalation(
+            state.get("confidence", 0.6), state.get("response_text", "")
+        )
         state["escalate"] = escalate
         if escalate:
             state["workflow_steps"].append("Flagged for human escalation.")
         return state
 
-    def _update_memory(self, state: DragonState) -> DragonState:
-        """Persist summary back to memory manager."""
-        summary = state.get("session_summary")
-        if summary:
-            self._memory.update_summary(state["conversation_id"], summary)
-        return state
+    @staticmethod
+    def _requires_escalation(confidence: float, text: str) -> bool:
+        """Handoff rule shared by the batch and streaming paths."""
+        return confidence < 0.5 or ESCALATION_MARKER in text.lower()
 
-    def _summarize_conversation(self, conversation_id: str) -> Optional[str]:
-        """Generate a concise summary of the conversation."""
-        latest_turns = self._memory.get_recent_transcript(conversation_id)
-        prompt = (
-            "Summarize the following conversation context in under 60 tokens, "
-            "focusing on user objectives and any commitments. Context:\n"
-            f"{latest_turns}"
-        )
-        summary = self._llm.generate(prompt, temperature=0.3, max_output_tokens=120)
-        return summary.strip() if summary else None
+    async def _update_memory(self, state: DragonState) -> DragonState:
+        """Record the assistant turn and schedule a background summary refresh.
+
+        After the first turn the transcript itself is shorter than a summary,
+        so no summary is generated.
+        """
+        self._memory.append(state["memory_key"], "assistant", state.get("response_text", ""))
+        if not state.get("first_turn") and self._summarizer.submit(state["memory_key"]):
+            state["workflow_steps"].append("Queued conversation summary refresh.")
+        return state
 
     def _derive_follow_ups(self, intent: Optional[str]) -> List[str]:
         """Suggest follow-up questions based on intent."""
@@ -211,43 +538,33 @@ class DragonFundedOrchestrator:
     def _derive_suggested_actions(self, state: DragonState) -> List[str]:
         """Provide actionable next steps."""
         actions: List[str] = []
-        intent = state.get("intent")
-        if intent == "challenge_rules":
+        intents = state.get("intents") or []
+        if "challenge_rules" in intents:
             actions.append("Review latest account metrics against daily loss and drawdown limits.")
-        if intent == "kyc":
+        if "kyc" in intents:
             actions.append("Prepare ID and proof of address issued within 90 days for upload.")
-        if intent == "withdrawal":
+        if "withdrawal" in intents:
             actions.append("Confirm preferred payout method and eligibility window.")
-        if intent == "referral":
+        if "referral" in intents:
             actions.append("Check referral dashboard for pending commissions.")
-        if intent == "dragon_club":
+        if "dragon_club" in intents:
             actions.append("Submit proof links for Trustpilot, video, and social posts.")
         if state.get("escalate"):
             actions.append("Open compliance ticket for manual review.")
         return actions
 
-    def _format_retrieval(self, docs: List[RetrievedDocument]) -> str:
-        """Render retrieved documents into prompt-friendly format."""
-        if not docs:
-            return "No matching documents retrieved. Fall back to policy summary."
-        formatted = []
-        for doc in docs:
-            formatted.append(
-                f"<doc id='{doc.id}' title='{doc.title}' confidence='{doc.confidence:.2f}'>\n"
-                f"{doc.content}\n"
-                f"Domains: {', '.join(doc.domain)}\n"
-                f"Provenance: {doc.provenance or 'internal knowledge base'}\n"
-                "</doc>"
-            )
-        return "\n".join(formatted)
-
     def _bootstrap_knowledge(self) -> None:
         """Ensure baseline knowledge is loaded."""
         try:
             seed_documents = load_sample_knowledge()
             if seed_documents:
-                self._kb.ingest(seed_documents)
-                logger.info("Seed knowledge ingested successfully.")
+                stats = self._kb.ingest(seed_documents)
+                retired = self._kb.remove_documents(RETIRED_SEED_DOCUMENT_IDS)
+                logger.info(
+                    "Seed knowledge synced (%s added, %s removed, %s unchanged).",
+                    stats.added,
+                    stats.removed + retired,
+                    stats.unchanged,
+                )
         except Exception as exc:  # pylint: disable=broad-except
             logger.warning("Failed to ingest seed knowledge: %s", exc)
-
@@ -0,0 +1 @@
+"""Performance benchmarks for the Dragon Funded support bot."""
@@ -0,0 +1,139 @@
+"""Local stand-ins for Gemini generation and embeddings."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.prompts import STATIC_PROMPT_PREFIX
+from app.services.context_packing import estimate_tokens
+from app.services.llm import ModelStats
+from app.services.sparse import tokenize
+
+_FILLER = (
+    "Your account keeps its balance within the daily loss limit and the overall drawdown, "
+    "and payouts are processed after verification of the trading record. "
+).split()
+
+
+class FakeGeminiClient:
+    """Drop-in ``GeminiClient`` that sleeps instead of calling the API.
+
+    A reply costs ``latency_seconds`` before the first token plus
+    ``reply_tokens / tokens_per_second`` to generate, and streams in chunks of
+    ``chunk_tokens``. It exposes the attributes ``ModelRouter`` relies on.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "fake-gemini",
+        latency_seconds: float = 0.05,
+        tokens_per_second: float = 400.0,
+        reply_tokens: int = 120,
+        chunk_tokens: int = 8,
+        static_prefix: Optional[str] = STATIC_PROMPT_PREFIX,
+    ) -> None:
+        self._model = model_name
+        self._latency = latency_seconds
+        self._tokens_per_second = tokens_per_second
+        self._reply_tokens = reply_tokens
+        self._chunk_tokens = chunk_tokens
+        self._static_prefix = static_prefix
+        self._stats = ModelStats()
+
+    @property
+    def model_name(self) -> str:
+        """Name reported in router statistics."""
+        return self._model
+
+    @property
+    def stats(self) -> ModelStats:
+        """Latency and token usage of the simulated calls."""
+        return self._stats
+
+    @property
+    def static_prefix(self) -> Optional[str]:
+        """Prefix the workflow may leave out of its prompts."""
+        return self._static_prefix
+
+    def generate(self, prompt: str, max_output_tokens: int = 300, **kwargs: Any) -> str:
+        """Blocking reply after the simulated latency."""
+        started = time.perf_counter()
+        tokens = min(self._reply_tokens, max_output_tokens)
+        time.sleep(self._latency + tokens / self._tokens_per_second)
+        return self._finish(prompt, tokens, started)
+
+    async def agenerate(self, prompt: str, max_output_tokens: int = 300, **kwargs: Any) -> str:
+        """Reply after the simulated latency without blocking the loop."""
+        started = time.perf_counter()
+        tokens = min(self._reply_tokens, max_output_tokens)
+        await asyncio.sleep(self._latency + tokens / self._tokens_per_second)
+        return self._finish(prompt, tokens, started)
+
+    async def agenerate_stream(
+        self, prompt: str, max_output_tokens: int = 300, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """Yield the reply in chunks at the configured token rate."""
+        started = time.perf_counter()
+        tokens = min(self._reply_tokens, max_output_tokens)
+        words = _reply_words(tokens)
+        await asyncio.sleep(self._latency)
+        for offset in range(0, len(words), self._chunk_tokens):
+            chunk = words[offset : offset + self._chunk_tokens]
+            await asyncio.sleep(len(chunk) / self._tokens_per_second)
+            yield " ".join(chunk) + " "
+        self._record(prompt, tokens, started)
+
+    def _finish(self, prompt: str, tokens: int, started: float) -> str:
+        self._record(prompt, tokens, started)
+        return " ".join(_reply_words(tokens))
+
+    def _record(self, prompt: str, tokens: int, started: float) -> None:
+        usage = SimpleNamespace(
+            prompt_token_count=estimate_tokens(prompt), candidates_token_count=tokens
+        )
+        self._stats.record(time.perf_counter() - started, SimpleNamespace(usage_metadata=usage))
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings via feature hashing.
+
+    Texts sharing vocabulary get similar vectors, which keeps dense retrieval
+    meaningful without a model. ``cost_seconds`` simulates API time per call.
+    """
+
+    def __init__(self, dimensions: int = 256, cost_seconds: float = 0.0) -> None:
+        self.model = f"hashing-{dimensions}"
+        self._dimensions = dimensions
+        self._cost = cost_seconds
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self._cost:
+            time.sleep(self._cost)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self._cost:
+            time.sleep(self._cost)
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self._dimensions
+        for token in tokenize(text) or [text]:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self._dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+
+def _reply_words(tokens: int) -> List[str]:
+    """Roughly ``tokens`` tokens of plausible support text."""
+    count = max(1, int(tokens * 0.75))
+    return [_FILLER[idx % len(_FILLER)] for idx in range(count)]
@@ -0,0 +1,156 @@
+"""Bytes held per conversation session by the in-process memory backend.
+
+Run from the repository root::
+
+    python -m benchmarks.memory_footprint --sessions 20000 --turns 8
+
+``--layout legacy`` measures a copy of the session layout the slot records
+replaced (dataclass records in a bounded deque, formatted on every read), and
+``--layout both`` reports it next to the current one, so the before/after
+comparison can be reproduced.
+
+Each session gets ``turns`` user/assistant exchanges with distinct text, and
+the transcript, latest turn and summary are read after every exchange as the
+workflow does. Reported overhead is total traced memory minus the UTF-8 size
+of the message text itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.services.memory import (  # noqa: E402
+    DIGEST_TURNS,
+    HISTORY_TURNS,
+    TRANSCRIPT_TURNS,
+    ConversationMemoryManager,
+    InProcessMemoryBackend,
+    SessionMemory,
+)
+
+USER_TURN = (
+    "Conversation {session}: what is the daily loss limit on the {turn}0k challenge account?"
+)
+ASSISTANT_TURN = (
+    "For session {session} the {turn}0k account allows a 5% daily loss, reset at 00:00 server time."
+)
+
+
+@dataclass
+class LegacyMemoryRecord:
+    """Single conversational turn, as stored before records were pre-rendered."""
+
+    role: str
+    content: str
+
+
+@dataclass
+class LegacySessionMemory:
+    """The earlier session layout, behind the interface the manager uses today."""
+
+    conversation_id: str
+    history: Deque[LegacyMemoryRecord] = field(default_factory=lambda: deque(maxlen=HISTORY_TURNS))
+    summary: str = ""
+    user_turns: int = 0
+
+    @property
+    def latest_user(self) -> Optional[LegacyMemoryRecord]:
+        latest = [record for record in reversed(self.history) if record.role == "user"]
+        return latest[0] if latest else None
+
+    def add(self, role: str, content: str) -> None:
+        self.history.append(LegacyMemoryRecord(role, content))
+        if role == "user":
+            self.user_turns += 1
+
+    def transcript(self, turns: int = TRANSCRIPT_TURNS) -> str:
+        recent = list(self.history)[-turns:]
+        return "\n".join(f"{record.role}: {record.content}" for record in recent)
+
+    def digest(self) -> str:
+        turns = list(self.history)[-DIGEST_TURNS:]
+        return " | ".join(f"{record.role}: {record.content}" for record in turns)
+
+
+class LegacyMemoryBackend(InProcessMemoryBackend):
+    """In-process backend that creates sessions in the legacy layout."""
+
+    def _new_session(self, conversation_id: str) -> SessionMemory:
+        return LegacySessionMemory(conversation_id)  # type: ignore[return-value]
+
+
+LAYOUTS = {"current": InProcessMemoryBackend, "legacy": LegacyMemoryBackend}
+
+
+def _fill(manager: ConversationMemoryManager, sessions: int, turns: int) -> int:
+    """Play the conversations and return the bytes of message text written."""
+    content_bytes = 0
+    for session in range(sessions):
+        conversation_id = f"conversation-{session}"
+        for turn in range(turns):
+            user = USER_TURN.format(session=session, turn=turn)
+            assistant = ASSISTANT_TURN.format(session=session, turn=turn)
+            manager.append(conversation_id, "user", user)
+            manager.get_session_summary(conversation_id)
+            manager.get_latest_turn(conversation_id)
+            manager.append(conversation_id, "assistant", assistant)
+            manager.get_recent_transcript(conversation_id)
+            content_bytes += len(user) + len(assistant)
+    return content_bytes
+
+
+def measure(sessions: int, turns: int, layout: str = "current") -> Dict[str, Any]:
+    """Memory per session and throughput of the per-turn memory calls."""
+    backend = LAYOUTS[layout]
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    manager = ConversationMemoryManager(backend(max_sessions=sessions))
+    written = _fill(manager, sessions, turns)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    retained = manager.stats["content_bytes"]
+
+    # Time a separate run without tracemalloc overhead.
+    timed = ConversationMemoryManager(backend(max_sessions=sessions))
+    started = time.perf_counter()
+    _fill(timed, sessions, turns)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "sessions": sessions,
+        "turns": turns,
+        "bytes_per_session": round(used / sessions),
+        "content_bytes_per_session": round(retained / sessions),
+        "overhead_bytes_per_session": round((used - retained) / sessions),
+        "turns_per_second": round(sessions * turns / elapsed),
+        "content_bytes_written": written,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--layout", choices=[*LAYOUTS, "both"], default="current")
+    args = parser.parse_args()
+    if args.layout == "both":
+        report = {layout: measure(args.sessions, args.turns, layout) for layout in LAYOUTS}
+    else:
+        report = measure(args.sessions, args.turns, args.layout)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
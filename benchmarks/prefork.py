@@ -0,0 +1,113 @@
+"""Per-worker memory and start time of forked workers, with and without a preloaded master.
+
+Run from the repository root::
+
+    python -m benchmarks.prefork --workers 4 [--no-preload]
+
+Mirrors ``gunicorn -c gunicorn.conf.py main:app``: the master imports
+``main`` (which calls ``app.core.prefork.preload``) unless ``--no-preload``
+is given, then forks workers that each import the app and build an
+orchestrator on hashing embeddings and a fake Gemini, as warm-up does. Every
+worker reports its unique (USS) and proportional (PSS) memory from
+``/proc/self/smaps_rollup`` while all siblings are alive, so pages shared
+copy-on-write are split between them. Linux only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+MARKER = "prefork: "
+
+
+def run(workers: int, preload: bool) -> Dict[str, Any]:
+    """Fork ``workers`` workers and summarize what they report."""
+    os.environ["PRELOAD_APP"] = "1" if preload else "0"
+    started = time.perf_counter()
+    if preload:
+        import main  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+    master_ms = round(1000 * (time.perf_counter() - started), 1)
+
+    report_r, report_w = os.pipe()
+    release_r, release_w = os.pipe()
+    pids: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(report_r)
+            os.close(release_w)
+            status = 1
+            try:
+                _worker(report_w, release_r)
+                status = 0
+            finally:
+                os._exit(status)  # pylint: disable=protected-access
+        pids.append(pid)
+    os.close(report_w)
+    os.close(release_r)
+
+    with os.fdopen(report_r, encoding="utf-8") as reader:
+        reports = [json.loads(line) for line in reader.readlines()[:workers] if line.strip()]
+        # Workers exit once every one of them has reported, i.e. when ``release`` closes.
+    os.close(release_w)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    if len(reports) < workers:
+        raise RuntimeError(f"{workers - len(reports)} of {workers} workers failed to start")
+
+    return {
+        "workers": workers,
+        "preload": preload,
+        "master_ms": master_ms,
+        "worker_start_ms": round(statistics.median(r["start_ms"] for r in reports), 1),
+        "uss_mb": round(statistics.mean(r["uss_mb"] for r in reports), 1),
+        "pss_mb": round(statistics.mean(r["pss_mb"] for r in reports), 1),
+        "rss_mb": round(statistics.mean(r["rss_mb"] for r in reports), 1),
+    }
+
+
+def _worker(report_fd: int, release_fd: int) -> None:
+    started = time.perf_counter()
+    import main  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+    from benchmarks.scenarios import build_orchestrator  # pylint: disable=import-outside-toplevel
+
+    build_orchestrator(latency_seconds=0.0, tokens_per_second=1e9)
+    report = {"start_ms": round(1000 * (time.perf_counter() - started), 1), **_smaps_rollup()}
+    os.write(report_fd, (json.dumps(report) + "\n").encode("utf-8"))
+    os.close(report_fd)
+    # Stay resident until the siblings have measured themselves.
+    os.read(release_fd, 1)
+
+
+def _smaps_rollup() -> Dict[str, float]:
+    """Resident, proportional and unique set size of this process in MiB."""
+    fields: Dict[str, int] = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as rollup:
+        for line in rollup:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[key] = int(value.split()[0])
+    return {
+        "rss_mb": round(fields["Rss"] / 1024, 1),
+        "pss_mb": round(fields["Pss"] / 1024, 1),
+        "uss_mb": round((fields["Private_Clean"] + fields["Private_Dirty"]) / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-preload", dest="preload", action="store_false")
+    args = parser.parse_args()
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    print(MARKER + json.dumps(run(args.workers, args.preload)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Run the benchmark suite against local fakes and compare with a baseline.
+
+Usage::
+
+    python -m benchmarks.run                          # all scenarios
+    python -m benchmarks.run single_turn multi_turn   # a subset
+    python -m benchmarks.run --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.run --tolerance 0.25         # fail on >25% regressions
+    python -m benchmarks.run --strict                 # fail even against an advisory baseline
+
+No network access or API key is needed: generation goes through
+``FakeGeminiClient`` behind the real ``ModelRouter`` and retrieval uses
+``HashingEmbeddings`` on a throwaway Chroma store. The exit status is 1 when
+a tracked metric regresses beyond the tolerance.
+
+A baseline marked ``"advisory": true`` was recorded on another machine, so
+absolute numbers only hint at regressions: they are compared with the
+baseline's own (wide) ``tolerance`` and reported without failing the run.
+Saving every scenario with ``--save-baseline`` replaces it with a binding
+baseline for this machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.2
+SCENARIO_NAMES = ["single_turn", "multi_turn", "ingestion", "cold_start", "memory", "prefork"]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"scenarios to run (default: all of {', '.join(SCENARIO_NAMES)})",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="single-turn requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent users")
+    parser.add_argument("--sessions", type=int, default=24, help="multi-turn conversations")
+    parser.add_argument("--turns", type=int, default=6, help="turns per conversation")
+    parser.add_argument("--documents", type=int, default=200, help="documents to ingest")
+    parser.add_argument(
+        "--workers", type=int, default=4, help="forked workers in the prefork scenario"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="fake Gemini time to first token (s)"
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=400.0, help="fake Gemini generation speed"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON file"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="write results as the new baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help=f"allowed relative regression (default: the baseline's, else {DEFAULT_TOLERANCE:.0%})",
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="fail on regressions against an advisory baseline"
+    )
+    parser.add_argument("--output", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+    unknown = sorted(set(args.scenarios) - set(SCENARIO_NAMES))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def _prepare_environment(workdir: Path) -> None:
+    """Settings for an isolated run; must happen before ``app`` is imported."""
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ["ANSWER_CACHE_ENABLED"] = "false"
+    os.environ["MEMORY_BACKEND"] = "memory"
+    os.environ["VECTOR_STORE_PATH"] = str(workdir / "vector_store")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def _run(names: List[str], args: argparse.Namespace, workdir: Path) -> Dict[str, Dict[str, Any]]:
+    from benchmarks import scenarios
+
+    runners: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "single_turn": lambda: scenarios.single_turn(
+            args.requests, args.concurrency, args.latency, args.tokens_per_second
+        ),
+        "multi_turn": lambda: scenarios.multi_turn(
+            args.sessions, args.turns, args.concurrency, args.latency, args.tokens_per_second
+        ),
+        "ingestion": lambda: scenarios.ingestion(args.documents),
+        "cold_start": lambda: scenarios.cold_start(workdir / "cold_start"),
+        "memory": lambda: scenarios.memory(2000, 12),
+        "prefork": lambda: scenarios.prefork(workdir / "prefork", args.workers),
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in names:
+        scenarios.use_store(workdir / name)
+        print(f"running {name} ...", file=sys.stderr, flush=True)
+        results[name] = runners[name]()
+        print(f"{name}: {json.dumps(results[name])}", file=sys.stderr, flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """Human-readable regressions of tracked metrics beyond ``tolerance``."""
+    from benchmarks.scenarios import TRACKED
+
+    regressions: List[str] = []
+    for name, metrics in results.items():
+        for metric, better in TRACKED.get(name, {}).items():
+            current = metrics.get(metric)
+            reference = baseline.get(name, {}).get(metric)
+            if current is None or not reference:
+                continue
+            change = (current - reference) / reference
+            if (better == "lower" and change > tolerance) or (
+                better == "higher" and -change > tolerance
+            ):
+                regressions.append(
+                    f"{name}.{metric}: {current} vs baseline {reference} ({change:+.0%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    args = _parse_args()
+    names = args.scenarios or SCENARIO_NAMES
+    workdir = Path(tempfile.mkdtemp(prefix="dragon-bench-"))
+    _prepare_environment(workdir)
+    try:
+        results = _run(names, args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scenarios": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.save_baseline:
+        saved: Dict[str, Any] = {}
+        if args.baseline.exists():
+            saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+        saved.update({key: value for key, value in report.items() if key != "scenarios"})
+        saved.setdefault("scenarios", {}).update(results)
+        if set(names) == set(SCENARIO_NAMES):
+            # Every number now comes from this machine.
+            saved.pop("advisory", None)
+            saved.pop("tolerance", None)
+        args.baseline.write_text(json.dumps(saved, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    if not args.baseline.exists():
+        print(
+            f"no baseline at {args.baseline}; run with --save-baseline to create one",
+            file=sys.stderr,
+        )
+        return
+    saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+    advisory = bool(saved.get("advisory")) and not args.strict
+    tolerance = (
+        args.tolerance if args.tolerance is not None else saved.get("tolerance", DEFAULT_TOLERANCE)
+    )
+    regressions = compare(results, saved.get("scenarios", {}), tolerance)
+    for line in regressions:
+        print(f"{'ADVISORY ' if advisory else ''}REGRESSION {line}", file=sys.stderr)
+    if regressions and not advisory:
+        sys.exit(1)
+    if regressions:
+        print(
+            f"{args.baseline} is advisory (recorded on another machine); not failing. "
+            "Run with --save-baseline to record this machine's numbers.",
+            file=sys.stderr,
+        )
+        return
+    print(f"no regressions beyond {tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Benchmark scenarios for the support workflow, run against local fakes.
+
+Every scenario returns a flat dict of metrics. ``TRACKED`` lists the metrics
+compared against the baseline and whether lower or higher is better.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.models.schemas import IngestionDocument, SupportQuery
+from app.services.ingestion import IngestionPipeline
+from app.services.llm import ModelRouter
+from app.services.retrieval import DragonKnowledgeBase
+from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+from benchmarks.fakes import FakeGeminiClient, HashingEmbeddings
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+QUESTIONS = [
+    "What is the daily loss limit during phase one of the challenge?",
+    "How do I complete KYC verification and which documents are accepted?",
+    "When can I request my first payout and which payment methods are supported?",
+    "How much commission do I earn from the referral program?",
+    "How do I earn Dragon Club rewards for a Trustpilot review?",
+    "Can I hold trades over the weekend or during high impact news?",
+    "What happens if I breach the maximum drawdown?",
+    "How long does a withdrawal to my bank account take?",
+]
+
+FOLLOW_UPS = [
+    "Does that also apply to the funded account?",
+    "What if I am in a different timezone?",
+    "Can you summarize the steps again?",
+    "Is there a fee for that?",
+]
+
+TRACKED: Dict[str, Dict[str, str]] = {
+    "single_turn": {"p95_ms": "lower", "throughput": "higher"},
+    "multi_turn": {"p95_ms": "lower", "throughput": "higher"},
+    "ingestion": {"throughput": "higher", "reingest_seconds": "lower"},
+    "cold_start": {"first_start_ms": "lower", "warm_start_ms": "lower"},
+    "memory": {"bytes_per_session": "lower"},
+    "prefork": {"worker_start_ms": "lower", "uss_mb": "lower"},
+}
+
+
+def use_store(path: Path) -> None:
+    """Point settings at a fresh storage directory for the next scenario."""
+    path.mkdir(parents=True, exist_ok=True)
+    os.environ["VECTOR_STORE_PATH"] = str(path / "vector_store")
+    os.environ["MEMORY_STORE_PATH"] = str(path / "conversation_memory.sqlite3")
+    get_settings.cache_clear()
+
+
+def build_orchestrator(
+    latency_seconds: float, tokens_per_second: float
+) -> DragonFundedOrchestrator:
+    """Orchestrator on hashing embeddings and a fake Gemini behind the real router."""
+    llm = ModelRouter(
+        FakeGeminiClient(latency_seconds=latency_seconds, tokens_per_second=tokens_per_second)
+    )
+    return DragonFundedOrchestrator(kb=DragonKnowledgeBase(embedder=HashingEmbeddings()), llm=llm)
+
+
+def single_turn(
+    requests: int, concurrency: int, latency_seconds: float, tokens_per_second: float
+) -> Dict[str, Any]:
+    """Independent opening questions from many users at a fixed concurrency."""
+    orchestrator = build_orchestrator(latency_seconds, tokens_per_second)
+
+    async def run() -> List[float]:
+        gate = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+
+        async def turn(idx: int) -> None:
+            message = f"{QUESTIONS[idx % len(QUESTIONS)]} (ticket {idx})"
+            async with gate:
+                started = time.perf_counter()
+                await orchestrator.arun(SupportQuery(message=message))
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(turn(idx) for idx in range(requests)))
+        await orchestrator.aclose()
+        return latencies
+
+    return _timed_turns(run)
+
+
+def multi_turn(
+    sessions: int, turns: int, concurrency: int, latency_seconds: float, tokens_per_second: float
+) -> Dict[str, Any]:
+    """Conversations of several turns, exercising memory and background summaries."""
+    orchestrator = build_orchestrator(latency_seconds, tokens_per_second)
+
+    async def run() -> List[float]:
+        gate = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+
+        async def session(idx: int) -> None:
+            async with gate:
+                conversation_id = f"bench-{idx}"
+                for turn in range(turns):
+                    message = (
+                        QUESTIONS[idx % len(QUESTIONS)]
+                        if turn == 0
+                        else FOLLOW_UPS[turn % len(FOLLOW_UPS)]
+                    )
+                    started = time.perf_counter()
+                    await orchestrator.arun(
+                        SupportQuery(message=message, conversation_id=conversation_id)
+                    )
+                    latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(session(idx) for idx in range(sessions)))
+        await orchestrator.aclose()
+        return latencies
+
+    return _timed_turns(run)
+
+
+def ingestion(documents: int) -> Dict[str, Any]:
+    """Ingest synthetic documents into an empty store, then re-submit them unchanged."""
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    docs = [_synthetic_document(idx) for idx in range(documents)]
+    pipeline = IngestionPipeline(kb)
+
+    started = time.perf_counter()
+    result = pipeline.run(docs)
+    elapsed = time.perf_counter() - started
+    chunks = sum(doc.chunks_added for doc in result.documents)
+
+    started = time.perf_counter()
+    pipeline.run(docs)
+    reingest = time.perf_counter() - started
+
+    return {
+        "documents": documents,
+        "chunks": chunks,
+        "failed": result.skipped,
+        "seconds": round(elapsed, 3),
+        "throughput": round(documents / elapsed, 2),
+        "chunks_per_second": round(chunks / elapsed, 2),
+        "reingest_seconds": round(reingest, 3),
+        **_memory_usage(),
+    }
+
+
+def cold_start(store: Path) -> Dict[str, Any]:
+    """Import and construct the orchestrator in a new process, on an empty and then a warm store."""
+    first = _child_start(store)
+    warm = _child_start(store)
+    return {
+        "import_ms": first["import_ms"],
+        "first_start_ms": first["init_ms"],
+        "warm_start_ms": warm["init_ms"],
+        "child_rss_mb": warm["rss_mb"],
+    }
+
+
+def prefork(store: Path, workers: int) -> Dict[str, Any]:
+    """Forked workers with a preloaded master versus workers importing everything themselves."""
+    _child_start(store)  # seed the store so workers only open it
+    shared = _run_child(store, ["-m", "benchmarks.prefork", "--workers", str(workers)], "prefork: ")
+    plain = _run_child(
+        store, ["-m", "benchmarks.prefork", "--workers", str(workers), "--no-preload"], "prefork: "
+    )
+    return {
+        "workers": workers,
+        "master_preload_ms": shared["master_ms"],
+        "worker_start_ms": shared["worker_start_ms"],
+        "uss_mb": shared["uss_mb"],
+        "pss_mb": shared["pss_mb"],
+        "no_preload_worker_start_ms": plain["worker_start_ms"],
+        "no_preload_uss_mb": plain["uss_mb"],
+        "no_preload_pss_mb": plain["pss_mb"],
+    }
+
+
+def memory(sessions: int, turns: int) -> Dict[str, Any]:
+    """Per-session footprint of conversation memory (see ``memory_footprint``)."""
+    from benchmarks.memory_footprint import measure
+
+    result = measure(sessions, turns)
+    result["throughput"] = result.pop("turns_per_second")
+    return result
+
+
+def _timed_turns(run: Callable[[], Any]) -> Dict[str, Any]:
+    """Execute an async scenario and summarize its per-turn latencies."""
+    started = time.perf_counter()
+    latencies = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    return {
+        "turns": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 2),
+        **latency_summary(latencies),
+        **_memory_usage(),
+    }
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 and mean of ``latencies`` (seconds) in milliseconds."""
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None}
+    ordered = sorted(latencies)
+
+    def pick(quantile: float) -> float:
+        return round(1000 * ordered[min(len(ordered) - 1, int(quantile * len(ordered)))], 2)
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 2),
+    }
+
+
+def _memory_usage() -> Dict[str, Optional[float]]:
+    """Current and peak resident set size of this process in MiB."""
+    current = None
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            current = round(int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"rss_mb": current, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _child_start(store: Path) -> Dict[str, Any]:
+    """Time imports and orchestrator construction in a fresh interpreter."""
+    return _run_child(store, ["-c", _CHILD_SCRIPT], _CHILD_MARKER)
+
+
+def _run_child(store: Path, arguments: List[str], marker: str) -> Dict[str, Any]:
+    """Run ``python <arguments>`` on ``store`` and parse the JSON it prints after ``marker``."""
+    env = dict(os.environ)
+    env["VECTOR_STORE_PATH"] = str(store / "vector_store")
+    env["MEMORY_STORE_PATH"] = str(store / "conversation_memory.sqlite3")
+    completed = subprocess.run(
+        [sys.executable, *arguments],
+        env=env,
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    line = next(line for line in reversed(completed.stdout.splitlines()) if line.startswith(marker))
+    return json.loads(line[len(marker) :])
+
+
+def _synthetic_document(idx: int) -> IngestionDocument:
+    """A policy-style document of a few kilobytes with distinct wording."""
+    topic = ["challenge_rules", "kyc", "withdrawal", "referral", "dragon_club"][idx % 5]
+    paragraphs = [
+        f"Section {section} of policy {idx} on {topic.replace('_', ' ')}. "
+        f"Traders on plan {idx % 7} must keep drawdown under {4 + section % 6}% "
+        f"and document trade {idx * 13 + section}. "
+        + " ".join(QUESTIONS[(idx + section) % len(QUESTIONS)] for _ in range(3))
+        for section in range(8)
+    ]
+    return IngestionDocument(
+        id=f"bench-doc-{idx}",
+        title=f"Benchmark policy {idx}",
+        content="\n\n".join(paragraphs),
+        domain=[topic],
+        tags=[topic],
+    )
+
+
+_CHILD_MARKER = "cold-start: "
+_CHILD_SCRIPT = (
+    "import time; started = time.perf_counter(); "
+    "from benchmarks import scenarios; scenarios.child_start(started)"
+)
+
+
+def child_start(started: float) -> None:
+    """Body of the cold-start child; ``started`` is taken before any app import."""
+    imported = time.perf_counter()
+    build_orchestrator(latency_seconds=0.0, tokens_per_second=1e9)
+    ready = time.perf_counter()
+    result = {
+        "import_ms": round(1000 * (imported - started), 1),
+        "init_ms": round(1000 * (ready - imported), 1),
+        "rss_mb": _memory_usage()["rss_mb"],
+    }
+    print(_CHILD_MARKER + json.dumps(result))
@@ -0,0 +1,27 @@
+"""Gunicorn settings for serving the API with pre-forked uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app is imported once in the master (``preload_app``) and warmed by
+``app.core.prefork.preload``; workers fork from it and share the imported
+modules and parsed indexes copy-on-write.
+
+One worker by default. Knowledge-base writes are serialized across workers
+and each worker reloads the manifest and BM25 index when another one
+changes them, but Chroma's embedded vector index is loaded per process: a
+worker does not see vectors ingested by its siblings until it restarts.
+Raise ``WEB_CONCURRENCY`` when ingestion runs out of band (followed by a
+restart), or the vector store is served by a Chroma server.
+"""
+
+import os
+
+os.environ.setdefault("PRELOAD_APP", "1")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
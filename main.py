@@ -1,4 +1,11 @@
-"""Local entrypoint for running the Dragon Funded support bot API."""
+"""Local entrypoint for running the Dragon Funded support bot API.
+
+Also the server entry for pre-fork servers: with ``PRELOAD_APP`` set (as
+``gunicorn.conf.py`` does) importing this module warms the state workers
+share before the master forks them.
+"""
+
+import os
 
 import uvicorn
 
@@ -6,6 +13,11 @@ from app import create_app
 
 app = create_app()
 
+if os.getenv("PRELOAD_APP", "").lower() in {"1", "true", "yes"}:
+    from app.core.prefork import preload
+
+    preload()
+
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
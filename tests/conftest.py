@@ -0,0 +1,32 @@
+"""Shared fixtures: settings pointed at a throwaway storage directory."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.core.config import Settings, get_settings
+from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+from benchmarks.scenarios import build_orchestrator
+
+
+@pytest.fixture
+def settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Settings]:
+    """Settings with every store under ``tmp_path``; set more env vars before first use."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path / "vector_store"))
+    monkeypatch.setenv("MEMORY_STORE_PATH", str(tmp_path / "conversation_memory.sqlite3"))
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def orchestrator(settings: Settings) -> Iterator[DragonFundedOrchestrator]:
+    """Seeded workflow on hashing embeddings and a fast fake Gemini."""
+    workflow = build_orchestrator(latency_seconds=0.01, tokens_per_second=20_000.0)
+    yield workflow
+    asyncio.run(workflow.aclose())
@@ -0,0 +1,117 @@
+"""AnswerCache matching and the workflow's cache lookup."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import List, Optional
+
+from app.models.schemas import SupportResponse
+from app.services.answer_cache import AnswerCache, AnswerCacheProbe
+from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+
+
+def _response(reply: str) -> SupportResponse:
+    return SupportResponse(conversation_id="c1", reply=reply, confidence=0.9)
+
+
+def _probe(
+    text: str, intent: str = "kyc", embedding: Optional[List[float]] = None
+) -> AnswerCacheProbe:
+    return AnswerCacheProbe(
+        normalized=AnswerCache.normalize(text), intent=intent, embedding=embedding
+    )
+
+
+def test_exact_and_semantic_hits_respect_intent_and_threshold():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put(
+        _probe("How do I verify?", embedding=[1.0, 0.0]),
+        _response("Upload a passport."),
+        revision=1,
+    )
+
+    assert cache.get_exact(_probe("how do i VERIFY"), revision=1).reply == "Upload a passport."
+    assert cache.get_similar(
+        _probe("verification steps", embedding=[0.99, 0.1]), revision=1
+    ).reply == ("Upload a passport.")
+    assert (
+        cache.get_similar(_probe("verification steps", "withdrawal", [1.0, 0.0]), revision=1)
+        is None
+    )
+    assert cache.get_similar(_probe("something else", embedding=[0.0, 1.0]), revision=1) is None
+    assert cache.stats["exact_hits"] == 1
+    assert cache.stats["semantic_hits"] == 1
+    assert cache.stats["misses"] == 2
+
+
+def test_a_new_revision_drops_every_answer():
+    cache = AnswerCache()
+    cache.put(_probe("How do I verify?"), _response("Upload a passport."), revision=1)
+
+    assert cache.get_exact(_probe("How do I verify?"), revision=2) is None
+    assert cache.stats["entries"] == 0
+    assert cache.stats["invalidations"] == 1
+
+
+class _Embeddings:
+    """Query vectors by text; ``cached`` holds the ones already computed."""
+
+    def __init__(self, cached: dict) -> None:
+        self.cached = cached
+        self.api_calls: List[str] = []
+
+    def cached_query(self, text: str) -> Optional[List[float]]:
+        return self.cached.get(text)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.api_calls.append(text)
+        return [1.0, 0.0]
+
+
+def _workflow(lexical: bool, cached: dict) -> SimpleNamespace:
+    kb = SimpleNamespace(
+        revision=3,
+        embeddings=_Embeddings(cached),
+        serves_lexically=lambda query, k, tags: lexical,
+    )
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put(
+        _probe("How do I verify?", embedding=[1.0, 0.0]),
+        _response("Upload a passport."),
+        revision=3,
+    )
+    return SimpleNamespace(_kb=kb, _answer_cache=cache, _retrieval_k=6, _filtered_retrieval_k=4)
+
+
+def _lookup(workflow: SimpleNamespace, message: str) -> AnswerCacheProbe:
+    return DragonFundedOrchestrator._lookup_answer(  # pylint: disable=protected-access
+        workflow, _probe(message), message, None
+    )
+
+
+def test_lexically_served_questions_use_a_cached_query_vector():
+    workflow = _workflow(lexical=True, cached={"Verification please": [0.98, 0.05]})
+
+    probe = _lookup(workflow, "Verification please")
+
+    assert probe.hit is not None and probe.hit.reply == "Upload a passport."
+    assert workflow._kb.embeddings.api_calls == []
+
+
+def test_lexically_served_questions_without_a_vector_count_a_miss():
+    workflow = _workflow(lexical=True, cached={})
+
+    probe = _lookup(workflow, "Verification please")
+
+    assert probe.hit is None
+    assert workflow._kb.embeddings.api_calls == []
+    assert workflow._answer_cache.stats["misses"] == 1
+
+
+def test_other_questions_are_embedded_for_the_semantic_lookup():
+    workflow = _workflow(lexical=False, cached={})
+
+    probe = _lookup(workflow, "Verification please")
+
+    assert probe.hit is not None
+    assert workflow._kb.embeddings.api_calls == ["Verification please"]
@@ -0,0 +1,118 @@
+"""StaticPrefixCache creation, reuse, refresh and fallback, against a fake caching API."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+import pytest
+
+from app.services import llm
+from app.services.llm import GeminiClient, StaticPrefixCache
+
+
+class FakeClock:
+    """Stands in for the ``time`` module's ``monotonic``."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeCachedContent:
+    """Records the caches created and extended; ``existing`` is what ``list`` returns."""
+
+    existing: List["FakeCachedContent"] = []
+    created: List["FakeCachedContent"] = []
+    fail = False
+
+    def __init__(self, name: str, model: str, display_name: str, ttl: timedelta) -> None:
+        self.name = name
+        self.model = f"models/{model}"
+        self.display_name = display_name
+        self.updates = 0
+        self.expire_time = datetime.now(timezone.utc) + ttl
+
+    @classmethod
+    def list(cls, page_size: int) -> List["FakeCachedContent"]:
+        return list(cls.existing)
+
+    @classmethod
+    def create(cls, model: str, display_name: str, system_instruction: str, ttl: timedelta) -> Any:
+        if cls.fail:
+            raise RuntimeError("cached content is not supported for this model")
+        cached = cls(f"cachedContents/{len(cls.created)}", model, display_name, ttl)
+        cls.created.append(cached)
+        return cached
+
+    def update(self, ttl: timedelta) -> None:
+        self.updates += 1
+        self.expire_time = datetime.now(timezone.utc) + ttl
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(llm, "time", fake)
+    monkeypatch.setattr(FakeCachedContent, "existing", [])
+    monkeypatch.setattr(FakeCachedContent, "created", [])
+    monkeypatch.setattr(FakeCachedContent, "fail", False)
+    monkeypatch.setattr(llm.caching, "CachedContent", FakeCachedContent)
+    monkeypatch.setattr(
+        llm.genai.GenerativeModel,
+        "from_cached_content",
+        classmethod(lambda cls, cached: ("model", cached.name)),
+    )
+    return fake
+
+
+def _cache(model: str = "gemini-test") -> StaticPrefixCache:
+    return StaticPrefixCache(
+        model, "PREFIX", "ab" * 32, ttl_seconds=3600, refresh_margin_seconds=300
+    )
+
+
+def test_prefix_is_cached_once_and_extended_before_expiry(clock: FakeClock):
+    cache = _cache()
+
+    assert cache.model() == ("model", "cachedContents/0")
+    assert cache.model() == ("model", "cachedContents/0")
+    assert len(FakeCachedContent.created) == 1
+    assert FakeCachedContent.created[0].display_name == "dragon-support-" + "ab" * 8
+
+    clock.now += 3301
+    assert not cache.fresh
+    assert cache.model() == ("model", "cachedContents/0")
+    assert FakeCachedContent.created[0].updates == 1
+    assert len(FakeCachedContent.created) == 1
+
+
+def test_a_restart_reuses_the_cache_of_the_same_prefix_and_model(clock: FakeClock):
+    other_model = FakeCachedContent(
+        "cachedContents/other", "gemini-other", "dragon-support-" + "ab" * 8, timedelta(hours=1)
+    )
+    same = FakeCachedContent(
+        "cachedContents/same", "gemini-test", "dragon-support-" + "ab" * 8, timedelta(hours=1)
+    )
+    FakeCachedContent.existing = [other_model, same]
+
+    assert _cache().model() == ("model", "cachedContents/same")
+    assert FakeCachedContent.created == []
+    assert (other_model.updates, same.updates) == (0, 1)
+
+
+def test_unavailable_caching_falls_back_and_retries_later(clock: FakeClock):
+    FakeCachedContent.fail = True
+    client = GeminiClient(api_key="test-key", model="gemini-test", static_prefix="PREFIX")
+    cache = client._prefix_cache  # pylint: disable=protected-access
+
+    # The system-instruction model serves prefixed calls while caching is unavailable.
+    assert (
+        client._base_model(with_static_prefix=True) is client._prefix_client
+    )  # pylint: disable=protected-access
+    FakeCachedContent.fail = False
+    assert cache.model() is None
+    clock.now += StaticPrefixCache.retry_after_seconds
+    assert cache.model() == ("model", "cachedContents/0")
@@ -0,0 +1,89 @@
+"""pack_context deduplication, merging and budget trimming."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from app.models.schemas import RetrievedDocument
+from app.services.context_packing import estimate_tokens, pack_context
+
+
+def _doc(
+    doc_id: str, content: str, chunk_index: Optional[int] = None, score: Optional[float] = None
+) -> RetrievedDocument:
+    return RetrievedDocument(
+        id=doc_id,
+        title=doc_id,
+        content=content,
+        confidence=0.9,
+        chunk_index=chunk_index,
+        score=score,
+    )
+
+
+def test_estimate_tokens_rounds_up_four_characters_per_token():
+    assert [estimate_tokens(text) for text in ["", "a", "abcd", "abcde"]] == [0, 1, 1, 2]
+
+
+def test_repeated_chunks_are_packed_once():
+    docs = [
+        _doc("rules", "Max drawdown is 10 percent.", chunk_index=0, score=0.9),
+        _doc("rules", "Max drawdown is 10 percent.", chunk_index=0, score=0.5),
+        # The same text stored under another document is a duplicate too.
+        _doc("faq", "  Max drawdown is 10 percent. ", score=0.4),
+        _doc("payouts", "Payouts take two days.", score=0.3),
+    ]
+
+    packed = pack_context(docs, budget_tokens=500)
+
+    assert [passage.document.id for passage in packed.passages] == ["rules", "payouts"]
+    assert packed.text.count("Max drawdown") == 1
+    assert (packed.chunks_in, packed.dropped) == (4, 0)
+
+
+def test_adjacent_chunks_merge_without_their_overlap():
+    docs = [
+        _doc(
+            "rules",
+            "the daily loss limit resets at midnight server time.",
+            chunk_index=1,
+            score=0.4,
+        ),
+        _doc(
+            "rules",
+            "Phase one needs 8 percent profit and the daily loss limit resets",
+            chunk_index=0,
+            score=0.8,
+        ),
+        _doc("rules", "Unrelated later section.", chunk_index=5, score=0.2),
+    ]
+
+    packed = pack_context(docs, budget_tokens=500)
+
+    assert [passage.chunk_indexes for passage in packed.passages] == [[0, 1], [5]]
+    assert packed.passages[0].text == (
+        "Phase one needs 8 percent profit and the daily loss limit resets at midnight server time."
+    )
+    assert packed.passages[0].score == 0.8
+
+
+def test_lower_scored_passages_are_dropped_to_fit_the_budget():
+    docs = [
+        _doc("low", "A low ranked passage. " * 10, score=0.2),
+        _doc("high", "The best passage. " * 10, score=0.9),
+        _doc("mid", "A middling passage. " * 10, score=0.5),
+    ]
+
+    packed = pack_context(docs, budget_tokens=130)
+
+    assert [passage.document.id for passage in packed.passages] == ["high", "mid"]
+    assert packed.dropped == 1
+    assert packed.tokens <= 130
+
+
+def test_a_passage_larger_than_the_budget_is_truncated():
+    packed = pack_context([_doc("long", "word " * 400, score=0.9)], budget_tokens=50)
+
+    assert len(packed.passages) == 1
+    assert packed.passages[0].text.endswith(" …")
+    assert packed.tokens <= 50
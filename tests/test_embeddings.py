@@ -0,0 +1,73 @@
+"""CachedEmbeddings memory and disk reuse."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from app.services.embeddings import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic vectors that record every text sent to the "API"."""
+
+    def __init__(self) -> None:
+        self.documents: List[str] = []
+        self.queries: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.documents.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.queries.append(text)
+        return [float(len(text)), -1.0]
+
+
+def test_cached_query_never_calls_the_api(tmp_path: Path):
+    inner = CountingEmbeddings()
+    path = tmp_path / "embeddings.sqlite3"
+    cache = CachedEmbeddings(inner, model="m1", cache_path=path, lru_size=1)
+
+    assert cache.cached_query("what is the payout split") is None
+    vector = cache.embed_query("what is the payout split")
+    assert cache.cached_query("what is the payout split") == vector
+    # Evicted from memory by another query, it is still found on disk.
+    cache.embed_query("kyc documents")
+    assert cache.cached_query("what is the payout split") == vector
+
+    reopened = CachedEmbeddings(inner, model="m1", cache_path=path)
+    assert reopened.cached_query("what is the payout split") == vector
+    assert reopened.cached_query("never asked") is None
+    assert inner.queries == ["what is the payout split", "kyc documents"]
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_vectors_round_trip_through_the_disk_cache(tmp_path: Path):
+    inner = CountingEmbeddings()
+    path = tmp_path / "embeddings.sqlite3"
+    cache = CachedEmbeddings(inner, model="m1", cache_path=path)
+
+    vectors = cache.embed_documents(["drawdown", "payout", "drawdown"])
+    # Queries and documents are embedded with different task types, so neither serves the other.
+    cache.embed_query("drawdown")
+    reopened = CachedEmbeddings(inner, model="m1", cache_path=path)
+
+    assert reopened.embed_documents(["payout", "drawdown"]) == [vectors[1], vectors[0]]
+    assert inner.documents == ["drawdown", "payout"]
+    assert inner.queries == ["drawdown"]
+    assert cache.stats["misses"] == 4
+    assert reopened.stats["disk_hits"] == 2
+
+
+def test_opening_with_another_model_purges_the_old_vectors(tmp_path: Path):
+    inner = CountingEmbeddings()
+    path = tmp_path / "embeddings.sqlite3"
+    CachedEmbeddings(inner, model="m1", cache_path=path).embed_documents(["drawdown"])
+
+    CachedEmbeddings(inner, model="m2", cache_path=path).embed_documents(["payout"])
+    CachedEmbeddings(inner, model="m1", cache_path=path).embed_documents(["drawdown"])
+
+    assert inner.documents == ["drawdown", "payout", "drawdown"]
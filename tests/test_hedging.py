@@ -0,0 +1,90 @@
+"""HedgeBudget refill and HedgePolicy trigger delay."""
+
+from __future__ import annotations
+
+from app.services.hedging import HedgeBudget, HedgePolicy
+
+
+def test_budget_refills_by_ratio_per_eligible_call():
+    budget = HedgeBudget(ratio=0.25, burst=5.0)
+
+    for _ in range(3):
+        budget.earn()
+    assert not budget.spend()
+    budget.earn()
+
+    assert budget.spend()
+    assert not budget.spend()
+    assert budget.stats["eligible"] == 4
+    assert budget.stats["hedged"] == 1
+    assert budget.stats["denied"] == 2
+    assert budget.stats["extra_request_ratio"] == 0.25
+
+
+def test_budget_caps_unspent_hedges_at_burst():
+    budget = HedgeBudget(ratio=0.5, burst=2.0)
+
+    for _ in range(100):
+        budget.earn()
+
+    assert budget.stats["balance"] == 2.0
+    assert budget.spend()
+    assert budget.spend()
+    assert not budget.spend()
+
+
+def test_extra_requests_stay_within_the_ratio():
+    # A ratio exact in binary, so the balance reaches whole hedges without rounding error.
+    budget = HedgeBudget(ratio=0.125, burst=3.0)
+
+    hedged = 0
+    for _ in range(1000):
+        budget.earn()
+        # Every call would like to hedge.
+        hedged += budget.spend()
+
+    assert hedged == 125
+    assert budget.stats["extra_request_ratio"] == 0.125
+
+
+def test_win_rate_counts_hedges_that_answered_first():
+    budget = HedgeBudget(ratio=1.0)
+    assert budget.stats["win_rate"] is None
+
+    for _ in range(4):
+        budget.earn()
+        budget.spend()
+    budget.record_win()
+
+    assert budget.stats["win_rate"] == 0.25
+
+
+def test_policy_waits_for_samples_then_uses_the_percentile():
+    policy = HedgePolicy(HedgeBudget(), percentile=0.9, min_delay_seconds=0.5, min_samples=10)
+
+    for latency in range(1, 10):
+        policy.observe(float(latency))
+    assert policy.delay() is None
+
+    policy.observe(10.0)
+    assert policy.delay() == 10.0
+    for _ in range(10):
+        policy.observe(0.1)
+    # Fast calls pull the trigger down, but never below the minimum delay.
+    assert policy.delay() == 9.0
+    for _ in range(100):
+        policy.observe(0.1)
+    assert policy.delay() == 0.5
+
+
+def test_refund_returns_an_unsent_hedge():
+    budget = HedgeBudget(ratio=1.0, burst=1.0)
+    budget.earn()
+
+    assert budget.spend()
+    budget.refund()
+
+    assert budget.stats["balance"] == 1.0
+    assert budget.stats["hedged"] == 0
+    assert budget.stats["denied"] == 1
+    assert budget.spend()
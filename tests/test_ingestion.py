@@ -0,0 +1,85 @@
+"""IngestionPipeline windows split in spawned worker processes."""
+
+from __future__ import annotations
+
+from typing import Any, List
+
+import pytest
+
+from app.core.config import Settings
+from app.models.schemas import IngestionDocument
+from app.services import ingestion
+from app.services.ingestion import IngestionPipeline, IngestionProgress
+from app.services.retrieval import DragonKnowledgeBase
+from benchmarks.fakes import HashingEmbeddings
+
+
+def _document(idx: int) -> IngestionDocument:
+    paragraphs = [
+        f"Section {section} of policy {idx}: keep drawdown under {4 + section}% on plan {idx}. " * 6
+        for section in range(4)
+    ]
+    return IngestionDocument(
+        id=f"doc-{idx}",
+        title=f"Policy {idx}",
+        content="\n\n".join(paragraphs),
+        domain=["general"],
+        tags=["challenge_rules"],
+    )
+
+
+def test_multi_document_windows_split_in_spawned_processes(
+    settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    start_methods: List[str] = []
+    pool_class = ingestion.ProcessPoolExecutor
+
+    def recording_pool(*args: Any, **kwargs: Any):
+        start_methods.append(kwargs["mp_context"].get_start_method())
+        return pool_class(*args, **kwargs)
+
+    monkeypatch.setattr(ingestion, "ProcessPoolExecutor", recording_pool)
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    docs = [_document(idx) for idx in range(5)]
+    reports: List[IngestionProgress] = []
+
+    result = IngestionPipeline(kb, split_workers=2, window_size=3).run(
+        docs, progress=reports.append
+    )
+
+    assert start_methods == ["spawn"]
+    assert [doc.id for doc in result.documents] == [doc.id for doc in docs]
+    assert {doc.status for doc in result.documents} == {"indexed"}
+    # Worker processes chunk exactly as the server would.
+    expected = [len(kb.chunk_document(doc)) for doc in docs]
+    assert [doc.chunks_added for doc in result.documents] == expected
+    assert [report.documents_done for report in reports] == [3, 5]
+    assert kb.retrieve("policy 3", k=1)[0].id == "doc-3"
+
+    rerun = IngestionPipeline(kb, split_workers=2, window_size=3).run(docs)
+    assert {doc.status for doc in rerun.documents} == {"unchanged"}
+
+
+def test_embedding_runs_outside_the_store_lock_and_is_replanned_under_it(
+    settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    other_writer = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    doc = _document(0)
+    embed = kb.embeddings.embed_documents
+    lock_depths: List[int] = []
+
+    def embed_documents(texts: List[str]) -> List[List[float]]:
+        lock_depths.append(kb._store_lock_depth)  # pylint: disable=protected-access
+        if len(lock_depths) == 1:
+            # Another writer indexes the same document while these vectors are computed.
+            other_writer.ingest([doc])
+        return embed(texts)
+
+    monkeypatch.setattr(kb.embeddings, "embed_documents", embed_documents)
+
+    result = IngestionPipeline(kb, split_workers=1).run([doc])
+
+    assert set(lock_depths) == {0}
+    assert result.documents[0].status == "unchanged"
+    assert kb.retrieve("policy 0", k=1)[0].id == "doc-0"
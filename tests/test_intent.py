@@ -0,0 +1,83 @@
+"""IntentClassifier whole-word, stem and phrase matching, and ranking."""
+
+from __future__ import annotations
+
+from typing import List
+
+from app.services.intent import GENERAL_INTENT, INTENT_KEYWORDS, IntentClassifier, KeywordAutomaton
+
+
+def _intents(classifier: IntentClassifier, message: str) -> List[str]:
+    return [match.intent for match in classifier.classify(message)]
+
+
+def test_keywords_match_whole_words_and_plurals_only():
+    classifier = IntentClassifier(INTENT_KEYWORDS)
+
+    assert _intents(classifier, "Where is my referral link?") == ["referral"]
+    assert _intents(classifier, "I have two links") == ["referral"]
+    assert _intents(classifier, "The accounts are unlinked") == []
+    assert _intents(classifier, "linkage") == []
+    # Only a plural "s" may follow a keyword that is not a stem.
+    assert _intents(classifier, "I went bankrupt") == []
+    assert classifier.primary("hello there") == GENERAL_INTENT
+
+
+def test_stems_match_any_suffix_but_not_inside_words():
+    classifier = IntentClassifier(INTENT_KEYWORDS)
+
+    for message in ("withdraw", "my withdrawal", "withdrawing funds", "WITHDRAWALS?"):
+        assert classifier.primary(message) == "withdrawal", message
+    assert _intents(classifier, "rewithdraw") == []
+    assert classifier.primary("Leave a review on Trustpilot") == "dragon_club"
+    assert classifier.primary("reviewed") == "dragon_club"
+
+
+def test_phrases_match_across_whitespace_and_outweigh_single_words():
+    classifier = IntentClassifier(
+        {"generic": ["loss"], "challenge_rules": ["daily loss"]},
+        max_intents=2,
+        secondary_min_ratio=0.5,
+    )
+
+    matches = classifier.classify("What is the daily\n\t loss limit?")
+
+    assert [(match.intent, match.score) for match in matches] == [
+        ("challenge_rules", 2.0),
+        ("generic", 1.0),
+    ]
+    assert matches[0].keywords == ("daily loss",)
+
+
+def test_secondary_intents_need_a_share_of_the_top_score():
+    classifier = IntentClassifier(INTENT_KEYWORDS, max_intents=3, secondary_min_ratio=0.5)
+
+    # Withdrawal scores 3 (payout, bank, usdt); kyc scores 1 and is dropped.
+    assert _intents(classifier, "payout to my bank in usdt after verification") == ["withdrawal"]
+    # Ties keep vocabulary order, not message order.
+    assert _intents(classifier, "kyc before payout") == ["kyc", "withdrawal"]
+    assert _intents(classifier, "payout before kyc") == ["kyc", "withdrawal"]
+    assert len(classifier.classify("kyc payout referral", limit=1)) == 1
+
+
+def test_extend_adds_keywords_without_touching_other_intents():
+    classifier = IntentClassifier(INTENT_KEYWORDS)
+
+    classifier.extend("withdrawal", ["crypto wallet*"])
+    classifier.extend("scaling", ["scal*"])
+
+    assert classifier.primary("send it to my crypto wallets") == "withdrawal"
+    assert classifier.primary("how does scaling work") == "scaling"
+    assert classifier.vocabulary["withdrawal"][-1] == "crypto wallet*"
+    assert classifier.vocabulary["kyc"] == INTENT_KEYWORDS["kyc"]
+
+
+def test_automaton_reports_overlapping_occurrences():
+    automaton = KeywordAutomaton(["he", "she", "hers"])
+
+    found = [
+        (start, end, automaton.keywords[index])
+        for start, end, index in automaton.finditer("ushers")
+    ]
+
+    assert sorted(found) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
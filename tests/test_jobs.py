@@ -0,0 +1,140 @@
+"""IngestionJobStore leases and the background job manager."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app.models.schemas import (
+    DocumentIngestionResult,
+    IngestionDocument,
+    IngestionJob,
+    IngestionResult,
+)
+from app.services import jobs
+from app.services.ingestion import IngestionProgress, ProgressCallback
+from app.services.jobs import IngestionJobManager, IngestionJobStore
+
+
+class FakeClock:
+    """Stands in for ``jobs._now``."""
+
+    def __init__(self) -> None:
+        self.now = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(jobs, "_now", fake)
+    return fake
+
+
+def _documents(count: int) -> List[IngestionDocument]:
+    return [
+        IngestionDocument(
+            id=f"doc-{idx}", title=f"Doc {idx}", content="Payouts are weekly.", domain=["general"]
+        )
+        for idx in range(count)
+    ]
+
+
+def _result(documents: List[IngestionDocument]) -> IngestionResult:
+    return IngestionResult(
+        indexed=len(documents),
+        skipped=0,
+        documents=[
+            DocumentIngestionResult(id=doc.id, status="indexed", chunks_added=1)
+            for doc in documents
+        ],
+    )
+
+
+def test_a_claimed_job_is_held_until_its_lease_expires(tmp_path: Path, clock: FakeClock):
+    store = IngestionJobStore(tmp_path / "jobs.sqlite3")
+    job = store.create(_documents(2))
+
+    assert store.unfinished() == [job.id]
+    assert store.claim(job.id, "worker-a", lease_seconds=60)
+    assert not store.claim(job.id, "worker-b", lease_seconds=60)
+    assert store.unfinished() == []
+
+    clock.advance(45)
+    assert store.renew_lease(job.id, "worker-a", lease_seconds=60)
+    clock.advance(45)
+    assert not store.claim(job.id, "worker-b", lease_seconds=60)
+
+    # worker-a stops renewing: the job is abandoned and worker-b takes it over.
+    clock.advance(30)
+    assert store.unfinished() == [job.id]
+    assert store.claim(job.id, "worker-b", lease_seconds=60)
+    assert not store.renew_lease(job.id, "worker-a", lease_seconds=60)
+    assert store.get(job.id).status == "running"
+
+
+def test_only_the_lease_holder_records_progress_and_the_outcome(tmp_path: Path, clock: FakeClock):
+    store = IngestionJobStore(tmp_path / "jobs.sqlite3")
+    documents = _documents(2)
+    job = store.create(documents)
+    store.claim(job.id, "worker-a", lease_seconds=60)
+    clock.advance(61)
+    store.claim(job.id, "worker-b", lease_seconds=60)
+
+    store.record_progress(
+        job.id, "worker-a", IngestionProgress(documents_done=2, chunks_embedded=9)
+    )
+    store.mark_finished(job.id, "worker-a", None, error="stale worker")
+    store.record_progress(
+        job.id, "worker-b", IngestionProgress(documents_done=1, chunks_embedded=1)
+    )
+    assert store.get(job.id).documents_done == 1
+
+    store.mark_finished(job.id, "worker-b", _result(documents))
+    finished = store.get(job.id)
+    assert finished.status == "completed"
+    assert finished.errors == []
+    assert finished.result.indexed == 2
+    assert store.load_payload(job.id) == []
+    assert store.unfinished() == []
+
+
+class FakePipeline:
+    """Indexes every document and reports progress once."""
+
+    def run(
+        self, documents: List[IngestionDocument], progress: ProgressCallback
+    ) -> IngestionResult:
+        progress(IngestionProgress(documents_done=len(documents), chunks_embedded=len(documents)))
+        return _result(documents)
+
+
+def test_manager_runs_submitted_jobs_off_the_request(tmp_path: Path):
+    store = IngestionJobStore(tmp_path / "jobs.sqlite3")
+    manager = IngestionJobManager(store, pipeline_factory=FakePipeline, lease_seconds=5)
+
+    async def run() -> IngestionJob:
+        job = await manager.submit(_documents(3))
+        assert job.status == "queued"
+        for _ in range(200):
+            job = await manager.get(job.id)
+            if job.status not in {"queued", "running"}:
+                break
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job.status == "completed"
+    assert (job.documents_done, job.chunks_embedded) == (3, 3)
+    assert job.finished_at is not None
@@ -0,0 +1,107 @@
+"""Queued structured logging: correlation ids, JSON output and rate limits."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.main import create_app
+from app.utils import logger as app_logger
+from app.utils.logger import (
+    DEFAULT_RATE_LIMITS,
+    RateLimitFilter,
+    bind_correlation_id,
+    configure_logging,
+    get_correlation_id,
+    parse_rate_limits,
+    reset_correlation_id,
+    stop_logging,
+)
+
+
+class FakeClock:
+    """Stands in for the ``time`` module's ``monotonic``."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(app_logger, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def restore_logging() -> Iterator[None]:
+    yield
+    stop_logging()
+    logging.getLogger().handlers.clear()
+
+
+def _record(name: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "answered", None, None)
+
+
+def test_rate_limit_spec_parsing():
+    assert parse_rate_limits(None) == DEFAULT_RATE_LIMITS
+    assert parse_rate_limits("off") == {}
+    assert parse_rate_limits("app.main=5, app.services = 0.5,broken") == {
+        "app.main": 5.0,
+        "app.services": 0.5,
+    }
+
+
+def test_chatty_loggers_are_sampled_and_report_what_was_dropped(clock: FakeClock):
+    limiter = RateLimitFilter({"app.routers": 2.0})
+
+    passed = [limiter.filter(_record("app.routers.support")) for _ in range(4)]
+    assert passed == [True, True, False, False]
+    # Warnings and other loggers are never sampled.
+    assert limiter.filter(_record("app.routers.support", logging.WARNING))
+    assert limiter.filter(_record("app.routersx"))
+
+    clock.now += 0.5
+    record = _record("app.routers")
+    assert limiter.filter(record)
+    assert record.suppressed == 2
+    assert not limiter.filter(_record("app.routers"))
+
+
+def test_json_lines_carry_the_correlation_id_and_extras(
+    capsys: pytest.CaptureFixture[str], restore_logging: None
+):
+    configure_logging(level="INFO", log_format="json", rate_limits={})
+    token = bind_correlation_id("req-42")
+    try:
+        assert get_correlation_id() == "req-42"
+        logging.getLogger("app.test").info("answered %s", "c1", extra={"confidence": 0.9})
+    finally:
+        reset_correlation_id(token)
+    logging.getLogger("app.test").info("outside")
+    stop_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(line["message"], line["correlation_id"]) for line in lines] == [
+        ("answered c1", "req-42"),
+        ("outside", "-"),
+    ]
+    assert lines[0]["confidence"] == 0.9
+    assert lines[0]["logger"] == "app.test"
+
+
+def test_requests_echo_or_mint_a_correlation_id(settings: Settings, restore_logging: None):
+    client = TestClient(create_app())
+
+    assert client.get("/health", headers={"X-Request-ID": "abc"}).headers["X-Request-ID"] == "abc"
+    minted = client.get("/health").headers["X-Request-ID"]
+    assert len(minted) == 16 and minted != "abc"
@@ -0,0 +1,166 @@
+"""Session memory rendering and keys."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from app.core.config import Settings
+from app.models.schemas import SupportQuery
+from app.services.memory import (
+    DIGEST_TURNS,
+    HISTORY_TURNS,
+    TRANSCRIPT_TURNS,
+    ConversationMemoryManager,
+    InProcessMemoryBackend,
+    MemoryPersistError,
+    SessionMemory,
+    SQLiteMemoryBackend,
+)
+from benchmarks.memory_footprint import LAYOUTS
+
+
+def _rejoined(session: SessionMemory, turns: int, separator: str) -> str:
+    return separator.join(record.line for record in session.history[-turns:])
+
+
+def test_rolling_transcript_and_digest_match_a_full_rejoin():
+    session = SessionMemory("conversation")
+    messages = ["hi", "multi\nline", "a | b", "", "plain"]
+    for idx in range(HISTORY_TURNS + 5):
+        session.add(
+            "user" if idx % 2 == 0 else "assistant", f"{messages[idx % len(messages)]} {idx}"
+        )
+        assert session.transcript() == _rejoined(session, TRANSCRIPT_TURNS, "\n")
+        assert session.digest() == _rejoined(session, DIGEST_TURNS, " | ")
+    assert session.transcript(2) == _rejoined(session, 2, "\n")
+
+
+def test_restored_session_renders_like_the_original():
+    session = SessionMemory("conversation")
+    for idx in range(9):
+        session.add("user", f"question {idx}")
+
+    restored = SessionMemory.from_json("conversation", session.to_json())
+
+    assert restored.transcript() == session.transcript()
+    assert restored.digest() == session.digest()
+    assert restored.user_turns == 9
+
+
+def test_benchmark_layouts_read_alike(settings: Settings):
+    managers = [ConversationMemoryManager(backend()) for backend in LAYOUTS.values()]
+    for idx in range(HISTORY_TURNS + 3):
+        reads = set()
+        for manager in managers:
+            manager.append("c1", "user" if idx % 3 else "assistant", f"turn {idx}")
+            reads.add(
+                (
+                    manager.get_recent_transcript("c1"),
+                    manager.get_session_summary("c1"),
+                    manager.get_latest_turn("c1"),
+                )
+            )
+        assert len(reads) == 1
+
+
+def test_memory_key_is_scoped_to_the_user():
+    def key(conversation_id: str, user_id: Optional[str]) -> str:
+        return SupportQuery(
+            message="hi", conversation_id=conversation_id, user_id=user_id
+        ).memory_key
+
+    assert key("c1", "alice") == key("c1", "alice")
+    assert key("c1", "alice") != key("c1", "mallory")
+    assert key("c1", "alice") != key("c1", None)
+    # A separator inside either id cannot make two owners collide.
+    assert key("b:c", "a") != key("c", "a:b")
+
+
+def test_workers_sharing_a_sqlite_file_keep_each_others_turns(tmp_path: Path):
+    path = tmp_path / "memory.sqlite3"
+    seed = SQLiteMemoryBackend(path)
+    seed.update("c1", lambda session: session.add("user", "hello"))
+    seed.close()
+    # Two workers read the same stored session, then both add a turn to it.
+    first, second = SQLiteMemoryBackend(path), SQLiteMemoryBackend(path)
+    assert first.get("c1").user_turns == second.get("c1").user_turns == 1
+    first.update("c1", lambda session: session.add("user", "from first"))
+    second.update("c1", lambda session: session.add("user", "from second"))
+    first.close()
+    second.close()
+
+    reader = SQLiteMemoryBackend(path)
+    try:
+        contents = [record.content for record in reader.get("c1").history]
+    finally:
+        reader.close()
+    assert sorted(contents) == ["from first", "from second", "hello"]
+
+
+class FlakyCloseBackend(SQLiteMemoryBackend):
+    """Fails the first ``failures`` flushes after ``close`` with a real sqlite3 error."""
+
+    close_retry_delay_seconds = 0.0
+
+    def __init__(self, path: Path, failures: int) -> None:
+        super().__init__(path, flush_interval_seconds=60.0)
+        self.failures = failures
+
+    def _flush(self, conn: sqlite3.Connection) -> bool:
+        if self._stopping and self.failures:
+            self.failures -= 1
+            broken = sqlite3.connect(":memory:")
+            broken.close()
+            return super()._flush(broken)
+        return super()._flush(conn)
+
+
+def test_close_retries_a_failed_final_flush(tmp_path: Path):
+    path = tmp_path / "memory.sqlite3"
+    backend = FlakyCloseBackend(path, failures=SQLiteMemoryBackend.close_flush_attempts - 1)
+    backend.update("c1", lambda session: session.add("user", "hello"))
+
+    backend.close()
+
+    reader = SQLiteMemoryBackend(path)
+    try:
+        assert reader.get("c1").user_turns == 1
+    finally:
+        reader.close()
+
+
+def test_close_reports_sessions_it_could_not_persist(tmp_path: Path):
+    backend = FlakyCloseBackend(tmp_path / "memory.sqlite3", failures=100)
+    backend.update("c1", lambda session: session.add("user", "hello"))
+    backend.update("c2", lambda session: session.add("user", "hi"))
+
+    with pytest.raises(MemoryPersistError) as error:
+        backend.close()
+
+    assert error.value.unpersisted == 2
+    assert backend.failures == 100 - SQLiteMemoryBackend.close_flush_attempts
+
+
+def test_request_scope_reads_each_session_once():
+    class CountingBackend(InProcessMemoryBackend):
+        reads = 0
+
+        def get(self, conversation_id: str) -> Optional[SessionMemory]:
+            self.reads += 1
+            return super().get(conversation_id)
+
+    backend = CountingBackend()
+    memory = ConversationMemoryManager(backend)
+    with memory.request_scope():
+        assert memory.get_user_turn_count("c1") == 0
+        memory.append("c1", "user", "hi")
+        assert memory.get_user_turn_count("c1") == 1
+        assert memory.get_recent_transcript("c1") == "user: hi"
+    assert backend.reads == 1
+
+    memory.get_user_turn_count("c1")
+    assert backend.reads == 2
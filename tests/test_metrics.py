@@ -0,0 +1,97 @@
+"""Prometheus exposition of the service metrics and the per-node timings."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.main import create_app
+from app.services.metrics import (
+    CONTENT_TYPE,
+    Counter,
+    Histogram,
+    ServiceMetrics,
+    _Metric,
+    get_metrics,
+)
+from app.workflows.dragon_funded_graph import DragonState, timed_node
+
+
+@pytest.fixture
+def metrics() -> Iterator[ServiceMetrics]:
+    get_metrics.cache_clear()
+    yield get_metrics()
+    get_metrics.cache_clear()
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ["node"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, node="retrieve")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{node="retrieve",le="0.1"} 1',
+        'latency_seconds_bucket{node="retrieve",le="1"} 3',
+        'latency_seconds_bucket{node="retrieve",le="+Inf"} 4',
+        'latency_seconds_sum{node="retrieve"} 4.25',
+        'latency_seconds_count{node="retrieve"} 4',
+    ]
+
+
+def test_counter_escapes_label_values_and_checks_label_names():
+    counter = Counter("errors_total", "Errors.", ["node"])
+    counter.inc(node='say "hi"\n')
+    counter.inc(2, node='say "hi"\n')
+
+    assert counter.render()[-1] == 'errors_total{node="say \\"hi\\"\\n"} 3'
+    with pytest.raises(ValueError):
+        counter.inc(route="/x")
+
+
+def test_metric_kinds_must_render_their_samples():
+    class Gauge(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Gauge("dragon_sessions", "Live sessions.")
+
+
+def test_timed_node_exports_durations_and_errors(metrics: ServiceMetrics):
+    async def classify(state: DragonState) -> DragonState:
+        state["intent"] = "kyc"
+        return state
+
+    async def broken(state: DragonState) -> DragonState:
+        raise RuntimeError("node failed")
+
+    state = asyncio.run(timed_node("classify_intent", classify)({}))
+    with pytest.raises(RuntimeError):
+        asyncio.run(timed_node("compose_response", broken)({}))
+
+    assert state["intent"] == "kyc"
+    assert set(state["node_timings"]) == {"classify_intent"}
+    exposition = metrics.render()
+    assert 'dragon_workflow_node_duration_seconds_count{node="classify_intent"} 1' in exposition
+    assert 'dragon_workflow_node_duration_seconds_count{node="compose_response"} 1' in exposition
+    assert 'dragon_workflow_node_errors_total{node="compose_response"} 1' in exposition
+
+
+def test_metrics_endpoint_reports_request_latency_by_route(
+    settings: Settings, metrics: ServiceMetrics
+):
+    client = TestClient(create_app())
+
+    assert client.get("/health").status_code == 200
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"] == CONTENT_TYPE
+    assert (
+        'dragon_http_request_duration_seconds_count{method="GET",route="/health",status="200"} 1'
+        in response.text
+    )
@@ -0,0 +1,91 @@
+"""ModelRouter model choice per call class and cross-model fallback."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Optional, Tuple
+
+from app.services.llm import CallClass, FallbackReply, ModelRouter, RouteHints
+from app.services.rate_limit import Priority
+from benchmarks.fakes import FakeGeminiClient
+
+
+class FailingGemini(FakeGeminiClient):
+    """Answers every call with the client's apology text."""
+
+    async def agenerate(self, prompt: str, max_output_tokens: int = 300, **kwargs: Any) -> str:
+        return FallbackReply("I'm sorry, something went wrong.")
+
+
+def _router(answer: FakeGeminiClient, light: FakeGeminiClient, **kwargs: Any) -> ModelRouter:
+    return ModelRouter(
+        answer, light, light_intents=["referral"], light_min_confidence=0.75, **kwargs
+    )
+
+
+def _models(
+    router: ModelRouter, call_class: CallClass, prompt: str, hints: Optional[RouteHints] = None
+) -> Tuple[str, Optional[str]]:
+    primary, secondary = router.route(call_class, prompt, hints)
+    return primary.model_name, secondary.model_name if secondary else None
+
+
+def test_background_calls_and_simple_answers_use_the_light_model():
+    router = _router(FakeGeminiClient("pro"), FakeGeminiClient("lite"), light_max_prompt_tokens=100)
+    simple = RouteHints(intent="referral", confidence=0.9)
+
+    assert _models(router, CallClass.SUMMARY, "summarize") == ("lite", "pro")
+    assert _models(router, CallClass.CLASSIFICATION, "classify") == ("lite", "pro")
+    assert _models(router, CallClass.ANSWER, "short", simple) == ("lite", "pro")
+    assert _models(router, CallClass.ANSWER, "short") == ("pro", "lite")
+    assert _models(router, CallClass.ANSWER, "short", RouteHints(intent="kyc", confidence=0.9)) == (
+        "pro",
+        "lite",
+    )
+    assert _models(
+        router, CallClass.ANSWER, "short", RouteHints(intent="referral", confidence=0.5)
+    ) == (
+        "pro",
+        "lite",
+    )
+    assert _models(router, CallClass.ANSWER, "long " * 200, simple) == ("pro", "lite")
+    assert router.stats["routes"]["answer"] == {"lite": 1, "pro": 4}
+
+
+def test_one_model_has_nothing_to_fall_back_to():
+    router = ModelRouter(FakeGeminiClient("pro"))
+
+    assert _models(router, CallClass.SUMMARY, "summarize") == ("pro", None)
+
+
+def test_a_failed_answer_is_retried_on_the_other_model():
+    router = _router(FailingGemini("pro"), FakeGeminiClient("lite", latency_seconds=0.0))
+
+    reply = asyncio.run(router.agenerate("What is the drawdown?"))
+
+    assert not isinstance(reply, FallbackReply)
+    assert router.stats["failovers"] == 1
+    assert router.stats["hedge_wins"] == 1
+
+
+def test_a_slow_answer_is_hedged_onto_the_other_model():
+    slow = FakeGeminiClient("pro", latency_seconds=5.0)
+    router = _router(
+        slow, FakeGeminiClient("lite", latency_seconds=0.0), fallback_after_seconds=0.05
+    )
+
+    reply = asyncio.run(asyncio.wait_for(router.agenerate("What is the drawdown?"), timeout=2.0))
+
+    assert reply
+    assert (router.stats["hedges"], router.stats["hedge_wins"]) == (1, 1)
+
+
+def test_background_calls_are_not_failed_over():
+    router = _router(FakeGeminiClient("pro"), FailingGemini("lite"))
+
+    reply = asyncio.run(
+        router.agenerate("summarize", call_class=CallClass.SUMMARY, priority=Priority.SUMMARY)
+    )
+
+    assert isinstance(reply, FallbackReply)
+    assert router.stats["failovers"] == 0
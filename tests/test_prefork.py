@@ -0,0 +1,68 @@
+"""Pre-fork preload in the master and the state reset in forked workers."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core import prefork
+from app.core.config import Settings
+from app.core.startup import get_startup_profile
+from app.routers import support
+from app.services.transport import get_gemini_transport
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_preload_shares_state_without_opening_threads(tmp_path: Path):
+    script = (
+        "import gc, threading\n"
+        "from app.core import prefork\n"
+        "from app.core.startup import get_startup_profile\n"
+        "prefork.preload()\n"
+        "prefork.preload()\n"
+        "print(threading.active_count(), gc.get_freeze_count() > 0, "
+        "sorted(get_startup_profile().snapshot()['phases_ms']))\n"
+    )
+    env = dict(
+        os.environ, GEMINI_API_KEY="test-key", VECTOR_STORE_PATH=str(tmp_path / "vector_store")
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip().splitlines()[-1] == (
+        "1 True ['preload_imports', 'preload_indexes', 'preload_vector_store']"
+    )
+
+
+def test_forked_workers_forget_the_masters_connections(
+    settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    for name in ("get_kb", "get_orchestrator", "get_job_manager"):
+        factory = support._singleton(object)  # pylint: disable=protected-access
+        monkeypatch.setattr(support, name, factory)
+        factory()
+    master_transport = get_gemini_transport()
+    profile = get_startup_profile()
+    profile.mark_ready()
+
+    prefork._after_fork()  # pylint: disable=protected-access
+
+    assert get_gemini_transport() is not master_transport
+    for factory in (support.get_kb, support.get_orchestrator, support.get_job_manager):
+        assert factory.cache_info().currsize == 0
+    assert profile.snapshot()["status"] == "starting"
+    get_gemini_transport().close()
+    master_transport.close()
+    get_gemini_transport.cache_clear()
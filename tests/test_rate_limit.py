@@ -0,0 +1,136 @@
+"""GeminiRateLimiter priority admission and interactive reserve, on a fake clock."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+from app.services import rate_limit
+from app.services.rate_limit import GeminiRateLimiter, Priority, RateLimitTimeout
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; ``sleep`` advances the clock instead of blocking."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+def _drain_requests(limiter: GeminiRateLimiter) -> None:
+    while limiter.try_acquire(1, Priority.INTERACTIVE):
+        pass
+
+
+def test_background_classes_leave_the_interactive_reserve(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=10, tpm=0, interactive_reserve=0.2)
+
+    admitted = 0
+    while limiter.try_acquire(1, Priority.INGESTION):
+        admitted += 1
+
+    assert admitted == 8
+    assert not limiter.try_acquire(1, Priority.SUMMARY)
+    assert limiter.try_acquire(1, Priority.INTERACTIVE)
+    assert limiter.try_acquire(1, Priority.INTERACTIVE)
+    assert not limiter.try_acquire(1, Priority.INTERACTIVE)
+    assert limiter.stats["admitted"] == {"interactive": 2, "summary": 0, "ingestion": 8}
+
+
+def test_background_request_waits_for_refill_above_the_reserve(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=60, tpm=0, interactive_reserve=0.5)
+    _drain_requests(limiter)
+    started = clock.now
+
+    limiter.acquire_sync(1, Priority.SUMMARY, deadline=clock.now + 120)
+
+    # One request per second refills; the summary needs 30 reserved plus its own.
+    assert clock.now - started == pytest.approx(31.0)
+
+
+def test_token_reserve_applies_to_background_classes(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=0, tpm=1000, interactive_reserve=0.2)
+
+    assert limiter.try_acquire(700, Priority.INGESTION)
+    assert not limiter.try_acquire(200, Priority.INGESTION)
+    assert limiter.try_acquire(200, Priority.INTERACTIVE)
+    # Reporting the real usage returns the unused reservation.
+    limiter.settle(reserved=700, actual=100)
+    assert limiter.stats["tokens_available"] == 700
+
+
+def test_oversized_background_request_leaves_the_reserve(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=0, tpm=1000, interactive_reserve=0.2)
+
+    assert limiter.try_acquire(5000, Priority.SUMMARY)
+
+    assert limiter.stats["tokens_available"] == 200
+    assert not limiter.try_acquire(1, Priority.INGESTION)
+    assert limiter.try_acquire(200, Priority.INTERACTIVE)
+
+
+def test_waiters_are_admitted_by_priority_then_arrival(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=60, tpm=0, interactive_reserve=0.0)
+    _drain_requests(limiter)
+    admitted: List[str] = []
+
+    async def request(name: str, priority: Priority) -> None:
+        await limiter.acquire(1, priority, deadline=clock.now + 600)
+        admitted.append(name)
+
+    async def run() -> None:
+        arrivals = [
+            ("ingestion", Priority.INGESTION),
+            ("summary-1", Priority.SUMMARY),
+            ("interactive-1", Priority.INTERACTIVE),
+            ("summary-2", Priority.SUMMARY),
+            ("interactive-2", Priority.INTERACTIVE),
+        ]
+        tasks = []
+        for name, priority in arrivals:
+            tasks.append(asyncio.create_task(request(name, priority)))
+            await asyncio.sleep(0)
+        while len(admitted) < len(arrivals):
+            # Refill exactly one request, then give every waiter a chance to poll.
+            clock.now += 1.0
+            await asyncio.sleep(rate_limit._POLL_SECONDS * 1.5)  # pylint: disable=protected-access
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert admitted == ["interactive-1", "interactive-2", "summary-1", "summary-2", "ingestion"]
+
+
+def test_request_not_admitted_before_its_deadline_times_out(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=60, tpm=0)
+    _drain_requests(limiter)
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire_sync(1, Priority.INTERACTIVE, deadline=clock.now + 0.5)
+
+    assert limiter.stats["timeouts"] == 1
+    assert limiter.stats["waiting"] == 0
+
+
+def test_throttle_holds_back_every_class(clock: FakeClock):
+    limiter = GeminiRateLimiter("test", rpm=100, tpm=0)
+
+    limiter.throttle(5.0)
+
+    assert not limiter.try_acquire(1, Priority.INTERACTIVE)
+    clock.now += 5.0
+    assert limiter.try_acquire(1, Priority.INTERACTIVE)
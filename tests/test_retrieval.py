@@ -0,0 +1,180 @@
+"""DragonKnowledgeBase incremental ingestion and content-hashed chunks."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import pytest
+
+from app.core.config import Settings, get_settings
+from app.models.schemas import IngestionDocument
+from app.services.retrieval import (
+    DragonKnowledgeBase,
+    load_sample_knowledge,
+    split_document,
+    tag_flags,
+)
+from benchmarks.fakes import HashingEmbeddings
+
+
+def _document(content: str, tags: Sequence[str] = ("withdrawal",)) -> IngestionDocument:
+    return IngestionDocument(
+        id="payouts", title="Payouts", content=content, domain=["general"], tags=list(tags)
+    )
+
+
+_SECTIONS = [
+    f"## Section {idx}\nPayout rule {idx}: requests are reviewed within {idx + 1} business days. "
+    * 7
+    for idx in range(4)
+]
+_WEEKLY = "## Section 3\n" + "Payouts are weekly once the first payout is approved. " * 8
+
+
+def test_chunk_ids_follow_content_and_metadata():
+    original = split_document(_document("\n".join(_SECTIONS)))
+    edited = split_document(_document("\n".join(_SECTIONS[:3] + [_WEEKLY])))
+
+    assert [chunk.id for chunk in split_document(_document("\n".join(_SECTIONS)))] == [
+        chunk.id for chunk in original
+    ]
+    # Chunks whose text survived the edit keep their ids; the others get new ones.
+    same_text = {chunk.text for chunk in original} & {chunk.text for chunk in edited}
+    assert same_text
+    assert {chunk.id for chunk in original} & {chunk.id for chunk in edited} == {
+        chunk.id for chunk in original if chunk.text in same_text
+    }
+    # Metadata is part of the fingerprint, so retagging a document changes every id.
+    retagged = split_document(_document("\n".join(_SECTIONS), tags=("kyc",)))
+    assert not {chunk.id for chunk in original} & {chunk.id for chunk in retagged}
+
+
+def test_reingesting_unchanged_content_is_a_no_op(settings: Settings):
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    first = kb.ingest([_document("\n".join(_SECTIONS))])
+    revision = kb.revision
+
+    second = kb.ingest([_document("\n".join(_SECTIONS))])
+
+    assert first.added > 1 and first.removed == 0
+    assert (second.added, second.removed, second.unchanged) == (0, 0, first.added)
+    assert kb.revision == revision
+
+
+def test_an_edited_document_replaces_only_its_changed_chunks(settings: Settings):
+    original = _document("\n".join(_SECTIONS))
+    changed = _document("\n".join(_SECTIONS[:3] + [_WEEKLY]))
+    before = {chunk.id for chunk in split_document(original)}
+    after = {chunk.id for chunk in split_document(changed)}
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    kb.ingest([original])
+    revision = kb.revision
+
+    edited = kb.ingest([changed])
+
+    assert (edited.added, edited.removed, edited.unchanged) == (
+        len(after - before),
+        len(before - after),
+        len(before & after),
+    )
+    assert kb.revision == revision + 1
+    assert "weekly" in kb.retrieve("are payouts weekly", k=1)[0].content
+
+
+def test_seed_knowledge_syncs_once_across_restarts(settings: Settings):
+    seeds = load_sample_knowledge()
+    first = DragonKnowledgeBase(embedder=HashingEmbeddings()).ingest(seeds)
+
+    restarted = DragonKnowledgeBase(embedder=HashingEmbeddings()).ingest(seeds)
+
+    assert first.added > 0
+    assert (restarted.added, restarted.removed, restarted.unchanged) == (0, 0, first.added)
+
+
+def test_seed_sections_are_tagged_only_with_their_own_topic():
+    seeds = load_sample_knowledge()
+    tagged = [doc for doc in seeds if doc.tags]
+
+    assert len({doc.id for doc in seeds}) == len(seeds) > 1
+    assert tagged and len(tagged) < len(seeds)
+    assert all(doc.tags == ["withdrawal"] and "payout" in doc.title.lower() for doc in tagged)
+
+
+def _tagged(doc_id: str, content: str, tags: Sequence[str]) -> IngestionDocument:
+    return IngestionDocument(
+        id=doc_id, title=doc_id, content=content, domain=["general"], tags=list(tags)
+    )
+
+
+_TAGGED = [
+    _tagged("kyc-id", "Verification needs a passport or national identity card.", ["KYC"]),
+    _tagged(
+        "kyc-address",
+        "Verification of address needs a utility bill from the last 90 days.",
+        ["kyc"],
+    ),
+    _tagged(
+        "payout-days",
+        "Payout verification takes two business days after a request.",
+        ["withdrawal"],
+    ),
+    _tagged(
+        "payout-split",
+        "The payout split is 80 percent after verification.",
+        ["withdrawal", "Profit Split"],
+    ),
+]
+
+
+def test_tag_flags_are_normalized_metadata_keys():
+    assert tag_flags(["KYC", "Profit Split", ""]) == {"tag_kyc": True, "tag_profit_split": True}
+
+
+@pytest.mark.parametrize("mode", ["hybrid", "dense"])
+def test_tagged_retrieval_searches_only_matching_chunks(
+    mode: str, settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("RETRIEVAL_MODE", mode)
+    get_settings.cache_clear()
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    kb.ingest(_TAGGED)
+
+    kyc = kb.retrieve("what does payout verification need", k=4, tags=["kyc"])
+    either = kb.retrieve("what does payout verification need", k=4, tags=["kyc", "profit split"])
+
+    assert {doc.id for doc in kyc} == {"kyc-id", "kyc-address"}
+    assert {doc.id for doc in either} == {"kyc-id", "kyc-address", "payout-split"}
+
+
+def test_too_few_tagged_matches_are_filled_from_everything(settings: Settings):
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    kb.ingest(_TAGGED)
+
+    docs = kb.retrieve("payout split percentage", k=3, tags=["profit split"])
+
+    assert docs[0].id == "payout-split"
+    assert len(docs) == 3
+    assert len({(doc.id, doc.chunk_index) for doc in docs}) == 3
+
+
+def test_only_filters_selecting_some_chunks_narrow(settings: Settings):
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    kb.ingest(_TAGGED)
+
+    assert kb.narrows(["kyc"])
+    assert not kb.narrows(["kyc", "withdrawal"])
+    assert not kb.narrows(["dragon_club"])
+
+
+def test_removed_documents_are_gone_after_a_restart(settings: Settings):
+    kb = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    kb.ingest(_TAGGED)
+    revision = kb.revision
+
+    removed = kb.remove_documents(["kyc-id", "unknown"])
+
+    restarted = DragonKnowledgeBase(embedder=HashingEmbeddings())
+    assert removed == 1
+    assert restarted.revision == revision + 1
+    assert "kyc-id" not in {doc.id for doc in restarted.retrieve("passport identity card", k=4)}
+    assert restarted.remove_documents(["kyc-id"]) == 0
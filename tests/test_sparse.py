@@ -0,0 +1,119 @@
+"""BM25Index scoring, flag filtering and persistence."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from app.services.sparse import BM25Index, tokenize
+
+
+def _index() -> BM25Index:
+    index = BM25Index()
+    index.add(
+        "drawdown",
+        "The maximum drawdown is ten percent of the balance.",
+        {"tag_challenge_rules": True},
+    )
+    index.add(
+        "payout",
+        "Payout requests are processed within two business days.",
+        {"tag_withdrawal": True},
+    )
+    index.add(
+        "daily",
+        "The daily loss limit resets at midnight server time.",
+        {"tag_challenge_rules": True},
+    )
+    index.add(
+        "kyc", "Identity verification needs a passport.", {"tag_kyc": True, "tag_withdrawal": False}
+    )
+    return index
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is the Max-Drawdown, for Phase 2?") == ["max", "drawdown", "phase", "2"]
+
+
+def test_search_ranks_by_bm25_relative_to_the_query_ceiling():
+    index = _index()
+
+    results = index.search("maximum drawdown")
+
+    assert [chunk.id for chunk, _ in results] == ["drawdown"]
+    chunk, score = results[0]
+    # Both terms occur once in the same chunk, so their shared idf cancels against the
+    # ceiling (every term with saturated frequency), leaving the length normalization.
+    k1, b = 1.5, 0.75
+    avg_length = sum(index.get(cid).length for cid in ("drawdown", "payout", "daily", "kyc")) / 4
+    norm = k1 * (1.0 - b + b * chunk.length / avg_length)
+    assert math.isclose(score, 1.0 / (1.0 + norm))
+    assert 0.0 < score < 1.0
+
+
+def test_unknown_terms_lower_the_score_of_partial_matches():
+    index = _index()
+
+    full = index.search("drawdown")[0][1]
+    partial = index.search("drawdown zebra")[0][1]
+
+    assert partial < full
+
+
+def test_flags_restrict_results_to_chunks_with_any_flag_set():
+    index = _index()
+
+    assert {
+        chunk.id for chunk, _ in index.search("limit drawdown", flags=["tag_challenge_rules"])
+    } == {
+        "drawdown",
+        "daily",
+    }
+    assert index.search("drawdown", flags=["tag_withdrawal"]) == []
+    # Only metadata set to True counts as a flag.
+    assert index.search("passport", flags=["tag_withdrawal"]) == []
+    assert [
+        chunk.id for chunk, _ in index.search("passport", flags=["tag_kyc", "tag_withdrawal"])
+    ] == ["kyc"]
+    assert index.search("drawdown", flags=["unknown"]) == []
+    assert index.count(["tag_challenge_rules", "tag_kyc"]) == 3
+    assert index.count(["tag_withdrawal", "unknown"]) == 1
+    assert index.count(["unknown"]) == 0
+
+
+def test_updates_and_removals_keep_postings_and_flags_consistent():
+    index = _index()
+
+    index.update_metadata("drawdown", {"tag_withdrawal": True})
+    assert index.search("drawdown", flags=["tag_challenge_rules"]) == []
+    assert [chunk.id for chunk, _ in index.search("drawdown", flags=["tag_withdrawal"])] == [
+        "drawdown"
+    ]
+
+    index.add("payout", "Payouts arrive in USDT.", {"tag_withdrawal": True})
+    assert index.search("business days") == []
+    index.remove(["drawdown", "missing"])
+    assert len(index) == 3
+    assert index.search("drawdown") == []
+
+
+def test_saved_index_loads_with_identical_scores(tmp_path: Path):
+    index = _index()
+    path = tmp_path / "bm25.json"
+
+    index.save(path)
+    loaded = BM25Index.load(path)
+
+    query = "daily drawdown limit"
+    assert [(chunk.id, score) for chunk, score in loaded.search(query)] == [
+        (chunk.id, score) for chunk, score in index.search(query)
+    ]
+    assert [chunk.id for chunk, _ in loaded.search("passport", flags=["tag_kyc"])] == ["kyc"]
+
+
+def test_unreadable_file_loads_as_an_empty_index(tmp_path: Path):
+    path = tmp_path / "bm25.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert len(BM25Index.load(path)) == 0
+    assert len(BM25Index.load(tmp_path / "missing.json")) == 0
@@ -0,0 +1,114 @@
+"""Deferred imports, lifespan warm-up and the readiness probe."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.core.startup import StartupProfile, get_startup_profile
+from app.main import create_app
+from app.routers import support
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = (
+    "chromadb",
+    "google.generativeai",
+    "langchain_chroma",
+    "langchain_core",
+    "langchain_google_genai",
+    "langgraph",
+)
+
+
+def test_importing_the_api_defers_the_workflow_stack():
+    script = (
+        "import sys, app.main; "
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    )
+    env = dict(os.environ, GEMINI_API_KEY="test-key")
+
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == ""
+
+
+def test_profile_reports_phases_and_time_to_ready():
+    profile = StartupProfile(started=time.perf_counter())
+    with profile.phase("init_knowledge_base"):
+        pass
+    profile.mark_ready()
+
+    snapshot = profile.snapshot()
+    assert snapshot["status"] == "ready"
+    assert set(snapshot["phases_ms"]) == {"init_knowledge_base"}
+    assert snapshot["ready_after_ms"] >= 0
+
+
+@pytest.fixture
+def lifespan(settings: Settings, monkeypatch: pytest.MonkeyPatch) -> Iterator[Callable[..., None]]:
+    """Replace the warm-up with ``body`` and run the app's lifespan with a fresh profile."""
+
+    def install(body: Callable[[StartupProfile], None]) -> None:
+        monkeypatch.setattr(support, "warm_up", body)
+
+    get_startup_profile.cache_clear()
+    yield install
+    get_startup_profile.cache_clear()
+    support.get_job_manager.cache_clear()
+
+
+def _wait_ready(client: TestClient) -> Dict[str, Any]:
+    for _ in range(200):
+        response = client.get("/ready")
+        if response.status_code == 200 or response.json()["status"] == "failed":
+            return response.json()
+        time.sleep(0.01)
+    raise AssertionError("warm-up did not finish")
+
+
+def test_server_answers_liveness_while_warming_up(lifespan: Callable[..., None]):
+    release = threading.Event()
+
+    def warm_up(profile: StartupProfile) -> None:
+        with profile.phase("init_knowledge_base"):
+            release.wait(5)
+
+    lifespan(warm_up)
+    with TestClient(create_app()) as client:
+        assert client.get("/health").status_code == 200
+        warming = client.get("/ready")
+        assert (warming.status_code, warming.json()["status"]) == (503, "warming")
+
+        release.set()
+        ready = _wait_ready(client)
+
+    assert ready["status"] == "ready"
+    assert set(ready["phases_ms"]) == {"init_knowledge_base", "resume_jobs"}
+
+
+def test_failed_warm_up_keeps_the_server_not_ready(lifespan: Callable[..., None]):
+    def warm_up(profile: StartupProfile) -> None:
+        raise RuntimeError("vector store unavailable")
+
+    lifespan(warm_up)
+    with TestClient(create_app()) as client:
+        failed = _wait_ready(client)
+        assert client.get("/ready").status_code == 503
+
+    assert failed["error"] == "RuntimeError: vector store unavailable"
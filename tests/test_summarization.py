@@ -0,0 +1,123 @@
+"""Background summaries: the policy, the bounded queue and the workflow hook."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+from app.core.config import Settings
+from app.models.schemas import SupportQuery
+from app.services.llm import CallClass, FallbackReply
+from app.services.memory import ConversationMemoryManager, InProcessMemoryBackend
+from app.services.rate_limit import Priority
+from app.services.summarization import BackgroundSummarizer, SummaryPolicy
+from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+
+
+class GatedLLM:
+    """Summarizes only once ``gate`` is set, recording the arguments of each call."""
+
+    def __init__(self) -> None:
+        self.gate = asyncio.Event()
+        self.calls: List[Dict[str, Any]] = []
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        self.calls.append(kwargs)
+        await self.gate.wait()
+        return f" summary of {prompt.count(chr(10))} lines "
+
+
+def _memory(settings: Settings) -> ConversationMemoryManager:
+    memory = ConversationMemoryManager(InProcessMemoryBackend())
+    for role, content in [("user", "hi"), ("assistant", "hello"), ("user", "payout?")]:
+        memory.append("c1", role, content)
+    return memory
+
+
+def test_policy_skips_empty_short_and_off_cycle_conversations():
+    policy = SummaryPolicy(every_n_turns=2, min_transcript_chars=10)
+
+    assert not policy.should_summarize(2, "")
+    assert not policy.should_summarize(0, "user: a long enough line")
+    assert not policy.should_summarize(2, "user: hi")
+    assert not policy.should_summarize(3, "user: a long enough line")
+    assert policy.should_summarize(4, "user: a long enough line")
+
+
+def test_submit_returns_before_the_summary_is_written(settings: Settings):
+    memory = _memory(settings)
+    llm = GatedLLM()
+    summarizer = BackgroundSummarizer(llm, memory, workers=1)
+
+    async def run() -> None:
+        assert summarizer.submit("c1")
+        # A second turn while the first job waits does not queue it again.
+        assert summarizer.submit("c1")
+        await asyncio.sleep(0)
+        assert memory.get_session_summary("c1") != "summary of 3 lines"
+        llm.gate.set()
+        await summarizer.drain()
+        await summarizer.stop()
+
+    asyncio.run(run())
+
+    assert memory.get_session_summary("c1") == "summary of 3 lines"
+    assert llm.calls == [
+        {
+            "call_class": CallClass.SUMMARY,
+            "temperature": 0.3,
+            "max_output_tokens": 120,
+            "priority": Priority.SUMMARY,
+        }
+    ]
+
+
+def test_a_full_queue_drops_the_job(settings: Settings):
+    memory = _memory(settings)
+    memory.append("c2", "user", "kyc?")
+    memory.append("c3", "user", "drawdown?")
+    llm = GatedLLM()
+    summarizer = BackgroundSummarizer(llm, memory, max_queue_size=1, workers=1)
+
+    async def run() -> List[bool]:
+        accepted = [summarizer.submit("c1")]
+        await asyncio.sleep(0)  # the worker takes c1 off the queue
+        accepted += [summarizer.submit("c2"), summarizer.submit("c3")]
+        llm.gate.set()
+        await summarizer.stop()
+        return accepted
+
+    assert asyncio.run(run()) == [True, True, False]
+    assert len(llm.calls) == 2
+
+
+def test_a_fallback_reply_keeps_the_previous_summary(settings: Settings):
+    memory = _memory(settings)
+    memory.update_summary("c1", "User asked about payouts.")
+
+    class FailingLLM:
+        async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+            return FallbackReply(
+                "I'm sorry, I'm unable to retrieve the requested information right now."
+            )
+
+    summarizer = BackgroundSummarizer(FailingLLM(), memory, workers=1)
+
+    async def run() -> None:
+        assert summarizer.submit("c1")
+        await summarizer.stop()
+
+    asyncio.run(run())
+
+    assert memory.get_session_summary("c1") == "User asked about payouts."
+
+
+def test_only_follow_up_turns_queue_a_summary(orchestrator: DragonFundedOrchestrator):
+    first = orchestrator.run(SupportQuery(message="How do I pass KYC?", conversation_id="c1"))
+    second = orchestrator.run(SupportQuery(message="And the payout?", conversation_id="c1"))
+
+    assert "Queued conversation summary refresh." not in first.workflow_steps
+    assert "Queued conversation summary refresh." in second.workflow_steps
+    key = SupportQuery(message="", conversation_id="c1").memory_key
+    # The fake Gemini's reply, not the digest of the turns.
+    assert orchestrator.memory.get_session_summary(key).startswith("Your account")
@@ -0,0 +1,74 @@
+"""Support API endpoints over a seeded fake workflow."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.routers import support
+from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+
+
+@pytest.fixture
+def client(orchestrator: DragonFundedOrchestrator) -> Iterator[TestClient]:
+    """Client for an app whose routes use ``orchestrator``; the lifespan warm-up is not run."""
+    app = create_app()
+    app.dependency_overrides[support.get_orchestrator] = lambda: orchestrator
+    yield TestClient(app)
+
+
+def test_query_endpoint_answers_and_continues_the_conversation(client: TestClient):
+    first = client.post(
+        "/api/v1/support/query", json={"query": "How do I pass KYC?", "user_id": "u1"}
+    )
+    assert first.status_code == 200
+    body = first.json()
+    assert body["reply"]
+    assert body["node_timings_ms"] is None
+
+    second = client.post(
+        "/api/v1/support/query",
+        json={
+            "query": "And the payout?",
+            "conversation_id": body["conversation_id"],
+            "user_id": "u1",
+        },
+        headers={"X-Debug-Timings": "1"},
+    )
+    assert second.status_code == 200
+    assert second.json()["conversation_id"] == body["conversation_id"]
+    assert "compose_response" in second.json()["node_timings_ms"]
+
+
+def test_query_endpoint_rejects_blank_messages(client: TestClient):
+    response = client.post("/api/v1/support/query", json={"query": "   "})
+
+    assert response.status_code == 400
+
+
+def _events(body: str) -> List[Tuple[str, Dict[str, Any]]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event, data = frame.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_stream_endpoint_sends_tokens_then_the_full_response(client: TestClient):
+    with client.stream(
+        "POST", "/api/v1/support/query/stream", json={"query": "What is the drawdown?"}
+    ) as reply:
+        assert reply.headers["content-type"].startswith("text/event-stream")
+        events = _events(reply.read().decode("utf-8"))
+
+    names = [name for name, _ in events]
+    assert names[-1] == "complete"
+    assert set(names[:-1]) == {"token"}
+    complete = events[-1][1]
+    assert "".join(data["text"] for _, data in events[:-1]).strip() == complete["reply"]
+    assert complete["node_timings_ms"] is None
+    assert complete["sources"]
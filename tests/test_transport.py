@@ -0,0 +1,244 @@
+"""GeminiClient over the pooled gRPC transport, against an in-process fake Gemini server."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent import futures
+from typing import Iterator, List, Set
+
+import grpc
+import pytest
+from google.ai import generativelanguage_v1beta as glm
+
+from app.core.config import Settings, get_settings
+from app.services.hedging import HedgeBudget, HedgePolicy
+from app.services.llm import GeminiClient
+from app.services.rate_limit import GeminiRateLimiter, get_embedding_limiter
+from app.services.retrieval import DragonKnowledgeBase
+from app.services.transport import GeminiTransport, bind_client, get_gemini_transport
+
+SERVICE = "google.ai.generativelanguage.v1beta.GenerativeService"
+API_KEY = "test-key"
+
+
+class FakeGemini:
+    """Answers GenerateContent, StreamGenerateContent and BatchEmbedContents, recording who called.
+
+    Each request first sleeps for the next entry of ``delays``, if any.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.peers: Set[str] = set()
+        self.api_keys: List[str] = []
+        self.delays: List[float] = []
+        self.requests = 0
+        self.endpoint = ""
+
+    def _record(self, context: grpc.ServicerContext) -> None:
+        with self.lock:
+            self.requests += 1
+            self.peers.add(context.peer())
+            metadata = context.invocation_metadata()
+            self.api_keys.extend(value for key, value in metadata if key == "x-goog-api-key")
+            delay = self.delays.pop(0) if self.delays else 0.0
+        time.sleep(delay)
+
+    @staticmethod
+    def _response(text: str) -> glm.GenerateContentResponse:
+        return glm.GenerateContentResponse(
+            candidates=[
+                glm.Candidate(
+                    content=glm.Content(role="model", parts=[glm.Part(text=text)]),
+                    finish_reason=glm.Candidate.FinishReason.STOP,
+                )
+            ],
+            usage_metadata=glm.GenerateContentResponse.UsageMetadata(total_token_count=7),
+        )
+
+    def generate(self, request: glm.GenerateContentRequest, context: grpc.ServicerContext):
+        self._record(context)
+        return self._response(f"echo: {request.contents[-1].parts[0].text}")
+
+    def stream(
+        self, request: glm.GenerateContentRequest, context: grpc.ServicerContext
+    ) -> Iterator[glm.GenerateContentResponse]:
+        self._record(context)
+        for word in ("streamed", "reply"):
+            yield self._response(word + " ")
+
+    def embed(
+        self, request: glm.BatchEmbedContentsRequest, context: grpc.ServicerContext
+    ) -> glm.BatchEmbedContentsResponse:
+        self._record(context)
+        return glm.BatchEmbedContentsResponse(
+            embeddings=[
+                glm.ContentEmbedding(values=[float(len(item.content.parts[0].text)), 1.0])
+                for item in request.requests
+            ]
+        )
+
+    def handler(self) -> grpc.GenericRpcHandler:
+        serialize = glm.GenerateContentResponse.serialize
+        deserialize = glm.GenerateContentRequest.deserialize
+        return grpc.method_handlers_generic_handler(
+            SERVICE,
+            {
+                "GenerateContent": grpc.unary_unary_rpc_method_handler(
+                    self.generate, request_deserializer=deserialize, response_serializer=serialize
+                ),
+                "StreamGenerateContent": grpc.unary_stream_rpc_method_handler(
+                    self.stream, request_deserializer=deserialize, response_serializer=serialize
+                ),
+                "BatchEmbedContents": grpc.unary_unary_rpc_method_handler(
+                    self.embed,
+                    request_deserializer=glm.BatchEmbedContentsRequest.deserialize,
+                    response_serializer=glm.BatchEmbedContentsResponse.serialize,
+                ),
+            },
+        )
+
+
+@pytest.fixture
+def fake_gemini() -> Iterator[tuple]:
+    fake = FakeGemini()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    server.add_generic_rpc_handlers((fake.handler(),))
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    fake.endpoint = f"127.0.0.1:{port}"
+    transport = GeminiTransport(api_key=API_KEY, endpoint=fake.endpoint, pool_size=2, use_tls=False)
+    try:
+        yield fake, transport
+    finally:
+        transport.close()
+        server.stop(grace=None)
+
+
+def _client(transport: GeminiTransport, **kwargs) -> GeminiClient:
+    return GeminiClient(
+        api_key=API_KEY, model="gemini-test", transport=transport, max_retries=0, **kwargs
+    )
+
+
+def _hedge_policy(budget: HedgeBudget) -> HedgePolicy:
+    """Hedge after 50 ms, the latency of the single seeded call."""
+    policy = HedgePolicy(budget, percentile=0.5, min_delay_seconds=0.0, min_samples=1)
+    policy.observe(0.05)
+    return policy
+
+
+def test_blocking_calls_use_every_pooled_channel(fake_gemini):
+    fake, transport = fake_gemini
+    client = _client(transport)
+
+    replies = [client.generate(f"question {idx}") for idx in range(4)]
+
+    assert replies == [f"echo: question {idx}" for idx in range(4)]
+    assert fake.api_keys == [API_KEY] * 4
+    assert len(fake.peers) == 2
+    assert transport.stats["requests"] == 4
+
+
+def test_concurrent_async_calls_do_not_rebind_the_shared_model(fake_gemini):
+    fake, transport = fake_gemini
+    client = _client(transport)
+
+    async def run() -> List[str]:
+        return await asyncio.gather(*(client.agenerate(f"question {idx}") for idx in range(6)))
+
+    replies = asyncio.run(run())
+
+    assert replies == [f"echo: question {idx}" for idx in range(6)]
+    assert len(fake.peers) == 2
+    # Requests go through bound copies, one per pooled client; the shared model is never rebound.
+    # pylint: disable=protected-access
+    assert client._client._async_client is None
+    assert len({id(client._select_model(False)) for _ in range(4)}) == 2
+
+
+def test_stream_yields_chunks(fake_gemini):
+    fake, transport = fake_gemini
+    client = _client(transport)
+
+    async def run() -> List[str]:
+        return [chunk async for chunk in client.agenerate_stream("hello")]
+
+    assert "".join(asyncio.run(run())) == "streamed reply "
+    assert fake.requests == 1
+
+
+def test_primary_beaten_by_its_hedge_still_feeds_the_trigger(fake_gemini):
+    fake, transport = fake_gemini
+    fake.delays = [1.0, 0.0]
+    budget = HedgeBudget(ratio=1.0)
+    policy = _hedge_policy(budget)
+    client = _client(transport, hedge=policy)
+
+    started = time.perf_counter()
+    reply = asyncio.run(client.agenerate("question"))
+
+    assert reply == "echo: question"
+    assert time.perf_counter() - started < 1.0
+    assert fake.requests == 2
+    assert budget.stats["hedged"] == budget.stats["hedge_wins"] == 1
+    # Seeded call, the winning hedge, and the cancelled primary with the time it had taken.
+    latencies = sorted(policy._latencies)  # pylint: disable=protected-access
+    assert len(latencies) == 3
+    assert latencies[-1] >= 0.05
+
+
+def test_hedge_refused_by_the_rate_limiter_returns_to_the_budget(fake_gemini):
+    fake, transport = fake_gemini
+    fake.delays = [0.3]
+    budget = HedgeBudget(ratio=1.0)
+    # One request per minute: the primary takes it, so the duplicate is refused.
+    limiter = GeminiRateLimiter("test", rpm=1, tpm=0)
+    client = _client(transport, hedge=_hedge_policy(budget), limiter=limiter)
+
+    assert asyncio.run(client.agenerate("question")) == "echo: question"
+
+    assert fake.requests == 1
+    assert budget.stats["hedged"] == 0
+    assert budget.stats["denied"] == 1
+    assert budget.stats["balance"] == 1.0
+
+
+def test_knowledge_base_embeds_through_the_shared_transport(
+    fake_gemini, settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    fake, _ = fake_gemini
+    monkeypatch.setenv("GEMINI_API_ENDPOINT", fake.endpoint)
+    monkeypatch.setenv("GEMINI_API_TLS", "false")
+    get_settings.cache_clear()
+    get_gemini_transport.cache_clear()
+    get_embedding_limiter.cache_clear()
+    try:
+        kb = DragonKnowledgeBase()
+        vector = kb.embeddings.embed_query("what is the payout split")
+        requests = get_gemini_transport().stats["requests"]
+    finally:
+        get_gemini_transport().close()
+        get_gemini_transport.cache_clear()
+        get_embedding_limiter.cache_clear()
+
+    # A renamed SDK attribute would send the call to the SDK's own client instead.
+    assert requests == 1
+    assert fake.requests == 1
+    assert fake.api_keys == [settings.gemini_api_key]
+    assert vector == [float(len("what is the payout split")), 1.0]
+
+
+def test_binding_to_a_missing_sdk_attribute_fails_loudly():
+    class Model:
+        def __init__(self) -> None:
+            self._client = None
+
+    model = Model()
+    bind_client(model, "_client", "pooled")
+    assert model._client == "pooled"  # pylint: disable=protected-access
+
+    with pytest.raises(RuntimeError, match="_renamed_client"):
+        bind_client(model, "_renamed_client", "pooled")
@@ -0,0 +1,136 @@
+"""DragonFundedOrchestrator turns on the async request path."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from app.core.config import Settings
+from app.models.schemas import RetrievedDocument, SupportQuery, SupportResponse
+from app.services.llm import ModelRouter
+from app.services.retrieval import DragonKnowledgeBase
+from app.workflows.dragon_funded_graph import DragonFundedOrchestrator
+from benchmarks.fakes import FakeGeminiClient, HashingEmbeddings
+
+
+class OverlapGemini(FakeGeminiClient):
+    """Fake Gemini that records how many replies were being generated at once."""
+
+    def __init__(self) -> None:
+        super().__init__(latency_seconds=0.05, tokens_per_second=20_000.0)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def agenerate(self, prompt: str, max_output_tokens: int = 300, **kwargs: Any) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await super().agenerate(prompt, max_output_tokens, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def test_concurrent_turns_share_one_event_loop(settings: Settings):
+    gemini = OverlapGemini()
+    workflow = DragonFundedOrchestrator(
+        kb=DragonKnowledgeBase(embedder=HashingEmbeddings()), llm=ModelRouter(gemini)
+    )
+    questions = [
+        "What is the daily loss limit?",
+        "How do I verify my identity?",
+        "When are payouts sent?",
+    ]
+
+    async def run() -> List[SupportResponse]:
+        turns = [
+            workflow.arun(SupportQuery(message=message, conversation_id=f"c{idx}"))
+            for idx, message in enumerate(questions)
+        ]
+        responses = await asyncio.gather(*turns)
+        await workflow.aclose()
+        return responses
+
+    responses = asyncio.run(run())
+
+    assert [response.conversation_id for response in responses] == ["c0", "c1", "c2"]
+    assert all(response.reply for response in responses)
+    # No turn blocks the loop while Gemini answers another.
+    assert gemini.max_in_flight == len(questions)
+
+
+def test_run_serves_synchronous_callers(orchestrator: DragonFundedOrchestrator):
+    response = orchestrator.run(SupportQuery(message="What is the maximum drawdown?"))
+
+    assert response.reply
+    assert response.sources
+    assert set(response.node_timings_ms) == {
+        "classify_intent",
+        "retrieve_knowledge",
+        "compose_response",
+        "evaluate_handoff",
+        "update_memory",
+    }
+
+
+class EscalatingGemini(FakeGeminiClient):
+    """Streams a reply whose escalation marker is split across two chunks."""
+
+    async def agenerate_stream(
+        self, prompt: str, max_output_tokens: int = 300, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        for chunk in ["I will esc", "alate this ", "to a specialist, escalate."]:
+            yield chunk
+
+
+def test_stream_flags_escalation_once_as_the_marker_arrives(settings: Settings):
+    workflow = DragonFundedOrchestrator(
+        kb=DragonKnowledgeBase(embedder=HashingEmbeddings()), llm=ModelRouter(EscalatingGemini())
+    )
+
+    async def run() -> List[Tuple[str, Dict[str, Any]]]:
+        events = [
+            event
+            async for event in workflow.astream(
+                SupportQuery(message="Why was my account breached?")
+            )
+        ]
+        await workflow.aclose()
+        return events
+
+    events = asyncio.run(run())
+
+    assert [name for name, _ in events] == ["token", "token", "escalation", "token", "complete"]
+    complete = events[-1][1]
+    assert complete["reply"] == "I will escalate this to a specialist, escalate."
+    assert complete["escalation_required"]
+    assert "compose_response" in complete["node_timings_ms"]
+
+
+def test_intent_tags_narrow_retrieval_only_when_every_intent_has_tags():
+    intent_tags = DragonFundedOrchestrator._intent_tags  # pylint: disable=protected-access
+
+    assert intent_tags(["kyc", "withdrawal"]) == ["kyc", "withdrawal"]
+    assert intent_tags(["withdrawal", "challenge_rules"]) is None
+    assert intent_tags(["general"]) is None
+    assert intent_tags([]) is None
+
+
+def test_tag_filters_matching_no_seed_section_keep_the_full_k(
+    orchestrator: DragonFundedOrchestrator,
+):
+    calls: List[Tuple[int, Any]] = []
+    kb = orchestrator._kb  # pylint: disable=protected-access
+    retrieve = kb.aretrieve
+
+    async def spy(query: str, k: int = 4, tags: Any = None) -> List[RetrievedDocument]:
+        calls.append((k, tags))
+        return await retrieve(query, k=k, tags=tags)
+
+    async def run() -> None:
+        for message in ("How do I verify my identity?", "How long does a payout take?"):
+            await orchestrator.arun(SupportQuery(message=message))
+
+    kb.aretrieve = spy
+    asyncio.run(run())
+
+    assert calls == [(6, None), (4, ["withdrawal"])]